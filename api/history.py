@@ -0,0 +1,46 @@
+from http.server import BaseHTTPRequestHandler
+from urllib.parse import parse_qs, urlparse
+import json
+import os
+import sys
+
+# Make the project packages importable from the serverless function
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.metrics import METRIC_FIELDS, shared_recorder
+
+class handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        try:
+            # ?minutes=60&buckets=60&fields=cpu,mem
+            query = parse_qs(urlparse(self.path).query)
+            minutes = float(query.get('minutes', ['60'])[0])
+            buckets = int(query.get('buckets', ['60'])[0])
+            fields = query.get('fields', [','.join(METRIC_FIELDS)])[0].split(',')
+            unknown = [field for field in fields if field not in METRIC_FIELDS]
+            if unknown or minutes <= 0 or not 0 < buckets <= 1000:
+                raise ValueError(f'invalid query (fields are {", ".join(METRIC_FIELDS)})')
+
+            recorder = shared_recorder()
+            rows = recorder.downsample(buckets, minutes * 60, fields)
+            result = {
+                'success': True,
+                'interval': recorder.interval,
+                'fields': fields,
+                # Each field is [min, avg, max] over the bucket
+                'buckets': [{key: list(value) if isinstance(value, tuple) else value
+                             for key, value in row.items()} for row in rows],
+            }
+            status = 200
+        except ValueError as e:
+            result = {'success': False, 'error': str(e)}
+            status = 400
+        except Exception as e:
+            result = {'success': False, 'error': f'Server error: {str(e)}'}
+            status = 500
+
+        self.send_response(status)
+        self.send_header('Content-type', 'application/json')
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.end_headers()
+        self.wfile.write(json.dumps(result).encode('utf-8'))
@@ -0,0 +1,31 @@
+from http.server import BaseHTTPRequestHandler
+import os
+import sys
+
+# Make the project packages importable from the serverless function
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from commands.system_info import SystemInfo
+from utils.telemetry import CONTENT_TYPE, telemetry
+
+# Opt-in: the endpoint answers 404 unless this is set to 1
+ENABLE_VARIABLE = 'PYTHON_TERMINAL_METRICS'
+
+# Registers the host gauges next to the terminal's own counters
+SystemInfo()
+
+class handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if os.environ.get(ENABLE_VARIABLE) != '1':
+            self.send_response(404)
+            self.send_header('Content-type', 'text/plain; charset=utf-8')
+            self.end_headers()
+            self.wfile.write(f'Metrics are disabled; set {ENABLE_VARIABLE}=1 to enable.\n'.encode('utf-8'))
+            return
+
+        body = telemetry.render().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-type', CONTENT_TYPE)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
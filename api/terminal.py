@@ -4,8 +4,19 @@ import subprocess
 import psutil
 import os
 import platform
+import sys
+import shlex
 from datetime import datetime
 
+# Make the project packages importable from the serverless function
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.sampler import shared_sampler
+from core.sessions import SessionPool
+
+# Terminal sessions live for the lifetime of the server process
+sessions = SessionPool()
+
 class handler(BaseHTTPRequestHandler):
     def do_POST(self):
         try:
@@ -22,6 +33,24 @@ class handler(BaseHTTPRequestHandler):
             post_data = self.rfile.read(content_length)
             data = json.loads(post_data.decode('utf-8'))
             
+            # A batch runs a list of commands and answers with all results at once
+            if 'batch' in data:
+                items = data['batch']
+                if not isinstance(items, list):
+                    raise ValueError('"batch" must be a list of commands')
+                items = [dict(item, commandLine=self.command_line(item)) if isinstance(item, dict) else item
+                         for item in items]
+                result = sessions.execute_batch(data.get('sessionId'), items, data.get('columns'))
+                self.wfile.write(json.dumps(result).encode('utf-8'))
+                return
+            
+            # Requests carrying a session key (null to start one) run in
+            # that session's own engine and in-memory filesystem
+            if 'sessionId' in data:
+                result = sessions.execute(data['sessionId'], self.command_line(data), data.get('columns'))
+                self.wfile.write(json.dumps(result).encode('utf-8'))
+                return
+            
             command = data.get('command', '').lower()
             args = data.get('args', [])
             current_dir = data.get('currentDir', '/tmp')
@@ -48,6 +77,13 @@ class handler(BaseHTTPRequestHandler):
         self.send_header('Access-Control-Allow-Headers', 'Content-Type')
         self.end_headers()
 
+    @staticmethod
+    def command_line(data):
+        """The request's command line, given whole or as command plus args."""
+        if 'commandLine' in data:
+            return str(data['commandLine'])
+        return shlex.join([str(data.get('command', ''))] + [str(arg) for arg in data.get('args', [])])
+
     def execute_command(self, command, args, current_dir):
         try:
             if command == 'ps':
@@ -77,25 +113,17 @@ class handler(BaseHTTPRequestHandler):
             output = "PID     PPID    NAME                     CPU%    MEM%    STATUS\n"
             output += "-" * 70 + "\n"
             
-            # Get top 10 processes by CPU usage
-            processes = []
-            for proc in psutil.process_iter(['pid', 'ppid', 'name', 'cpu_percent', 'memory_percent', 'status']):
-                try:
-                    proc_info = proc.info
-                    processes.append(proc_info)
-                except (psutil.NoSuchProcess, psutil.AccessDenied):
-                    continue
-            
-            # Sort by CPU usage
-            processes.sort(key=lambda x: x.get('cpu_percent', 0), reverse=True)
+            # Sort the latest sample by CPU usage over its interval
+            processes = sorted(shared_sampler().latest().processes,
+                               key=lambda p: p.cpu_percent, reverse=True)
             
             for proc in processes[:15]:  # Top 15 processes
-                pid = str(proc.get('pid', 0)).ljust(8)
-                ppid = str(proc.get('ppid', 0)).ljust(8)
-                name = str(proc.get('name', 'unknown'))[:20].ljust(20)
-                cpu = f"{proc.get('cpu_percent', 0):.1f}%".ljust(8)
-                mem = f"{proc.get('memory_percent', 0):.1f}%".ljust(8)
-                status = str(proc.get('status', 'unknown'))
+                pid = str(proc.pid).ljust(8)
+                ppid = str(proc.ppid).ljust(8)
+                name = str(proc.name or 'unknown')[:20].ljust(20)
+                cpu = f"{proc.cpu_percent:.1f}%".ljust(8)
+                mem = f"{proc.memory_percent:.1f}%".ljust(8)
+                status = str(proc.status or 'unknown')
                 
                 output += f"{pid}{ppid}{name} {cpu}{mem}{status}\n"
             
@@ -106,21 +134,18 @@ class handler(BaseHTTPRequestHandler):
 
     def get_system_info(self):
         try:
-            # CPU Info
-            cpu_percent = psutil.cpu_percent(interval=1)
-            cpu_count = psutil.cpu_count()
-            
-            # Memory Info
-            memory = psutil.virtual_memory()
-            
-            # Disk Info
-            disk = psutil.disk_usage('/')
+            # Latest background sample instead of blocking on a CPU interval
+            snapshot = shared_sampler().latest()
+            cpu_percent = snapshot.cpu_percent
+            cpu_count = snapshot.cpu_count
+            memory = snapshot.memory
+            disk = snapshot.disk or psutil.disk_usage('/')
             
             # Load average (Unix-like systems)
-            try:
-                load_avg = os.getloadavg()
+            if snapshot.load_avg is not None:
+                load_avg = snapshot.load_avg
                 load_str = f"{load_avg[0]:.2f}, {load_avg[1]:.2f}, {load_avg[2]:.2f}"
-            except (AttributeError, OSError):
+            else:
                 load_str = "Not available"
             
             output = f"""
@@ -179,8 +204,9 @@ class handler(BaseHTTPRequestHandler):
 
     def get_memory_info(self):
         try:
-            memory = psutil.virtual_memory()
-            swap = psutil.swap_memory()
+            snapshot = shared_sampler().latest()
+            memory = snapshot.memory
+            swap = snapshot.swap
             
             output = f"""
 🧠 MEMORY INFORMATION
@@ -0,0 +1,60 @@
+"""
+Benchmark the Myers diff against difflib on large synthetic file pairs.
+
+Usage: python benchmarks/bench_diff.py [lines] [changes]
+"""
+import difflib
+import os
+import random
+import sys
+import time
+
+# Add the project root to Python path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.diff import unified_diff
+
+
+def make_pair(line_count: int, changes: int):
+    """Build a config-dump-like file and a copy with scattered edits."""
+    rng = random.Random(42)
+    a = [f"key.{i % 997}.setting_{i} = {rng.randint(0, 10 ** 6)}\n" for i in range(line_count)]
+    b = list(a)
+    for _ in range(changes):
+        pos = rng.randrange(len(b))
+        action = rng.choice(('edit', 'insert', 'delete'))
+        if action == 'edit':
+            b[pos] = b[pos].replace('=', '= changed')
+        elif action == 'insert':
+            b.insert(pos, f"new.entry = {rng.random()}\n")
+        else:
+            del b[pos]
+    return a, b
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+
+def main():
+    """Run both diff implementations and report timings."""
+    line_count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    changes = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+
+    a, b = make_pair(line_count, changes)
+    print(f"{line_count} lines, {changes} random edits")
+
+    myers_time, myers = timed(lambda: list(unified_diff(a, b, 'a', 'b')))
+    print(f"  myers   {myers_time * 1000:10.1f} ms  ({len(myers)} output lines)")
+
+    difflib_time, ref = timed(lambda: list(difflib.unified_diff(a, b, 'a', 'b')))
+    print(f"  difflib {difflib_time * 1000:10.1f} ms  ({len(ref)} output lines)")
+
+    same_time, _ = timed(lambda: list(unified_diff(a, list(a), 'a', 'b')))
+    print(f"  identical input (prefix fast path) {same_time * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
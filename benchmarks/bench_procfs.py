@@ -0,0 +1,76 @@
+"""
+Benchmark process and memory snapshots: direct /proc reader vs psutil.
+
+Usage: python benchmarks/bench_procfs.py [target_processes ...]
+
+Idle `sleep` processes are spawned until the process table holds each
+target count in turn (default: 1000 and 10000), then a full snapshot is
+timed with both backends. Linux only.
+"""
+import os
+import subprocess
+import sys
+import time
+
+import psutil
+
+# Add the project root to Python path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import procfs
+from utils.processes import ProcessScanner
+
+ROUNDS = 5
+
+
+def best_of(func, rounds: int = ROUNDS) -> float:
+    """Fastest of `rounds` runs, in seconds."""
+    best = float('inf')
+    for _ in range(rounds):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def procfs_memory():
+    """Memory and swap from one /proc/meminfo read, as the sampler takes them."""
+    info = procfs.meminfo()
+    return procfs.virtual_memory(info), procfs.swap_memory(info)
+
+
+def main():
+    """Grow the process table to each target and time both snapshot paths."""
+    if not procfs.AVAILABLE:
+        print("/proc is not available on this platform")
+        return
+    targets = [int(arg) for arg in sys.argv[1:]] or [1000, 10000]
+
+    children = []
+    try:
+        for target in sorted(targets):
+            while len(psutil.pids()) < target:
+                children.append(subprocess.Popen(['sleep', '600']))
+            count = len(psutil.pids())
+
+            fast = best_of(lambda: ProcessScanner(use_procfs=True).scan())
+            slow = best_of(lambda: ProcessScanner(use_procfs=False).scan())
+            print(f"{count} processes")
+            print(f"  /proc reader  {fast * 1000:9.1f} ms  ({fast / count * 1e6:6.1f} us/process)")
+            print(f"  psutil        {slow * 1000:9.1f} ms  ({slow / count * 1e6:6.1f} us/process)"
+                  f"  {slow / fast:4.1f}x")
+
+        fast = best_of(procfs_memory, 1000)
+        slow = best_of(lambda: (psutil.virtual_memory(), psutil.swap_memory()), 1000)
+        print("memory")
+        print(f"  /proc/meminfo {fast * 1e6:9.1f} us")
+        print(f"  psutil        {slow * 1e6:9.1f} us  {slow / fast:4.1f}x")
+    finally:
+        for child in children:
+            child.kill()
+        for child in children:
+            child.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Benchmark ps-style process table scans.
+
+Usage: python benchmarks/bench_ps.py [extra_processes]
+
+Spawns `extra_processes` idle `sleep` processes first (default 0) so the
+scan can be measured on a host with thousands of processes.
+"""
+import os
+import subprocess
+import sys
+import time
+
+import psutil
+
+# Add the project root to Python path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.processes import ProcessScanner, current_uid
+
+
+def naive_scan():
+    """The previous ps loop: a fresh Process().username() for every process."""
+    processes = []
+    for proc in psutil.process_iter(['pid', 'name', 'username', 'cpu_percent',
+                                     'memory_percent', 'status', 'cmdline']):
+        try:
+            pinfo = proc.info
+            if pinfo['username'] != psutil.Process().username():
+                continue
+            processes.append(pinfo)
+        except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+            pass
+    return processes
+
+
+def main():
+    """Time both scans, with and without the current-user filter."""
+    extra = int(sys.argv[1]) if len(sys.argv) > 1 else 0
+    children = []
+    try:
+        for _ in range(extra):
+            children.append(subprocess.Popen(['sleep', '600']))
+        count = len(psutil.pids())
+
+        start = time.perf_counter()
+        naive_scan()
+        naive = time.perf_counter() - start
+
+        start = time.perf_counter()
+        ProcessScanner(with_cmdline=True).scan(uids=[current_uid()])
+        scanner = time.perf_counter() - start
+
+        start = time.perf_counter()
+        ProcessScanner().scan()
+        full = time.perf_counter() - start
+
+        print(f"{count} processes")
+        print(f"naive ps        {naive * 1000:9.1f} ms  ({naive / count * 1e6:7.1f} us/process)")
+        print(f"ProcessScanner  {scanner * 1000:9.1f} ms  ({scanner / count * 1e6:7.1f} us/process)")
+        print(f"  all users     {full * 1000:9.1f} ms  ({full / count * 1e6:7.1f} us/process)")
+    finally:
+        for child in children:
+            child.kill()
+        for child in children:
+            child.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+"""
+Archive commands - streaming tar and gzip without external binaries.
+"""
+import os
+import tarfile
+import zlib
+from typing import List
+
+# Handle both relative and absolute imports
+try:
+    from ..utils.parallel_gzip import ParallelGzipWriter, compress_stream, decompress_stream
+except ImportError:
+    # Fallback for absolute imports when running directly
+    from utils.parallel_gzip import ParallelGzipWriter, compress_stream, decompress_stream
+
+
+class ArchiveCommands:
+    """Handles tar, gzip and gunzip."""
+
+    def __init__(self, terminal_state):
+        self.state = terminal_state
+
+    def tar(self, args: List[str]) -> str:
+        """Create, extract or list archives: tar -c|-x|-t [-z] [-v] -f ARCHIVE [-C DIR] [path...]."""
+        if not args:
+            return "tar: missing operation (-c, -x or -t)"
+
+        mode = None
+        gzipped = verbose = False
+        archive = None
+        directory = None
+        paths = []
+
+        # Like GNU tar, the first argument may omit its dash ("tar czf out.tgz dir")
+        tokens = list(args)
+        if not tokens[0].startswith('-'):
+            tokens[0] = '-' + tokens[0]
+
+        i = 0
+        while i < len(tokens):
+            arg = tokens[i]
+            if arg == '-C':
+                if i + 1 >= len(tokens):
+                    return "tar: option requires an argument -- 'C'"
+                directory = tokens[i + 1]
+                i += 2
+                continue
+            if arg.startswith('-') and len(arg) > 1:
+                for flag in arg[1:]:
+                    if flag in 'cxt':
+                        if mode and mode != flag:
+                            return "tar: only one of -c, -x, -t may be given"
+                        mode = flag
+                    elif flag == 'z':
+                        gzipped = True
+                    elif flag == 'v':
+                        verbose = True
+                    elif flag == 'f':
+                        if i + 1 >= len(tokens):
+                            return "tar: option requires an argument -- 'f'"
+                        i += 1
+                        archive = tokens[i]
+                    else:
+                        return f"tar: invalid option: {arg}"
+            else:
+                paths.append(arg)
+            i += 1
+
+        if mode is None:
+            return "tar: missing operation (-c, -x or -t)"
+        if archive is None:
+            return "tar: an archive must be given with -f"
+
+        archive_path = self.state.get_full_path(archive)
+        base_dir = self.state.get_full_path(directory) if directory else self.state.current_directory
+
+        try:
+            if mode == 'c':
+                if not paths:
+                    return "tar: refusing to create an empty archive"
+                return self._tar_create(archive_path, base_dir, paths, gzipped, verbose)
+            if mode == 't':
+                return self._tar_list(archive_path, verbose)
+            return self._tar_extract(archive_path, base_dir, verbose)
+        except FileNotFoundError as e:
+            return f"tar: {e.filename or archive}: No such file or directory"
+        except (tarfile.TarError, OSError, EOFError) as e:
+            return f"tar: {archive}: {str(e)}"
+
+    def _tar_create(self, archive_path: str, base_dir: str, paths: List[str],
+                    gzipped: bool, verbose: bool) -> str:
+        """Stream members into the archive; with -z, through the parallel gzip writer."""
+        output = []
+
+        def report(info: tarfile.TarInfo) -> tarfile.TarInfo:
+            output.append(info.name)
+            return info
+
+        with open(archive_path, 'wb') as raw:
+            sink = ParallelGzipWriter(raw) if gzipped else raw
+            try:
+                # '|' stream mode writes sequentially and never seeks back
+                with tarfile.open(fileobj=sink, mode='w|', format=tarfile.PAX_FORMAT) as tar:
+                    for path in paths:
+                        full_path = os.path.join(base_dir, path)
+                        if not os.path.lexists(full_path):
+                            output.append(f"tar: {path}: No such file or directory")
+                            continue
+                        tar.add(full_path, arcname=path, filter=report if verbose else None)
+            finally:
+                if gzipped:
+                    sink.close()
+        return "\n".join(output)
+
+    def _tar_list(self, archive_path: str, verbose: bool) -> str:
+        """List members lazily; uncompressed archives seek past member data."""
+        output = []
+        with tarfile.open(archive_path, mode='r:*') as tar:
+            for member in tar:
+                if verbose:
+                    output.append(f"{member.mode & 0o7777:04o} {member.size:>10} {member.name}")
+                else:
+                    output.append(member.name)
+        return "\n".join(output)
+
+    def _tar_extract(self, archive_path: str, base_dir: str, verbose: bool) -> str:
+        """Extract in one sequential pass, rejecting unsafe member paths."""
+        output = []
+        extract_kwargs = {'filter': 'data'} if hasattr(tarfile, 'data_filter') else {}
+        with tarfile.open(archive_path, mode='r|*') as tar:
+            for member in tar:
+                if not hasattr(tarfile, 'data_filter'):
+                    target = os.path.realpath(os.path.join(base_dir, member.name))
+                    if not target.startswith(os.path.realpath(base_dir) + os.sep):
+                        output.append(f"tar: {member.name}: refusing to extract outside the target")
+                        continue
+                tar.extract(member, base_dir, **extract_kwargs)
+                if verbose:
+                    output.append(member.name)
+        return "\n".join(output)
+
+    def gzip(self, args: List[str]) -> str:
+        """Compress files in parallel blocks: gzip [-d] [-k] [-1..-9] FILE..."""
+        decompress = keep = False
+        level = 6
+        files = []
+        for arg in args:
+            if arg.startswith('-') and len(arg) > 1:
+                for flag in arg[1:]:
+                    if flag == 'd':
+                        decompress = True
+                    elif flag == 'k':
+                        keep = True
+                    elif flag.isdigit() and flag != '0':
+                        level = int(flag)
+                    else:
+                        return f"gzip: invalid option: {arg}"
+            else:
+                files.append(arg)
+
+        if not files:
+            return "gzip: missing file operand"
+
+        name = 'gunzip' if decompress else 'gzip'
+        results = []
+        for filename in files:
+            full_path = self.state.get_full_path(filename)
+            if decompress:
+                if not filename.endswith('.gz'):
+                    results.append(f"{name}: {filename}: unknown suffix -- ignored")
+                    continue
+                target = full_path[:-3]
+            else:
+                if filename.endswith('.gz'):
+                    results.append(f"{name}: {filename} already has .gz suffix -- unchanged")
+                    continue
+                target = full_path + '.gz'
+
+            if os.path.isdir(full_path):
+                results.append(f"{name}: {filename}: Is a directory -- ignored")
+                continue
+            if os.path.exists(target):
+                results.append(f"{name}: {os.path.basename(target)} already exists")
+                continue
+
+            try:
+                with open(full_path, 'rb') as src, open(target, 'wb') as dst:
+                    if decompress:
+                        decompress_stream(src, dst)
+                    else:
+                        compress_stream(src, dst, level=level)
+                os.utime(target, ns=(os.stat(full_path).st_atime_ns, os.stat(full_path).st_mtime_ns))
+                if not keep:
+                    os.remove(full_path)
+            except FileNotFoundError:
+                results.append(f"{name}: {filename}: No such file or directory")
+            except (OSError, EOFError, zlib.error) as e:
+                # Don't leave a partial output behind, e.g. on a corrupt member
+                if os.path.exists(target):
+                    os.remove(target)
+                results.append(f"{name}: {filename}: {str(e)}")
+
+        return "\n".join(results)
+
+    def gunzip(self, args: List[str]) -> str:
+        """Decompress .gz files: gunzip [-k] FILE..."""
+        return self.gzip(['-d'] + args)
@@ -0,0 +1,132 @@
+"""
+Checksum commands - compute and verify file digests.
+"""
+import hashlib
+from typing import List
+
+# Handle both relative and absolute imports
+try:
+    from ..utils.hashing import hash_files
+except ImportError:
+    # Fallback for absolute imports when running directly
+    from utils.hashing import hash_files
+
+
+class ChecksumCommands:
+    """Handles md5sum/sha1sum/sha256sum/sha512sum/b2sum."""
+
+    def __init__(self, terminal_state):
+        self.state = terminal_state
+
+    def md5sum(self, args: List[str]) -> str:
+        """Compute or check MD5 digests: md5sum [-c] [FILE...]"""
+        return self._checksum('md5sum', 'md5', args)
+
+    def sha1sum(self, args: List[str]) -> str:
+        """Compute or check SHA-1 digests: sha1sum [-c] [FILE...]"""
+        return self._checksum('sha1sum', 'sha1', args)
+
+    def sha256sum(self, args: List[str]) -> str:
+        """Compute or check SHA-256 digests: sha256sum [-c] [FILE...]"""
+        return self._checksum('sha256sum', 'sha256', args)
+
+    def sha512sum(self, args: List[str]) -> str:
+        """Compute or check SHA-512 digests: sha512sum [-c] [FILE...]"""
+        return self._checksum('sha512sum', 'sha512', args)
+
+    def b2sum(self, args: List[str]) -> str:
+        """Compute or check BLAKE2b digests: b2sum [-c] [FILE...]"""
+        return self._checksum('b2sum', 'blake2b', args)
+
+    def _checksum(self, name: str, algorithm: str, args: List[str]) -> str:
+        """Shared implementation for all digest commands."""
+        check = False
+        files = []
+        for arg in args:
+            if arg in ('-c', '--check'):
+                check = True
+            elif arg.startswith('-') and arg != '-':
+                return f"{name}: invalid option: {arg}"
+            else:
+                files.append(arg)
+
+        if not files:
+            if self.state.stdin is None:
+                return f"{name}: missing file operand"
+            # Like coreutils, no operand means standard input
+            files = ['-']
+        if '-' in files and self.state.stdin is None:
+            return f"{name}: -: no piped input to read"
+
+        if check:
+            return self._verify(name, algorithm, files)
+
+        full_paths = [self.state.get_full_path(path) for path in files if path != '-']
+        hashed = iter(hash_files(full_paths, algorithm))
+        output = []
+        for path in files:
+            if path == '-':
+                output.append(f"{self._hash_stdin(algorithm)}  -")
+                continue
+            _, digest, error = next(hashed)
+            if error is not None:
+                output.append(f"{name}: {path}: {error.strerror or error}")
+            else:
+                output.append(f"{digest}  {path}")
+        return "\n".join(output)
+
+    def _hash_stdin(self, algorithm: str) -> str:
+        """Digest of the piped input as UTF-8; a second '-' sees it already consumed."""
+        digest = hashlib.new(algorithm)
+        for line in self.state.stdin:
+            digest.update(line.encode('utf-8', errors='surrogateescape'))
+        return digest.hexdigest()
+
+    def _verify(self, name: str, algorithm: str, manifests: List[str]) -> str:
+        """Check files listed in `<digest>  <path>` manifests."""
+        output = []
+        expected = []
+        bad_lines = 0
+
+        for manifest in manifests:
+            if manifest == '-':
+                lines = self.state.stdin.read().splitlines()
+            else:
+                manifest_path = self.state.get_full_path(manifest)
+                try:
+                    with open(manifest_path, 'r', encoding='utf-8') as f:
+                        lines = f.read().splitlines()
+                except OSError as e:
+                    output.append(f"{name}: {manifest}: {e.strerror or e}")
+                    continue
+
+            for line in lines:
+                if not line.strip() or line.startswith('#'):
+                    continue
+                digest, sep, path = line.partition(' ')
+                # "digest  path" for text mode, "digest *path" for binary mode
+                if not sep or path[:1] not in (' ', '*') or not digest:
+                    bad_lines += 1
+                    continue
+                expected.append((path[1:], digest.lower()))
+
+        full_paths = [self.state.get_full_path(path) for path, _ in expected]
+        failed = 0
+        unreadable = 0
+        for (path, want), (_, got, error) in zip(expected, hash_files(full_paths, algorithm)):
+            if error is not None:
+                output.append(f"{path}: FAILED open or read")
+                unreadable += 1
+            elif got == want:
+                output.append(f"{path}: OK")
+            else:
+                output.append(f"{path}: FAILED")
+                failed += 1
+
+        if bad_lines:
+            output.append(f"{name}: WARNING: {bad_lines} line(s) improperly formatted")
+        if unreadable:
+            output.append(f"{name}: WARNING: {unreadable} listed file(s) could not be read")
+        if failed:
+            output.append(f"{name}: WARNING: {failed} computed checksum(s) did NOT match")
+        return "\n".join(output)
@@ -2,7 +2,6 @@
 File and directory operations commands.
 """
 import os
-import shutil
 import stat
 import glob
 from typing import List
@@ -11,16 +10,49 @@ from datetime import datetime
 # Handle both relative and absolute imports
 try:
     from .base import BaseCommand
+    from ..utils.copy_engine import CopyEngine, REFLINK_MODES
+    from ..utils.dedupe import DuplicateFinder, replace_with_link
+    from ..utils.trash import TrashManager
+    from ..utils.disk_usage import DiskUsageCache, DiskUsageScanner
+    from ..utils.formatting import format_size
+    from ..utils.fs_index import FileIndex
+    from ..utils.vfs import FileSystem
+    from ..utils.columns import columnize
+    from ..utils.telemetry import telemetry
 except ImportError:
     # Fallback for absolute imports when running directly
     from commands.base import BaseCommand
+    from utils.copy_engine import CopyEngine, REFLINK_MODES
+    from utils.dedupe import DuplicateFinder, replace_with_link
+    from utils.trash import TrashManager
+    from utils.disk_usage import DiskUsageCache, DiskUsageScanner
+    from utils.formatting import format_size
+    from utils.fs_index import FileIndex
+    from utils.vfs import FileSystem
+    from utils.columns import columnize
+    from utils.telemetry import telemetry
 
 
 class FileOperations:
     """Handles file and directory operations."""
     
-    def __init__(self, terminal_state):
+    def __init__(self, terminal_state, trash_manager: TrashManager = None,
+                 file_index: FileIndex = None):
         self.state = terminal_state
+        self._trash = trash_manager
+        self.index = file_index
+    
+    @property
+    def fs(self) -> FileSystem:
+        """Filesystem of the session these commands operate on."""
+        return self.state.fs
+    
+    @property
+    def trash_manager(self) -> TrashManager:
+        """Trash manager, created on first use."""
+        if self._trash is None:
+            self._trash = TrashManager()
+        return self._trash
     
     def ls(self, args: List[str]) -> str:
         """List directory contents."""
@@ -47,45 +79,45 @@ class FileOperations:
             for path in paths:
                 full_path = self.state.get_full_path(path)
                 
-                if not os.path.exists(full_path):
+                if not self.fs.exists(full_path):
                     output.append(f"ls: cannot access '{path}': No such file or directory")
                     continue
                 
-                if os.path.isfile(full_path):
+                if self.fs.isfile(full_path):
                     # Single file
                     if show_long:
                         output.append(self._format_long_listing([full_path]))
                     else:
-                        output.append(os.path.basename(full_path))
+                        output.append(self.fs.basename(full_path))
                 else:
                     # Directory
                     try:
-                        items = os.listdir(full_path)
+                        # A current index snapshot saves a stat per entry
+                        entries = None
+                        if self.index is not None and self.fs.native:
+                            entries = self.index.snapshot_dir(full_path)
+                        if entries is not None:
+                            items = [entry.name for entry in entries]
+                            dir_names = {entry.name for entry in entries if entry.is_dir()}
+                        else:
+                            items = self.fs.listdir(full_path)
+                            dir_names = None
                         if not show_hidden:
                             items = [item for item in items if not item.startswith('.')]
                         
                         items.sort()
                         
                         if show_long:
-                            item_paths = [os.path.join(full_path, item) for item in items]
+                            item_paths = [self.fs.join(full_path, item) for item in items]
                             output.append(self._format_long_listing(item_paths))
                         else:
                             # Format in columns
                             if items:
-                                # Simple column formatting
-                                max_width = max(len(item) for item in items) if items else 0
-                                cols = max(1, 80 // (max_width + 2))
-                                
-                                formatted_items = []
-                                for i, item in enumerate(items):
-                                    if os.path.isdir(os.path.join(full_path, item)):
-                                        item += "/"
-                                    formatted_items.append(item.ljust(max_width + 2))
-                                    
-                                    if (i + 1) % cols == 0:
-                                        formatted_items.append("\n")
-                                
-                                output.append("".join(formatted_items).rstrip())
+                                if dir_names is None:
+                                    dir_names = {item for item in items
+                                                 if self.fs.isdir(self.fs.join(full_path, item))}
+                                names = [item + "/" if item in dir_names else item for item in items]
+                                output.append(columnize(names, self.state.terminal_width()))
                             else:
                                 output.append("")
                     except PermissionError:
@@ -100,7 +132,7 @@ class FileOperations:
         lines = []
         for path in paths:
             try:
-                stat_info = os.stat(path)
+                stat_info = self.fs.stat(path)
                 
                 # File type and permissions
                 mode = stat_info.st_mode
@@ -131,11 +163,11 @@ class FileOperations:
                 time_str = mtime.strftime("%b %d %H:%M")
                 
                 # File name
-                name = os.path.basename(path)
+                name = self.fs.basename(path)
                 
                 lines.append(f"{perms} {size:>8} {time_str} {name}")
             except (OSError, IOError):
-                lines.append(f"????????? ? ? ? {os.path.basename(path)}")
+                lines.append(f"????????? ? ? ? {self.fs.basename(path)}")
         
         return "\n".join(lines)
     
@@ -143,7 +175,7 @@ class FileOperations:
         """Change directory."""
         if not args:
             # Go to home directory
-            home = os.path.expanduser("~")
+            home = self.fs.home()
             if self.state.set_current_directory(home):
                 return ""
             else:
@@ -188,9 +220,9 @@ class FileOperations:
             full_path = self.state.get_full_path(dir_name)
             try:
                 if create_parents:
-                    os.makedirs(full_path, exist_ok=True)
+                    self.fs.makedirs(full_path, exist_ok=True)
                 else:
-                    os.mkdir(full_path)
+                    self.fs.mkdir(full_path)
             except FileExistsError:
                 results.append(f"mkdir: cannot create directory '{dir_name}': File exists")
             except OSError as e:
@@ -211,19 +243,21 @@ class FileOperations:
                 
             full_path = self.state.get_full_path(dir_name)
             try:
-                os.rmdir(full_path)
+                self.fs.rmdir(full_path)
             except OSError as e:
                 results.append(f"rmdir: failed to remove '{dir_name}': {str(e)}")
         
         return "\n".join(results) if results else ""
     
     def rm(self, args: List[str]) -> str:
-        """Remove files and directories."""
+        """Remove files and directories. Directories removed with -r are purged in the background;
+        --trash keeps items restorable with the trash command."""
         if not args:
             return "rm: missing operand"
         
         recursive = False
         force = False
+        to_trash = False
         files_to_remove = []
         
         for arg in args:
@@ -234,6 +268,8 @@ class FileOperations:
             elif arg == '-rf' or arg == '-fr':
                 recursive = True
                 force = True
+            elif arg == '--trash':
+                to_trash = True
             elif arg.startswith('-'):
                 return f"rm: invalid option: {arg}"
             else:
@@ -246,13 +282,23 @@ class FileOperations:
         for file_name in files_to_remove:
             full_path = self.state.get_full_path(file_name)
             try:
-                if os.path.isdir(full_path):
-                    if recursive:
-                        shutil.rmtree(full_path)
-                    else:
-                        results.append(f"rm: cannot remove '{file_name}': Is a directory")
+                is_dir = self.fs.isdir(full_path) and not self.fs.islink(full_path)
+                if is_dir and not recursive:
+                    results.append(f"rm: cannot remove '{file_name}': Is a directory")
+                elif to_trash:
+                    if not self.fs.native:
+                        results.append(f"rm: cannot move '{file_name}' to trash: not on disk")
+                        continue
+                    if not self.fs.lexists(full_path):
+                        raise FileNotFoundError(full_path)
+                    if self.trash_manager.trash(full_path) is None:
+                        results.append(f"rm: cannot move '{file_name}' to trash")
+                elif is_dir:
+                    # Rename out of the way now, delete the contents in the background
+                    if not self.fs.native or not self.trash_manager.remove(full_path):
+                        self.fs.rmtree(full_path)
                 else:
-                    os.remove(full_path)
+                    self.fs.remove(full_path)
             except FileNotFoundError:
                 if not force:
                     results.append(f"rm: cannot remove '{file_name}': No such file or directory")
@@ -263,16 +309,58 @@ class FileOperations:
         return "\n".join(results) if results else ""
     
     def cp(self, args: List[str]) -> str:
-        """Copy files and directories."""
+        """Copy files and directories. Options: -r, -n (no clobber), -u (update), -v (stats),
+        --sync (incremental), --checksum (block compare with --sync), --delete (with --sync),
+        --reflink[=auto|always|never] (clone data), -l/--link (hard link files)."""
         if len(args) < 2:
             return "cp: missing file operand"
         
         recursive = False
+        no_clobber = False
+        update = False
+        verbose = False
+        sync = False
+        checksum = False
+        delete = False
+        reflink = 'never'
+        hardlink = False
         source_files = []
         
         for arg in args[:-1]:
-            if arg == '-r' or arg == '-R':
+            if arg == '--reflink' or arg.startswith('--reflink='):
+                # Like GNU cp, a bare --reflink means "always"
+                reflink = arg.split('=', 1)[1] if '=' in arg else 'always'
+                if reflink not in REFLINK_MODES:
+                    return f"cp: invalid argument '{reflink}' for '--reflink'"
+            elif arg == '--link':
+                hardlink = True
+            elif arg == '--no-clobber':
+                no_clobber = True
+            elif arg == '--update':
+                update = True
+            elif arg in ('--progress', '--verbose'):
+                verbose = True
+            elif arg == '--sync':
+                sync = True
                 recursive = True
+            elif arg == '--checksum':
+                checksum = True
+            elif arg == '--delete':
+                delete = True
+            elif arg.startswith('-') and len(arg) > 1 and not arg.startswith('--'):
+                for flag in arg[1:]:
+                    if flag in 'rR':
+                        recursive = True
+                    elif flag == 'n':
+                        no_clobber = True
+                    elif flag == 'u':
+                        update = True
+                    elif flag == 'v':
+                        verbose = True
+                    elif flag == 'l':
+                        hardlink = True
+                    else:
+                        return f"cp: invalid option: {arg}"
             elif arg.startswith('-'):
                 return f"cp: invalid option: {arg}"
             else:
@@ -283,41 +371,297 @@ class FileOperations:
         
         destination = args[-1]
         dest_path = self.state.get_full_path(destination)
+        if (checksum or delete) and not sync:
+            return "cp: --checksum and --delete require --sync"
+        if hardlink and reflink != 'never':
+            return "cp: --link and --reflink are mutually exclusive"
+        if not self.fs.native and (sync or hardlink or reflink != 'never'):
+            return "cp: --sync, --link and --reflink need a disk filesystem"
+        
+        engine = CopyEngine(no_clobber=no_clobber, update=update, sync=sync,
+                            checksum=checksum, delete=delete, reflink=reflink, hardlink=hardlink)
         
         results = []
         for source in source_files:
             source_path = self.state.get_full_path(source)
             
             try:
-                if not os.path.exists(source_path):
+                if not self.fs.exists(source_path):
                     results.append(f"cp: cannot stat '{source}': No such file or directory")
                     continue
                 
-                if os.path.isdir(source_path):
-                    if not recursive:
-                        results.append(f"cp: -r not specified; omitting directory '{source}'")
-                        continue
-                    
-                    # Directory copy
-                    if os.path.isdir(dest_path):
-                        final_dest = os.path.join(dest_path, os.path.basename(source_path))
-                    else:
-                        final_dest = dest_path
-                    
-                    shutil.copytree(source_path, final_dest)
+                if self.fs.isdir(source_path) and not recursive:
+                    results.append(f"cp: -r not specified; omitting directory '{source}'")
+                    continue
+                
+                if self.fs.isdir(dest_path):
+                    final_dest = self.fs.join(dest_path, self.fs.basename(source_path))
+                    shown_dest = self.fs.join(destination, self.fs.basename(source_path))
                 else:
-                    # File copy
-                    if os.path.isdir(dest_path):
-                        final_dest = os.path.join(dest_path, os.path.basename(source_path))
-                    else:
-                        final_dest = dest_path
-                    
-                    shutil.copy2(source_path, final_dest)
+                    final_dest = dest_path
+                    shown_dest = destination
+                
+                # Opening the destination for writing would truncate the source itself
+                if self.fs.samefile(source_path, final_dest):
+                    results.append(f"cp: '{source}' and '{shown_dest}' are the same file")
+                    continue
+                
+                sep = self.fs.sep
+                if self.fs.isdir(source_path) and (final_dest + sep).startswith(source_path + sep):
+                    results.append(f"cp: cannot copy a directory, '{source}', into itself")
+                    continue
+                
+                if self.fs.native:
+                    engine.copy(source_path, final_dest)
+                else:
+                    self._copy_virtual(source_path, final_dest, engine)
             except OSError as e:
                 results.append(f"cp: cannot copy '{source}': {str(e)}")
         
+        for error in engine.stats.errors:
+            results.append(f"cp: {error}")
+        if verbose:
+            results.append(f"cp: {engine.stats.summary()}")
+        
         return "\n".join(results) if results else ""
     
+    def _copy_virtual(self, src: str, dst: str, engine: CopyEngine):
+        """Copy a file or tree within a non-disk filesystem, honouring -n and -u."""
+        if self.fs.isdir(src):
+            jobs = []
+            for dir_path, _, file_names in self.fs.walk(src):
+                target_dir = dst + dir_path[len(src):]
+                self.fs.makedirs(target_dir, exist_ok=True)
+                jobs.extend((self.fs.join(dir_path, name), self.fs.join(target_dir, name))
+                            for name in file_names)
+        else:
+            jobs = [(src, dst)]
+        
+        stats = engine.stats
+        for src_file, dst_file in jobs:
+            try:
+                src_stat = self.fs.stat(src_file)
+                dst_stat = self.fs.stat(dst_file) if self.fs.exists(dst_file) else None
+                if engine.should_skip(src_stat, dst_stat):
+                    stats.files_skipped += 1
+                    continue
+                self.fs.copyfile(src_file, dst_file)
+                stats.files_copied += 1
+                stats.bytes_copied += src_stat.st_size
+            except OSError as e:
+                stats.errors.append(f"{src_file}: {e.strerror or e}")
+    
+    def dedupe(self, args: List[str]) -> str:
+        """Find duplicate files: dedupe [--min-size N] [--hardlink|--reflink] [path...].
+        With a link mode, each duplicate is replaced by a link to the first file of its group."""
+        if not self.fs.native:
+            return "dedupe: only available on a disk filesystem"
+        
+        min_size = 1
+        mode = None
+        paths = []
+        
+        i = 0
+        while i < len(args):
+            arg = args[i]
+            if arg.startswith('--min-size'):
+                value = arg.split('=', 1)[1] if '=' in arg else (args[i + 1] if i + 1 < len(args) else '')
+                if '=' not in arg:
+                    i += 1
+                if not value.isdigit():
+                    return f"dedupe: invalid minimum size '{value}'"
+                min_size = int(value)
+            elif arg in ('--hardlink', '--reflink'):
+                mode = arg[2:]
+            elif arg.startswith('-'):
+                return f"dedupe: invalid option: {arg}"
+            else:
+                paths.append(arg)
+            i += 1
+        
+        if not paths:
+            paths = ['.']
+        
+        roots = []
+        output = []
+        for path in paths:
+            full_path = self.state.get_full_path(path)
+            if not os.path.lexists(full_path):
+                output.append(f"dedupe: cannot access '{path}': No such file or directory")
+                continue
+            roots.append(full_path)
+        
+        finder = DuplicateFinder(min_size=min_size)
+        groups = finder.find(roots)
+        output.extend(f"dedupe: {error}" for error in finder.errors)
+        
+        duplicates = 0
+        reclaimable = 0
+        replaced = 0
+        for group in groups:
+            size = os.path.getsize(group[0])
+            duplicates += len(group) - 1
+            reclaimable += size * (len(group) - 1)
+            if mode is None:
+                output.extend(group)
+                output.append("")
+                continue
+            for duplicate in group[1:]:
+                try:
+                    replace_with_link(group[0], duplicate, mode)
+                    replaced += 1
+                except OSError as e:
+                    output.append(f"dedupe: cannot link '{duplicate}': {e.strerror or e}")
+        
+        summary = (f"{duplicates} duplicate files in {len(groups)} groups, "
+                   f"{format_size(reclaimable)} reclaimable "
+                   f"({finder.files_scanned} files scanned, {format_size(finder.bytes_hashed)} hashed)")
+        if mode is not None:
+            summary = f"Replaced {replaced} of " + summary
+        output.append(summary)
+        return "\n".join(output)
+    
+    def trash(self, args: List[str]) -> str:
+        """Manage the trash: trash [list], trash restore <id>..., trash empty."""
+        if not self.fs.native:
+            return "trash: only available on a disk filesystem"
+        
+        action = args[0] if args else 'list'
+        
+        if action == 'list':
+            items = self.trash_manager.list_items()
+            if not items:
+                return "trash: empty"
+            lines = [f"{'ID':<50} {'DELETED':<20} {'PATH'}"]
+            for item in items:
+                deleted = item.get('deleted', '?')[:19].replace('T', ' ')
+                lines.append(f"{item['id']:<50} {deleted:<20} {item.get('path', '?')}")
+            return "\n".join(lines)
+        
+        if action == 'restore':
+            if len(args) < 2:
+                return "trash: restore: missing id"
+            results = []
+            for item_id in args[1:]:
+                try:
+                    restored = self.trash_manager.restore(item_id)
+                    results.append(f"restored '{restored}'")
+                except KeyError:
+                    results.append(f"trash: no such item: {item_id}")
+                except OSError as e:
+                    results.append(f"trash: cannot restore '{item_id}': {str(e)}")
+            return "\n".join(results)
+        
+        if action == 'empty':
+            count = self.trash_manager.empty()
+            return f"trash: purging {count} item(s) in the background"
+        
+        return f"trash: invalid action: {action}"
+    
+    def du(self, args: List[str]) -> str:
+        """Show disk usage of directory trees: du [-s] [-h] [--max-depth=N] [--cache] [path...]."""
+        summarize = False
+        human_readable = False
+        use_cache = False
+        max_depth = None
+        paths = []
+        
+        i = 0
+        while i < len(args):
+            arg = args[i]
+            if arg.startswith('--max-depth'):
+                value = arg.split('=', 1)[1] if '=' in arg else (args[i + 1] if i + 1 < len(args) else '')
+                if '=' not in arg:
+                    i += 1
+                if not value.isdigit():
+                    return f"du: invalid maximum depth '{value}'"
+                max_depth = int(value)
+            elif arg == '--cache':
+                use_cache = True
+            elif arg.startswith('-') and len(arg) > 1 and not arg.startswith('--'):
+                for flag in arg[1:]:
+                    if flag == 's':
+                        summarize = True
+                    elif flag == 'h':
+                        human_readable = True
+                    else:
+                        return f"du: invalid option: {arg}"
+            elif arg.startswith('-'):
+                return f"du: invalid option: {arg}"
+            else:
+                paths.append(arg)
+            i += 1
+        
+        if summarize:
+            max_depth = 0
+        if not paths:
+            paths = ['.']
+        
+        cache = DiskUsageCache() if use_cache else None
+        output = []
+        for path in paths:
+            full_path = self.state.get_full_path(path)
+            if not self.fs.lexists(full_path):
+                output.append(f"du: cannot access '{path}': No such file or directory")
+                continue
+            
+            if not self.fs.native:
+                totals = self._du_virtual(full_path)
+            else:
+                scanner = DiskUsageScanner(cache=cache, index=self.index)
+                try:
+                    totals = scanner.scan(full_path)
+                except OSError as e:
+                    output.append(f"du: cannot access '{path}': {str(e)}")
+                    continue
+                output.extend(f"du: {error}" for error in scanner.errors)
+                telemetry.record_cache('du', hits=scanner.cached, misses=scanner.scanned)
+            
+            for dir_path, size in self._du_post_order(full_path, totals, max_depth):
+                if human_readable:
+                    size_str = format_size(size)
+                else:
+                    size_str = str(-(-size // 1024))
+                rest = dir_path[len(full_path):].lstrip(self.fs.sep)
+                display = self.fs.join(path, rest) if rest else path
+                output.append(f"{size_str}\t{display}")
+        
+        return "\n".join(output)
+    
+    def _du_virtual(self, root: str) -> dict:
+        """Apparent-size totals per directory on a non-disk filesystem."""
+        if not self.fs.isdir(root):
+            return {root: self.fs.stat(root).st_size}
+        totals = {}
+        order = []
+        for dir_path, _, file_names in self.fs.walk(root):
+            order.append(dir_path)
+            totals[dir_path] = sum(self.fs.stat(self.fs.join(dir_path, name)).st_size
+                                   for name in file_names)
+        # Walk is top-down, so reversed order rolls children into parents
+        for dir_path in reversed(order):
+            if dir_path != root:
+                totals[self.fs.dirname(dir_path)] += totals[dir_path]
+        return totals
+    
+    def _du_post_order(self, root: str, totals: dict, max_depth: int = None):
+        """Yield (path, size) children-first, like GNU du, down to max_depth."""
+        children = {}
+        for path in totals:
+            if path != root:
+                children.setdefault(self.fs.dirname(path), []).append(path)
+        
+        stack = [(root, 0, False)]
+        while stack:
+            path, depth, expanded = stack.pop()
+            if expanded:
+                yield path, totals[path]
+                continue
+            stack.append((path, depth, True))
+            if max_depth is None or depth < max_depth:
+                for child in sorted(children.get(path, []), reverse=True):
+                    stack.append((child, depth + 1, False))
+    
     def mv(self, args: List[str]) -> str:
         """Move/rename files and directories."""
         if len(args) < 2:
@@ -332,16 +676,16 @@ class FileOperations:
             source_path = self.state.get_full_path(source)
             
             try:
-                if not os.path.exists(source_path):
+                if not self.fs.exists(source_path):
                     results.append(f"mv: cannot stat '{source}': No such file or directory")
                     continue
                 
-                if os.path.isdir(dest_path) and len(source_files) > 1:
-                    final_dest = os.path.join(dest_path, os.path.basename(source_path))
+                if self.fs.isdir(dest_path) and len(source_files) > 1:
+                    final_dest = self.fs.join(dest_path, self.fs.basename(source_path))
                 else:
                     final_dest = dest_path
                 
-                shutil.move(source_path, final_dest)
+                self.fs.move(source_path, final_dest)
             except OSError as e:
                 results.append(f"mv: cannot move '{source}': {str(e)}")
         
@@ -360,12 +704,12 @@ class FileOperations:
             
             full_path = self.state.get_full_path(filename)
             try:
-                if os.path.exists(full_path):
+                if self.fs.exists(full_path):
                     # Update timestamp
-                    os.utime(full_path, None)
+                    self.fs.utime(full_path, None)
                 else:
                     # Create empty file
-                    with open(full_path, 'w'):
+                    with self.fs.open(full_path, 'w'):
                         pass
             except OSError as e:
                 results.append(f"touch: cannot touch '{filename}': {str(e)}")
@@ -385,10 +729,10 @@ class FileOperations:
             
             full_path = self.state.get_full_path(filename)
             try:
-                if os.path.isdir(full_path):
+                if self.fs.isdir(full_path):
                     output.append(f"cat: {filename}: Is a directory")
                 else:
-                    with open(full_path, 'r', encoding='utf-8', errors='replace') as f:
+                    with self.fs.open(full_path, 'r', encoding='utf-8', errors='replace') as f:
                         content = f.read()
                         output.append(content.rstrip('\n'))  # Remove trailing newline
             except FileNotFoundError:
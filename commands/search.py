@@ -0,0 +1,644 @@
+"""
+Search commands - find files by name, type, size and age, and grep their contents.
+"""
+import fnmatch
+import mmap
+import os
+import re
+import stat
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Iterator, List, Optional, Tuple
+
+# Handle both relative and absolute imports
+try:
+    from ..utils.walker import walk_parallel
+    from ..utils.fs_index import FileIndex
+    from ..utils.fuzzy import FuzzyFinder
+except ImportError:
+    # Fallback for absolute imports when running directly
+    from utils.walker import walk_parallel
+    from utils.fs_index import FileIndex
+    from utils.fuzzy import FuzzyFinder
+
+
+SIZE_UNITS = {'c': 1, 'w': 2, 'b': 512, 'k': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3}
+
+# Bytes inspected when deciding whether a file is binary
+BINARY_SNIFF_SIZE = 8192
+
+# Largest slice copied out of a mapped file while counting line numbers
+NEWLINE_COUNT_CHUNK = 256 * 1024
+
+# Regex searches over more data than this are spread across processes
+PARALLEL_GREP_BYTES = 32 * 1024 * 1024
+
+
+class _RootEntry:
+    """Minimal os.DirEntry stand-in for a starting path given on the command line."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.name = os.path.basename(path) or path
+        self._stat = os.lstat(path)
+
+    def is_dir(self, follow_symlinks: bool = True) -> bool:
+        mode = os.stat(self.path).st_mode if follow_symlinks else self._stat.st_mode
+        return stat.S_ISDIR(mode)
+
+    def is_file(self, follow_symlinks: bool = True) -> bool:
+        mode = os.stat(self.path).st_mode if follow_symlinks else self._stat.st_mode
+        return stat.S_ISREG(mode)
+
+    def is_symlink(self) -> bool:
+        return stat.S_ISLNK(self._stat.st_mode)
+
+    def stat(self, follow_symlinks: bool = True) -> os.stat_result:
+        return os.stat(self.path) if follow_symlinks else self._stat
+
+
+class FindQuery:
+    """
+    A compiled find expression.
+
+    Predicates are split into those answerable from the DirEntry alone
+    (name, type) and those that need a stat (size, mtime). The cheap ones
+    run first so stat is only called for entries that survive them.
+    """
+
+    def __init__(self):
+        self.entry_predicates = []
+        self.stat_predicates = []
+        self.max_depth = None
+        self.min_depth = 0
+
+    @classmethod
+    def parse(cls, args: List[str]) -> Tuple[List[str], 'FindQuery']:
+        """
+        Parse `find` arguments into start paths and a compiled query.
+
+        Raises:
+            ValueError: On unknown or malformed expressions
+        """
+        paths = []
+        i = 0
+        while i < len(args) and not args[i].startswith('-'):
+            paths.append(args[i])
+            i += 1
+
+        query = cls()
+        now = time.time()
+        while i < len(args):
+            option = args[i]
+            if i + 1 >= len(args):
+                raise ValueError(f"missing argument to '{option}'")
+            value = args[i + 1]
+            i += 2
+
+            if option in ('-name', '-iname'):
+                flags = re.IGNORECASE if option == '-iname' else 0
+                match = re.compile(fnmatch.translate(value), flags).match
+                query.entry_predicates.append(lambda entry, m=match: m(entry.name) is not None)
+            elif option == '-type':
+                query.entry_predicates.append(_type_predicate(value))
+            elif option == '-size':
+                query.stat_predicates.append(_size_predicate(value))
+            elif option == '-mtime':
+                query.stat_predicates.append(_mtime_predicate(value, now))
+            elif option == '-maxdepth':
+                query.max_depth = _non_negative(option, value)
+            elif option == '-mindepth':
+                query.min_depth = _non_negative(option, value)
+            else:
+                raise ValueError(f"unknown predicate '{option}'")
+
+        return paths or ['.'], query
+
+    def matches(self, entry, depth: int) -> bool:
+        """Check an entry against every predicate, cheapest first."""
+        if depth < self.min_depth:
+            return False
+        for predicate in self.entry_predicates:
+            if not predicate(entry):
+                return False
+        if self.stat_predicates:
+            try:
+                st = entry.stat(follow_symlinks=False)
+            except OSError:
+                return False
+            for predicate in self.stat_predicates:
+                if not predicate(st):
+                    return False
+        return True
+
+
+def _non_negative(option: str, value: str) -> int:
+    """Parse a depth argument."""
+    if not value.isdigit():
+        raise ValueError(f"invalid argument '{value}' to '{option}'")
+    return int(value)
+
+
+def _type_predicate(value: str) -> Callable:
+    """Build a -type test that uses only the DirEntry's cached d_type."""
+    tests = {
+        'f': lambda entry: entry.is_file(follow_symlinks=False),
+        'd': lambda entry: entry.is_dir(follow_symlinks=False),
+        'l': lambda entry: entry.is_symlink(),
+    }
+    if value not in tests:
+        raise ValueError(f"unknown argument to -type: {value}")
+    return tests[value]
+
+
+def _split_numeric(value: str) -> Tuple[str, str]:
+    """Split a leading +/- comparison sign from a numeric argument."""
+    if value[:1] in ('+', '-'):
+        return value[0], value[1:]
+    return '', value
+
+
+def _compare(sign: str, actual: int, expected: int) -> bool:
+    """GNU find numeric comparison: +n greater, -n less, n exactly."""
+    if sign == '+':
+        return actual > expected
+    if sign == '-':
+        return actual < expected
+    return actual == expected
+
+
+def _size_predicate(value: str) -> Callable:
+    """Build a -size test; sizes are rounded up to the unit like GNU find."""
+    sign, number = _split_numeric(value)
+    unit = 512
+    if number and number[-1] in SIZE_UNITS:
+        unit = SIZE_UNITS[number[-1]]
+        number = number[:-1]
+    if not number.isdigit():
+        raise ValueError(f"invalid -size argument '{value}'")
+    expected = int(number)
+    return lambda st: _compare(sign, -(-st.st_size // unit), expected)
+
+
+def _mtime_predicate(value: str, now: float) -> Callable:
+    """Build a -mtime test in whole days before `now`."""
+    sign, number = _split_numeric(value)
+    if not number.isdigit():
+        raise ValueError(f"invalid -mtime argument '{value}'")
+    expected = int(number)
+    return lambda st: _compare(sign, int((now - st.st_mtime) // 86400), expected)
+
+
+def iter_find(root: str, query: FindQuery, display_root: Optional[str] = None,
+              index: FileIndex = None) -> Iterator[str]:
+    """
+    Stream paths under `root` that match `query`.
+
+    Directories are listed concurrently and matches are yielded as soon as
+    their directory has been scanned. Unreadable directories are reported
+    inline as `find: ...` lines. With an index, directories it holds a
+    current snapshot of are answered from it instead of the disk.
+    """
+    display_root = root if display_root is None else display_root
+
+    def display(path: str) -> str:
+        rest = path[len(root):].lstrip(os.sep)
+        return os.path.join(display_root, rest) if rest else display_root
+
+    root_entry = _RootEntry(root)
+    if query.matches(root_entry, 0):
+        yield display_root
+
+    if not root_entry.is_dir(follow_symlinks=False):
+        return
+    if query.max_depth is not None and query.max_depth < 1:
+        return
+
+    def visit(path: str, depth: int, entries: List[os.DirEntry]) -> List[str]:
+        return [entry.path for entry in entries if query.matches(entry, depth + 1)]
+
+    # Entries of a directory at depth d sit at depth d + 1
+    max_dir_depth = None if query.max_depth is None else query.max_depth - 1
+    list_dir = index.snapshot_dir if index is not None else None
+    for result in walk_parallel(root, visit, max_depth=max_dir_depth, list_dir=list_dir):
+        if result.error is not None:
+            yield f"find: '{display(result.path)}': {result.error.strerror or result.error}"
+            continue
+        for path in result.value:
+            yield display(path)
+
+
+class GrepMatcher:
+    """
+    A grep pattern compiled once for matching against raw bytes.
+
+    Case-sensitive fixed strings use `find` on the mapped file directly;
+    everything else goes through a compiled bytes regex. Matchers are
+    picklable so they can be shipped to worker processes.
+    """
+
+    def __init__(self, pattern: str, ignore_case: bool = False, fixed: bool = False):
+        needle = pattern.encode('utf-8')
+        self.fixed = fixed
+        if fixed and not ignore_case:
+            self.needle = needle
+            self.regex = None
+        else:
+            self.needle = None
+            flags = re.MULTILINE | (re.IGNORECASE if ignore_case else 0)
+            self.regex = re.compile(re.escape(needle) if fixed else needle, flags)
+
+    def scan(self, buf, size: int, mode: str = 'lines', line_numbers: bool = False):
+        """
+        Find matching lines in a bytes-like buffer.
+
+        Args:
+            buf: bytes, mmap or other buffer to search
+            size: Number of bytes in `buf`
+            mode: 'lines' for matching lines, 'count' for a count, 'list' to stop at the first hit
+            line_numbers: Track line numbers for 'lines' mode
+
+        Returns:
+            List of (line_number, line_bytes) for 'lines', else an int count
+        """
+        hits = []
+        count = 0
+        pos = 0
+        lineno = 1
+        counted_to = 0
+        while pos < size:
+            if self.regex is None:
+                i = buf.find(self.needle, pos)
+                if i < 0:
+                    break
+            else:
+                match = self.regex.search(buf, pos)
+                if match is None:
+                    break
+                i = match.start()
+
+            # pos is always at a line start, so only look back that far
+            start = buf.rfind(b'\n', pos, i) + 1 or pos
+            end = buf.find(b'\n', i)
+            if end < 0:
+                end = size
+
+            if self.regex is not None and match.end() > end:
+                # The match spans lines; accept the line only if it matches alone
+                if self.regex.search(buf[start:end]) is None:
+                    pos = end + 1
+                    continue
+
+            count += 1
+            if mode == 'list':
+                return 1
+            if mode == 'lines':
+                if line_numbers:
+                    lineno += _count_newlines(buf, counted_to, start)
+                    counted_to = start
+                hits.append((lineno, buf[start:end]))
+            pos = end + 1
+
+        return hits if mode == 'lines' else count
+
+
+def _count_newlines(buf, start: int, end: int) -> int:
+    """
+    Newlines in buf[start:end] without copying the range.
+
+    bytes count in place; mmap has no count(), so it is counted through
+    slices of at most NEWLINE_COUNT_CHUNK bytes.
+    """
+    if isinstance(buf, bytes):
+        return buf.count(b'\n', start, end)
+    count = 0
+    for pos in range(start, end, NEWLINE_COUNT_CHUNK):
+        count += buf[pos:min(pos + NEWLINE_COUNT_CHUNK, end)].count(b'\n')
+    return count
+
+
+def _is_binary(buf) -> bool:
+    """Sniff for NUL bytes near the start of a file, like GNU grep."""
+    return b'\0' in buf[:BINARY_SNIFF_SIZE]
+
+
+def grep_file(path: str, matcher: GrepMatcher, mode: str = 'lines', line_numbers: bool = False):
+    """
+    Search one file through a read-only memory map.
+
+    Returns the matcher's scan result, None for skipped binary files, or
+    an error message string.
+    """
+    try:
+        with open(path, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            if size == 0:
+                # Empty, or generated on read like /proc and sysfs files
+                data = f.read()
+                if _is_binary(data):
+                    return None
+                return matcher.scan(data, len(data), mode, line_numbers)
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+                if _is_binary(buf):
+                    return None
+                return matcher.scan(buf, size, mode, line_numbers)
+    except IsADirectoryError:
+        return "Is a directory"
+    except (OSError, ValueError) as e:
+        return getattr(e, 'strerror', None) or str(e)
+
+
+_worker_matcher = None
+
+
+def _init_grep_worker(matcher: GrepMatcher):
+    """Process pool initializer: keep one compiled matcher per worker."""
+    global _worker_matcher
+    _worker_matcher = matcher
+
+
+def _grep_in_worker(job: Tuple[str, str, bool]):
+    path, mode, line_numbers = job
+    return grep_file(path, _worker_matcher, mode, line_numbers)
+
+
+def iter_grep(paths: List[str], matcher: GrepMatcher, mode: str = 'lines',
+              line_numbers: bool = False) -> Iterator[Tuple[str, object]]:
+    """
+    Yield (path, result) for each file, in the order given.
+
+    Fixed-string searches are I/O bound and run in-process. Regex searches
+    over enough data are fanned out to a process pool; `map` keeps results
+    in input order so output never interleaves.
+    """
+    total = 0
+    if matcher.regex is not None and len(paths) > 1:
+        for path in paths:
+            try:
+                total += os.path.getsize(path)
+            except OSError:
+                pass
+
+    done = 0
+    if total >= PARALLEL_GREP_BYTES:
+        jobs = [(path, mode, line_numbers) for path in paths]
+        try:
+            with ProcessPoolExecutor(initializer=_init_grep_worker, initargs=(matcher,)) as pool:
+                for result in pool.map(_grep_in_worker, jobs, chunksize=4):
+                    yield paths[done], result
+                    done += 1
+            return
+        except (OSError, NotImplementedError, BrokenProcessPool):
+            # No process support (e.g. some sandboxes) or a worker died;
+            # search the files not yet reported in-process
+            pass
+
+    for path in paths[done:]:
+        yield path, grep_file(path, matcher, mode, line_numbers)
+
+
+class SearchCommands:
+    """Handles file search commands."""
+
+    def __init__(self, terminal_state, file_index: FileIndex = None):
+        self.state = terminal_state
+        self.index = file_index
+        self.finder = FuzzyFinder(file_index)
+
+    def find(self, args: List[str]) -> str:
+        """Search for files: find [path...] [-name|-iname GLOB] [-type f|d|l] [-size [+-]N[ckMG]]
+        [-mtime [+-]N] [-maxdepth N] [-mindepth N]."""
+        try:
+            paths, query = FindQuery.parse(args)
+        except ValueError as e:
+            return f"find: {str(e)}"
+
+        output = []
+        for path in paths:
+            full_path = self.state.get_full_path(path)
+            if not os.path.lexists(full_path):
+                output.append(f"find: '{path}': No such file or directory")
+                continue
+            output.extend(iter_find(full_path, query, display_root=path, index=self.index))
+
+        return "\n".join(output)
+
+    def grep(self, args: List[str]) -> str:
+        """Search file contents: grep [-r] [-i] [-n] [-c] [-l] [-F] PATTERN [path...].
+        Reads piped input when no path is given."""
+        recursive = ignore_case = line_numbers = count_only = list_only = fixed = False
+        operands = []
+        end_of_options = False
+        
+        for arg in args:
+            if arg == '--' and not end_of_options:
+                end_of_options = True
+            elif arg.startswith('-') and len(arg) > 1 and not end_of_options:
+                for flag in arg[1:]:
+                    if flag in 'rR':
+                        recursive = True
+                    elif flag == 'i':
+                        ignore_case = True
+                    elif flag == 'n':
+                        line_numbers = True
+                    elif flag == 'c':
+                        count_only = True
+                    elif flag == 'l':
+                        list_only = True
+                    elif flag == 'F':
+                        fixed = True
+                    else:
+                        return f"grep: invalid option: {arg}"
+            else:
+                operands.append(arg)
+        
+        if not operands:
+            return "grep: missing pattern"
+        
+        pattern, paths = operands[0], operands[1:]
+        use_stdin = False
+        if not paths:
+            if recursive:
+                paths = ['.']
+            elif self.state.stdin is not None:
+                use_stdin = True
+            else:
+                return "grep: missing file operand"
+        
+        try:
+            matcher = GrepMatcher(pattern, ignore_case=ignore_case, fixed=fixed)
+        except re.error as e:
+            return f"grep: invalid pattern: {str(e)}"
+        
+        mode = 'list' if list_only else 'count' if count_only else 'lines'
+        if use_stdin:
+            data = self.state.stdin.read().encode('utf-8', errors='surrogateescape')
+            results = [("(standard input)", matcher.scan(data, len(data), mode, line_numbers))]
+            return "\n".join(self._format_grep(results, mode, line_numbers, show_names=False))
+        
+        output = []
+        files = []
+        for path in paths:
+            full_path = self.state.get_full_path(path)
+            if os.path.isdir(full_path):
+                if not recursive:
+                    output.append(f"grep: {path}: Is a directory")
+                    continue
+                query = FindQuery()
+                query.entry_predicates.append(lambda entry: entry.is_file(follow_symlinks=False))
+                found = [line for line in iter_find(full_path, query, display_root=path, index=self.index)
+                         if not line.startswith('find: ')]
+                files.extend(sorted(found))
+            else:
+                files.append(path)
+        
+        show_names = recursive or len(files) > 1
+        full_paths = [self.state.get_full_path(path) for path in files]
+        results = ((path, result) for path, (_, result)
+                   in zip(files, iter_grep(full_paths, matcher, mode, line_numbers)))
+        output.extend(self._format_grep(results, mode, line_numbers, show_names))
+        
+        return "\n".join(output)
+    
+    @staticmethod
+    def _format_grep(results, mode: str, line_numbers: bool, show_names: bool) -> Iterator[str]:
+        """Output lines for (name, scan result) pairs."""
+        for path, result in results:
+            if result is None:
+                continue
+            if isinstance(result, str):
+                yield f"grep: {path}: {result}"
+            elif mode == 'list':
+                if result:
+                    yield path
+            elif mode == 'count':
+                yield f"{path}:{result}" if show_names else str(result)
+            else:
+                prefix = f"{path}:" if show_names else ""
+                for lineno, line in result:
+                    text = line.decode('utf-8', errors='replace')
+                    if line_numbers:
+                        yield f"{prefix}{lineno}:{text}"
+                    else:
+                        yield f"{prefix}{text}"
+    
+    def ff(self, args: List[str]) -> str:
+        """Fuzzy-find paths under the current directory: ff [-n K] [-a] [-r] QUERY...
+        Large trees are searched only down to a depth and path-count limit."""
+        limit = 20
+        show_hidden = rebuild = False
+        terms = []
+        
+        i = 0
+        while i < len(args):
+            arg = args[i]
+            if arg == '-n':
+                if i + 1 >= len(args) or not args[i + 1].isdigit():
+                    return "ff: -n requires a number"
+                limit = int(args[i + 1])
+                i += 1
+            elif arg.startswith('-') and len(arg) > 1:
+                for flag in arg[1:]:
+                    if flag == 'a':
+                        show_hidden = True
+                    elif flag == 'r':
+                        rebuild = True
+                    else:
+                        return f"ff: invalid option: {arg}"
+            else:
+                terms.append(arg)
+            i += 1
+        
+        root = self.state.current_directory
+        if rebuild:
+            self.finder.invalidate(root)
+        # Several words are matched as one subsequence, in order
+        query = "".join(terms).replace(" ", "")
+        results = self.finder.search(root, query, limit=limit, show_hidden=show_hidden)
+        output = [path for _, path in results]
+        if self.finder.truncated(root, show_hidden):
+            output.append(f"ff: searched only the first {self.finder.max_candidates} paths; "
+                          f"run from a narrower directory")
+        return "\n".join(output)
+    
+    def locate(self, args: List[str]) -> str:
+        """Look up indexed paths by name: locate [-i] [-e] [-l N] PATTERN..."""
+        ignore_case = existing = False
+        limit = None
+        patterns = []
+        
+        i = 0
+        while i < len(args):
+            arg = args[i]
+            if arg == '-l':
+                if i + 1 >= len(args) or not args[i + 1].isdigit():
+                    return "locate: -l requires a number"
+                limit = int(args[i + 1])
+                i += 1
+            elif arg.startswith('-') and len(arg) > 1:
+                for flag in arg[1:]:
+                    if flag == 'i':
+                        ignore_case = True
+                    elif flag == 'e':
+                        existing = True
+                    else:
+                        return f"locate: invalid option: {arg}"
+            else:
+                patterns.append(arg)
+            i += 1
+        
+        if not patterns:
+            return "locate: no pattern to search for specified"
+        if self.index is None or not self.index.roots():
+            return "locate: no indexed roots (use updatedb --add PATH)"
+        
+        output = []
+        for pattern in patterns:
+            for path in self.index.locate(pattern, ignore_case=ignore_case):
+                if existing and not os.path.lexists(path):
+                    continue
+                output.append(path)
+                if limit is not None and len(output) >= limit:
+                    return "\n".join(output)
+        return "\n".join(output)
+    
+    def updatedb(self, args: List[str]) -> str:
+        """Manage the file index: updatedb [--add PATH] [--remove PATH] [--status]."""
+        if self.index is None:
+            return "updatedb: no file index configured"
+        
+        if args and args[0] == '--status':
+            roots = self.index.roots()
+            if not roots:
+                return "updatedb: no indexed roots"
+            dirs, entries = self.index.stats()
+            output = [f"{len(roots)} root(s), {dirs} directories, {entries} entries"]
+            output.extend(roots)
+            return "\n".join(output)
+        
+        if args and args[0] in ('--add', '--remove'):
+            if len(args) < 2:
+                return f"updatedb: option '{args[0]}' requires an argument"
+            output = []
+            for path in args[1:]:
+                full_path = self.state.get_full_path(path)
+                if args[0] == '--remove':
+                    self.index.remove_root(full_path)
+                    continue
+                if not os.path.isdir(full_path):
+                    output.append(f"updatedb: {path}: Not a directory")
+                    continue
+                self.index.add_root(full_path)
+                rescanned, _ = self.index.refresh(full_path)
+                output.append(f"Indexed {full_path} ({rescanned} directories)")
+            if args[0] == '--add' and self.index.roots():
+                self.index.start_background()
+            return "\n".join(output)
+        
+        if args:
+            return f"updatedb: invalid option: {args[0]}"
+        if not self.index.roots():
+            return "updatedb: no indexed roots (use updatedb --add PATH)"
+        rescanned, unchanged = self.index.refresh()
+        return f"Rescanned {rescanned} directories, {unchanged} unchanged"
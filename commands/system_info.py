@@ -11,209 +11,432 @@ from datetime import datetime
 # Handle both relative and absolute imports
 try:
     from .base import BaseCommand
+    from ..utils.columns import format_table, terminal_width, truncate
+    from ..utils.processes import (ProcessScanner, build_tree, current_uid, parse_sort,
+                                   resolve_uid, sort_processes, subtree_totals)
+    from ..utils.sampler import SystemSampler, shared_sampler
+    from ..utils.metrics import MetricsRecorder, shared_recorder
+    from ..utils.mounts import DEFAULT_TTL, TIMED_OUT, MountTable, shared_mount_table
+    from ..utils.telemetry import telemetry
+    from ..utils.screen import KeyReader, LiveScreen
 except ImportError:
     # Fallback for absolute imports when running directly
     from commands.base import BaseCommand
+    from utils.columns import format_table, terminal_width, truncate
+    from utils.processes import (ProcessScanner, build_tree, current_uid, parse_sort,
+                                 resolve_uid, sort_processes, subtree_totals)
+    from utils.sampler import SystemSampler, shared_sampler
+    from utils.metrics import MetricsRecorder, shared_recorder
+    from utils.mounts import DEFAULT_TTL, TIMED_OUT, MountTable, shared_mount_table
+    from utils.telemetry import telemetry
+    from utils.screen import KeyReader, LiveScreen
+
+
+# top -o keys (and their interactive hotkeys) with the --sort spec each means
+TOP_SORT_KEYS = {'cpu': '-cpu', 'mem': '-mem', 'pid': 'pid'}
+TOP_HOTKEYS = {'P': 'cpu', 'M': 'mem', 'N': 'pid'}
 
 
 class SystemInfo:
     """Handles system information and monitoring commands."""
     
+    def __init__(self, terminal_state=None, sampler: SystemSampler = None,
+                 recorder: MetricsRecorder = None, mounts: MountTable = None):
+        self.state = terminal_state
+        # Statistics come from the latest background sample, never a blocking interval
+        self.sampler = sampler if sampler is not None else shared_sampler()
+        # History for sar, recorded from startup
+        self.recorder = recorder if recorder is not None else shared_recorder()
+        # Mount list and usage for df, cached between calls
+        self.mounts = mounts if mounts is not None else shared_mount_table()
+        self._register_host_gauges()
+    
+    def _width(self) -> int:
+        """Output width of the session, or of the attached terminal."""
+        return self.state.terminal_width() if self.state is not None else terminal_width()
+    
     def ps(self, args: List[str]) -> str:
-        """Show running processes."""
+        """Show processes: ps [-a] [-f] [-u USER[,USER]] [-p PID[,PID]] [--sort [-]KEY[,KEY]]."""
         try:
             # Parse arguments
             show_all = False
             show_full = False
+            users = None
+            pids = None
+            sort_keys = None
             
-            for arg in args:
-                if arg in ['-a', '-A']:
+            i = 0
+            while i < len(args):
+                arg = args[i]
+                if arg in ['-a', '-A', '-e']:
                     show_all = True
                 elif arg in ['-f', '--full']:
                     show_full = True
+                elif arg in ['-u', '-p', '--sort'] or arg.startswith('--sort='):
+                    if '=' in arg:
+                        value = arg.split('=', 1)[1]
+                    elif i + 1 < len(args):
+                        i += 1
+                        value = args[i]
+                    else:
+                        return f"ps: option '{arg}' requires an argument"
+                    if arg == '-u':
+                        users = [user for user in value.split(',') if user]
+                    elif arg == '-p':
+                        if not all(pid.isdigit() for pid in value.split(',')):
+                            return f"ps: invalid process id: {value}"
+                        pids = [int(pid) for pid in value.split(',')]
+                    else:
+                        try:
+                            sort_keys = parse_sort(value)
+                        except ValueError as e:
+                            return f"ps: {str(e)}"
                 elif arg.startswith('-'):
                     return f"ps: invalid option: {arg}"
+                i += 1
             
-            # Get processes
-            processes = []
-            for proc in psutil.process_iter(['pid', 'name', 'username', 'cpu_percent', 'memory_percent', 'status', 'cmdline']):
-                try:
-                    pinfo = proc.info
-                    
-                    # Filter out system processes if not showing all
-                    if not show_all and pinfo['username'] != psutil.Process().username():
-                        continue
-                    
-                    processes.append(pinfo)
-                except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
-                    pass
+            # Resolve user names to uids once, before the scan
+            uids = None
+            if users is not None:
+                uids = []
+                for user in users:
+                    uid = resolve_uid(user)
+                    if uid is None:
+                        return f"ps: user name does not exist: {user}"
+                    uids.append(uid)
+            elif pids is None and not show_all and current_uid() is not None:
+                uids = [current_uid()]
+            
+            processes = self._processes(pids, uids, show_full)
+            if sort_keys:
+                sort_processes(processes, sort_keys)
             
             # Format output
+            rows = []
             if show_full:
-                header = f"{'PID':<8} {'USER':<12} {'CPU%':<6} {'MEM%':<6} {'STAT':<8} {'COMMAND'}"
-                lines = [header]
-                lines.append("-" * 80)
-                
                 for proc in processes:
-                    pid = proc['pid']
-                    user = proc['username'] or '?'
-                    cpu = f"{proc['cpu_percent']:.1f}" if proc['cpu_percent'] else "0.0"
-                    mem = f"{proc['memory_percent']:.1f}" if proc['memory_percent'] else "0.0"
-                    status = proc['status'] or '?'
-                    
-                    if proc['cmdline']:
-                        cmd = ' '.join(proc['cmdline'])
-                    else:
-                        cmd = proc['name'] or '?'
-                    
-                    # Truncate command if too long
-                    if len(cmd) > 40:
-                        cmd = cmd[:37] + "..."
-                    
-                    lines.append(f"{pid:<8} {user:<12} {cpu:<6} {mem:<6} {status:<8} {cmd}")
-            else:
-                header = f"{'PID':<8} {'NAME':<20} {'STATUS':<10}"
-                lines = [header]
-                lines.append("-" * 40)
+                    cmd = ' '.join(proc.cmdline).replace('\n', ' ') if proc.cmdline else proc.name or '?'
+                    rows.append((str(proc.pid), proc.user, f"{proc.cpu_percent:.1f}",
+                                 f"{proc.memory_percent:.1f}", proc.status or '?', cmd))
                 
-                for proc in processes:
-                    pid = proc['pid']
-                    name = proc['name'] or '?'
-                    status = proc['status'] or '?'
-                    
-                    # Truncate name if too long
-                    if len(name) > 18:
-                        name = name[:15] + "..."
-                    
-                    lines.append(f"{pid:<8} {name:<20} {status:<10}")
+                # The command column is cut to whatever width remains
+                return format_table(rows, headers=('PID', 'USER', 'CPU%', 'MEM%', 'STAT', 'COMMAND'),
+                                    align='><>><<', width=self._width())
             
-            return "\n".join(lines)
+            for proc in processes:
+                rows.append((str(proc.pid), proc.name or '?', proc.status or '?'))
+            return format_table(rows, headers=('PID', 'NAME', 'STATUS'), align='><<')
         except Exception as e:
             return f"ps: {str(e)}"
     
-    def top(self, args: List[str]) -> str:
-        """Show system resource usage."""
+    def _processes(self, pids, uids, with_cmdline: bool):
+        """Matching processes from the latest sample; pids it predates are read directly."""
+        snapshot = self.sampler.latest()
+        pid_filter = set(pids) if pids is not None else None
+        uid_filter = set(uids) if uids is not None else None
+        processes = [proc for proc in snapshot.processes
+                     if (pid_filter is None or proc.pid in pid_filter)
+                     and (uid_filter is None or proc.uid in uid_filter)]
+        if pid_filter is not None:
+            missing = pid_filter.difference(proc.pid for proc in processes)
+            if missing:
+                processes.extend(ProcessScanner().scan(pids=sorted(missing), uids=uids))
+        
+        if with_cmdline:
+            for i, proc in enumerate(processes):
+                try:
+                    processes[i] = proc._replace(cmdline=psutil.Process(proc.pid).cmdline())
+                except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+                    pass
+        return processes
+    
+    def pstree(self, args: List[str]) -> str:
+        """Show processes as a tree: pstree [-p] [-r] [PID]. -r sums CPU/MEM per subtree."""
         try:
-            # Get system information
-            cpu_percent = psutil.cpu_percent(interval=0.1)
-            memory = psutil.virtual_memory()
-            disk = psutil.disk_usage('/')
-            boot_time = datetime.fromtimestamp(psutil.boot_time())
-            uptime = datetime.now() - boot_time
+            # Parse arguments
+            show_pids = False
+            rollup = False
+            root = None
             
-            # Get load averages (Unix-like systems)
-            try:
-                load_avg = os.getloadavg()
-                load_str = f"Load average: {load_avg[0]:.2f}, {load_avg[1]:.2f}, {load_avg[2]:.2f}"
-            except (OSError, AttributeError):
-                # Windows doesn't have load averages
-                load_str = "Load average: N/A (Windows)"
+            for arg in args:
+                if arg == '--rollup':
+                    rollup = True
+                elif arg.startswith('-') and len(arg) > 1:
+                    for flag in arg[1:]:
+                        if flag == 'p':
+                            show_pids = True
+                        elif flag == 'r':
+                            rollup = True
+                        else:
+                            return f"pstree: invalid option: -{flag}"
+                elif arg.isdigit() and root is None:
+                    root = int(arg)
+                else:
+                    return f"pstree: invalid process id: {arg}"
             
-            # Format uptime
-            days = uptime.days
-            hours, remainder = divmod(uptime.seconds, 3600)
-            minutes, _ = divmod(remainder, 60)
-            uptime_str = f"{days} days, {hours:02d}:{minutes:02d}"
+            # One batched snapshot of pid, ppid and name gives the whole graph
+            by_pid, children, roots = build_tree(self.sampler.latest().processes)
+            if root is not None:
+                if root not in by_pid:
+                    return f"pstree: no such process: {root}"
+                roots = [root]
             
-            # System summary
-            output = []
-            output.append(f"System: {platform.system()} {platform.release()}")
-            output.append(f"Uptime: {uptime_str}")
-            output.append(f"Current time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-            output.append("")
-            output.append(f"CPU Usage: {cpu_percent}%")
-            output.append(f"Memory Usage: {memory.percent}% ({self._format_bytes(memory.used)}/{self._format_bytes(memory.total)})")
-            output.append(f"Disk Usage: {disk.percent}% ({self._format_bytes(disk.used)}/{self._format_bytes(disk.total)})")
-            output.append(load_str)
-            output.append("")
+            width = self._width()
+            lines = []
+            for pid in roots:
+                totals = subtree_totals(pid, by_pid, children) if rollup else None
+                for line in self._tree_lines(pid, by_pid, children, show_pids, totals):
+                    lines.append(truncate(line, width))
+            return "\n".join(lines)
+        except Exception as e:
+            return f"pstree: {str(e)}"
+    
+    def _tree_lines(self, root: int, by_pid, children, show_pids: bool, totals) -> List[str]:
+        """
+        Draw the tree below `root`, iteratively so any depth is fine.
+        
+        Without pids or totals to tell them apart, sibling leaves with the
+        same name are merged into one "N*[name]" line, as pstree does.
+        """
+        lines = []
+        stack = [(root, 1, '', '')]
+        while stack:
+            pid, count, branch, indent = stack.pop()
+            proc = by_pid[pid]
+            label = proc.name or '?'
+            if count > 1:
+                label = f"{count}*[{label}]"
+            if show_pids:
+                label += f"({pid})"
+            if totals is not None:
+                cpu, mem = totals[pid]
+                label += f" [cpu {cpu:.1f}% mem {mem:.1f}%]"
+            lines.append(branch + label)
             
-            # Top processes by CPU
-            output.append("Top Processes by CPU:")
-            output.append(f"{'PID':<8} {'NAME':<20} {'CPU%':<8} {'MEM%':<8}")
-            output.append("-" * 50)
+            # Group leaf siblings by name, keeping first-seen order
+            items = []
+            leaves = {}
+            for child in children.get(pid, ()):
+                if show_pids or totals is not None or child in children:
+                    items.append([child, 1])
+                    continue
+                name = by_pid[child].name
+                if name in leaves:
+                    leaves[name][1] += 1
+                else:
+                    leaves[name] = [child, 1]
+                    items.append(leaves[name])
             
-            # Get top processes
-            processes = []
-            for proc in psutil.process_iter(['pid', 'name', 'cpu_percent', 'memory_percent']):
-                try:
-                    pinfo = proc.info
-                    pinfo['cpu_percent'] = proc.cpu_percent()
-                    if pinfo['cpu_percent'] is not None:
-                        processes.append(pinfo)
-                except (psutil.NoSuchProcess, psutil.AccessDenied):
-                    pass
+            # Push in reverse so the first child is drawn first
+            for i in range(len(items) - 1, -1, -1):
+                last = i == len(items) - 1
+                child, child_count = items[i]
+                stack.append((child, child_count, indent + ('└─ ' if last else '├─ '),
+                              indent + ('   ' if last else '│  ')))
+        return lines
+    
+    def top(self, args: List[str]) -> str:
+        """Show system resource usage: top [-d SECS] [-n FRAMES] [-o cpu|mem|pid]."""
+        try:
+            # Parse arguments
+            delay = None
+            frames = None
+            sort = 'cpu'
             
-            # Sort by CPU usage
-            processes.sort(key=lambda x: x['cpu_percent'] or 0, reverse=True)
+            i = 0
+            while i < len(args):
+                arg = args[i]
+                if arg in ['-d', '-n', '-o']:
+                    if i + 1 >= len(args):
+                        return f"top: option '{arg}' requires an argument"
+                    i += 1
+                    value = args[i]
+                    if arg == '-o':
+                        sort = value.lower()
+                        if sort not in TOP_SORT_KEYS:
+                            return f"top: unknown sort key '{value}'"
+                    elif arg == '-d':
+                        try:
+                            delay = float(value)
+                        except ValueError:
+                            delay = -1
+                        if delay <= 0:
+                            return f"top: invalid delay: {value}"
+                    else:
+                        if not value.isdigit() or int(value) < 1:
+                            return f"top: invalid number of frames: {value}"
+                        frames = int(value)
+                elif arg.startswith('-'):
+                    return f"top: invalid option: {arg}"
+                i += 1
             
-            # Show top 10
-            for proc in processes[:10]:
-                pid = proc['pid']
-                name = proc['name'][:18] if proc['name'] else '?'
-                cpu = f"{proc['cpu_percent']:.1f}" if proc['cpu_percent'] else "0.0"
-                mem = f"{proc['memory_percent']:.1f}" if proc['memory_percent'] else "0.0"
-                
-                output.append(f"{pid:<8} {name:<20} {cpu:<8} {mem:<8}")
+            if delay is None and frames is None:
+                # One frame from the shared background sample
+                return "\n".join(self._top_frame(self.sampler.latest(), sort, 10))
             
-            return "\n".join(output)
+            # A private sampler, so CPU% covers exactly the time between frames
+            sampler = SystemSampler(interval=delay or 1.0)
+            tty = self.state.tty if self.state is not None else None
+            if tty is not None:
+                return self._top_live(sampler, tty, sort, frames)
+            
+            # Batch mode: successive frames one after another
+            output = []
+            for frame in range(frames or 1):
+                if frame:
+                    time.sleep(sampler.interval)
+                output.append("\n".join(self._top_frame(sampler.sample(), sort, 10)))
+            return "\n\n".join(output)
         except Exception as e:
             return f"top: {str(e)}"
     
+    def _top_live(self, sampler: SystemSampler, tty, sort: str, frames) -> str:
+        """
+        Redraw top in place every interval until 'q', Ctrl+C or `frames` frames.
+        
+        P, M and N re-sort by CPU, memory and PID at once, from the frame's
+        own sample. Each frame costs one process table pass.
+        """
+        shown = 0
+        try:
+            with LiveScreen(tty) as screen, KeyReader() as keys:
+                while True:
+                    snapshot = sampler.sample()
+                    screen.draw(self._top_frame(snapshot, sort, screen.size().lines))
+                    shown += 1
+                    if frames is not None and shown >= frames:
+                        break
+                    
+                    # Wait out the interval, reacting to keys as they come
+                    deadline = time.monotonic() + sampler.interval
+                    remaining = sampler.interval
+                    while remaining > 0:
+                        key = keys.read(remaining)
+                        if key is None:
+                            break
+                        if key in ('q', 'Q'):
+                            return ""
+                        if key in TOP_HOTKEYS:
+                            sort = TOP_HOTKEYS[key]
+                            screen.draw(self._top_frame(snapshot, sort, screen.size().lines))
+                        remaining = deadline - time.monotonic()
+        except KeyboardInterrupt:
+            pass
+        return ""
+    
+    def _top_frame(self, snapshot, sort: str, limit: int) -> List[str]:
+        """Lines of one top frame, with at most `limit` processes."""
+        memory = snapshot.memory
+        disk = snapshot.disk
+        boot_time = datetime.fromtimestamp(snapshot.boot_time)
+        uptime = datetime.now() - boot_time
+        
+        # Get load averages (Unix-like systems)
+        if snapshot.load_avg is not None:
+            load_avg = snapshot.load_avg
+            load_str = f"Load average: {load_avg[0]:.2f}, {load_avg[1]:.2f}, {load_avg[2]:.2f}"
+        else:
+            # Windows doesn't have load averages
+            load_str = "Load average: N/A (Windows)"
+        
+        # Format uptime
+        days = uptime.days
+        hours, remainder = divmod(uptime.seconds, 3600)
+        minutes, _ = divmod(remainder, 60)
+        uptime_str = f"{days} days, {hours:02d}:{minutes:02d}"
+        
+        # System summary
+        output = []
+        output.append(f"System: {platform.system()} {platform.release()}")
+        output.append(f"Uptime: {uptime_str}")
+        output.append(f"Current time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        output.append("")
+        output.append(f"CPU Usage: {snapshot.cpu_percent}%")
+        output.append(f"Memory Usage: {memory.percent}% ({self._format_bytes(memory.used)}/{self._format_bytes(memory.total)})")
+        if disk is not None:
+            output.append(f"Disk Usage: {disk.percent}% ({self._format_bytes(disk.used)}/{self._format_bytes(disk.total)})")
+        output.append(load_str)
+        output.append("")
+        
+        # Top processes by CPU
+        output.append(f"Top Processes by {sort.upper()}:")
+        output.append(f"{'PID':<8} {'NAME':<20} {'CPU%':<8} {'MEM%':<8}")
+        output.append("-" * 50)
+        
+        # CPU% covers the interval since the sample before this one
+        processes = sort_processes(list(snapshot.processes), parse_sort(TOP_SORT_KEYS[sort]))
+        
+        for proc in processes[:limit]:
+            name = proc.name[:18] if proc.name else '?'
+            output.append(f"{proc.pid:<8} {name:<20} {proc.cpu_percent:<8.1f} {proc.memory_percent:<8.1f}")
+        
+        return output
+    
     def df(self, args: List[str]) -> str:
-        """Show disk space usage."""
+        """Show disk space usage: df [-h] [--ttl SECS]. Results up to SECS old are reused."""
         try:
             # Parse arguments
             human_readable = False
+            ttl = DEFAULT_TTL
             
-            for arg in args:
+            i = 0
+            while i < len(args):
+                arg = args[i]
                 if arg in ['-h', '--human-readable']:
                     human_readable = True
+                elif arg == '--ttl' or arg.startswith('--ttl='):
+                    if '=' in arg:
+                        value = arg.split('=', 1)[1]
+                    elif i + 1 < len(args):
+                        i += 1
+                        value = args[i]
+                    else:
+                        return "df: option '--ttl' requires an argument"
+                    try:
+                        ttl = float(value)
+                    except ValueError:
+                        ttl = -1
+                    if ttl < 0:
+                        return f"df: invalid cache TTL: {value}"
                 elif arg.startswith('-'):
                     return f"df: invalid option: {arg}"
+                i += 1
             
             # Get disk usage information
-            output = []
+            rows = []
             if human_readable:
-                header = f"{'Filesystem':<20} {'Size':<8} {'Used':<8} {'Avail':<8} {'Use%':<6} {'Mounted on'}"
+                headers = ('Filesystem', 'Size', 'Used', 'Avail', 'Use%', 'Mounted on')
             else:
-                header = f"{'Filesystem':<20} {'1K-blocks':<12} {'Used':<12} {'Available':<12} {'Use%':<6} {'Mounted on'}"
+                headers = ('Filesystem', '1K-blocks', 'Used', 'Available', 'Use%', 'Mounted on')
             
-            output.append(header)
-            output.append("-" * 80)
+            # Mounts are re-read only when the mount table changes, and every
+            # mount is queried concurrently so a dead one can't stall the rest
+            mounts = self.mounts.mounts(ttl)
             
-            # Get all disk partitions
-            partitions = psutil.disk_partitions()
-            
-            for partition in partitions:
-                try:
-                    usage = psutil.disk_usage(partition.mountpoint)
-                    
-                    filesystem = partition.device
-                    if len(filesystem) > 18:
-                        filesystem = filesystem[:15] + "..."
-                    
-                    if human_readable:
-                        size = self._format_bytes(usage.total)
-                        used = self._format_bytes(usage.used)
-                        avail = self._format_bytes(usage.free)
-                    else:
-                        size = str(usage.total // 1024)
-                        used = str(usage.used // 1024)
-                        avail = str(usage.free // 1024)
-                    
-                    percent = f"{usage.percent:.0f}%"
-                    mountpoint = partition.mountpoint
-                    
-                    if human_readable:
-                        output.append(f"{filesystem:<20} {size:<8} {used:<8} {avail:<8} {percent:<6} {mountpoint}")
-                    else:
-                        output.append(f"{filesystem:<20} {size:<12} {used:<12} {avail:<12} {percent:<6} {mountpoint}")
+            for partition, usage in self.mounts.usage(mounts, ttl):
+                filesystem = partition.device
+                mountpoint = partition.mountpoint
                 
-                except (PermissionError, OSError):
+                if usage is None:
                     # Skip inaccessible partitions
                     continue
+                if usage is TIMED_OUT:
+                    rows.append((filesystem, '?', '?', '?', '-', mountpoint))
+                    continue
+                
+                if human_readable:
+                    size = self._format_bytes(usage.total)
+                    used = self._format_bytes(usage.used)
+                    avail = self._format_bytes(usage.free)
+                else:
+                    size = str(usage.total // 1024)
+                    used = str(usage.used // 1024)
+                    avail = str(usage.free // 1024)
+                
+                percent = f"{usage.percent:.0f}%"
+                rows.append((filesystem, size, used, avail, percent, mountpoint))
             
-            return "\n".join(output)
+            return format_table(rows, headers=headers, align='<>>>><')
         except Exception as e:
             return f"df: {str(e)}"
     
@@ -230,8 +453,9 @@ class SystemInfo:
                     return f"free: invalid option: {arg}"
             
             # Get memory information
-            memory = psutil.virtual_memory()
-            swap = psutil.swap_memory()
+            snapshot = self.sampler.latest()
+            memory = snapshot.memory
+            swap = snapshot.swap
             
             if human_readable:
                 # Human readable format
@@ -276,6 +500,88 @@ class SystemInfo:
         except Exception as e:
             return f"free: {str(e)}"
     
+    def sar(self, args: List[str]) -> str:
+        """Show recorded CPU, memory, disk and load history: sar [-w MINUTES] [-n ROWS]."""
+        try:
+            # Parse arguments
+            minutes = 60.0
+            rows = 12
+            
+            i = 0
+            while i < len(args):
+                arg = args[i]
+                if arg in ['-w', '-n']:
+                    if i + 1 >= len(args):
+                        return f"sar: option '{arg}' requires an argument"
+                    i += 1
+                    value = args[i]
+                    try:
+                        number = float(value) if arg == '-w' else int(value)
+                    except ValueError:
+                        number = 0
+                    if number <= 0:
+                        return f"sar: invalid value for {arg}: {value}"
+                    if arg == '-w':
+                        minutes = number
+                    else:
+                        rows = number
+                elif arg.startswith('-'):
+                    return f"sar: invalid option: {arg}"
+                i += 1
+            
+            buckets = self.recorder.downsample(rows, minutes * 60)
+            if not buckets:
+                return f"sar: no samples recorded yet (one every {self.recorder.interval:g}s)"
+            
+            table = []
+            for bucket in buckets:
+                table.append((datetime.fromtimestamp(bucket['time']).strftime('%H:%M:%S'),
+                              f"{bucket['cpu'][1]:.1f}", f"{bucket['cpu'][2]:.1f}",
+                              f"{bucket['mem'][1]:.1f}", f"{bucket['swap'][1]:.1f}",
+                              f"{bucket['disk'][1]:.1f}", f"{bucket['load1'][1]:.2f}"))
+            
+            # Overall averages over the whole window, as sar prints last
+            overall = self.recorder.downsample(1, minutes * 60)[0]
+            table.append(('Average:', f"{overall['cpu'][1]:.1f}", f"{overall['cpu'][2]:.1f}",
+                          f"{overall['mem'][1]:.1f}", f"{overall['swap'][1]:.1f}",
+                          f"{overall['disk'][1]:.1f}", f"{overall['load1'][1]:.2f}"))
+            return format_table(table, headers=('TIME', '%CPU', 'MAX', '%MEM', '%SWAP', '%DISK', 'LOAD1'),
+                                align='<>>>>>>', separator='  ')
+        except Exception as e:
+            return f"sar: {str(e)}"
+    
+    def metrics(self, args: List[str]) -> str:
+        """Export command, cache, session and host metrics in OpenMetrics text format."""
+        if args:
+            return f"metrics: invalid option: {args[0]}"
+        return telemetry.render().rstrip("\n")
+    
+    def _register_host_gauges(self):
+        """Publish host statistics from the latest sample alongside the terminal's own."""
+        def gauge(name, help_text, read):
+            def collect():
+                value = read(self.sampler.latest())
+                if value is None:
+                    return []
+                return value if isinstance(value, list) else [({}, value)]
+            telemetry.register_gauge(name, help_text, collect)
+        
+        gauge('host_cpu_usage_percent', "Host CPU busy over the last sample interval.",
+              lambda s: s.cpu_percent)
+        gauge('host_memory_total_bytes', "Physical memory.", lambda s: s.memory.total)
+        gauge('host_memory_available_bytes', "Memory available without swapping.",
+              lambda s: s.memory.available)
+        gauge('host_memory_used_bytes', "Memory in use.", lambda s: s.memory.used)
+        gauge('host_swap_used_bytes', "Swap in use.", lambda s: s.swap.used)
+        gauge('host_disk_total_bytes', "Size of the root filesystem.",
+              lambda s: [({'mountpoint': '/'}, s.disk.total)] if s.disk else None)
+        gauge('host_disk_used_bytes', "Space used on the root filesystem.",
+              lambda s: [({'mountpoint': '/'}, s.disk.used)] if s.disk else None)
+        gauge('host_load_average', "System load average.",
+              lambda s: [({'period': period}, load) for period, load
+                         in zip(('1m', '5m', '15m'), s.load_avg)] if s.load_avg else None)
+        gauge('host_processes', "Processes in the latest sample.", lambda s: len(s.processes))
+    
     def whoami(self, args: List[str]) -> str:
         """Show current user."""
         try:
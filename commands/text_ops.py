@@ -0,0 +1,317 @@
+"""
+Text processing commands - sort, uniq, wc and diff over files or piped input.
+"""
+import itertools
+import os
+from datetime import datetime
+from typing import Iterator, List, Optional, Tuple
+
+# Handle both relative and absolute imports
+try:
+    from ..utils.external_sort import ExternalSorter, DEFAULT_MEMORY_LIMIT, field_key, numeric_key
+    from ..utils.diff import unified_diff
+except ImportError:
+    # Fallback for absolute imports when running directly
+    from utils.external_sort import ExternalSorter, DEFAULT_MEMORY_LIMIT, field_key, numeric_key
+    from utils.diff import unified_diff
+
+
+# Read size for wc's byte-level counting
+WC_CHUNK_SIZE = 1024 * 1024
+
+SIZE_SUFFIXES = {'K': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3}
+
+
+class TextCommands:
+    """Handles line-oriented text commands."""
+
+    def __init__(self, terminal_state):
+        self.state = terminal_state
+
+    def _iter_lines(self, files: List[str]) -> Iterator[str]:
+        """Stream lines from the given files, or from piped input when none are given."""
+        if not files:
+            if self.state.stdin is None:
+                raise ValueError("missing file operand")
+            yield from self.state.stdin
+            return
+
+        for filename in files:
+            full_path = self.state.get_full_path(filename)
+            if os.path.isdir(full_path):
+                raise ValueError(f"{filename}: Is a directory")
+            try:
+                with open(full_path, 'r', encoding='utf-8', errors='replace') as f:
+                    yield from f
+            except FileNotFoundError:
+                raise ValueError(f"{filename}: No such file or directory")
+
+    def sort(self, args: List[str]) -> str:
+        """Sort lines: sort [-n] [-r] [-u] [-k N[,M]] [-S SIZE] [file...]. Spills to disk past SIZE."""
+        numeric = reverse = unique = False
+        key_fields = None
+        memory_limit = DEFAULT_MEMORY_LIMIT
+        files = []
+
+        i = 0
+        while i < len(args):
+            arg = args[i]
+            if arg in ('-k', '-S'):
+                if i + 1 >= len(args):
+                    return f"sort: option requires an argument -- '{arg[1]}'"
+                i += 1
+                value = args[i]
+                if arg == '-k':
+                    key_fields = _parse_key(value)
+                    if key_fields is None:
+                        return f"sort: invalid field specification '{value}'"
+                else:
+                    memory_limit = _parse_size(value)
+                    if memory_limit is None:
+                        return f"sort: invalid buffer size '{value}'"
+            elif arg.startswith('-') and len(arg) > 1:
+                for flag in arg[1:]:
+                    if flag == 'n':
+                        numeric = True
+                    elif flag == 'r':
+                        reverse = True
+                    elif flag == 'u':
+                        unique = True
+                    else:
+                        return f"sort: invalid option: {arg}"
+            else:
+                files.append(arg)
+            i += 1
+
+        key = field_key(*key_fields) if key_fields else None
+        if numeric:
+            key = numeric_key(key)
+
+        sorter = ExternalSorter(key=key, reverse=reverse, unique=unique, memory_limit=memory_limit)
+        lines = sorter.sort(self._iter_lines(files))
+        try:
+            # The first line comes only after all input is read, so input errors surface here
+            first = next(lines, None)
+        except ValueError as e:
+            return f"sort: {str(e)}"
+        if first is None:
+            return ""
+        if self.state.streaming:
+            # Hand the merge to the redirect or next stage line by line, so
+            # only the -S buffer and the merge heads are ever in memory
+            return itertools.chain([first], lines)
+        return "\n".join(itertools.chain([first], lines))
+
+    def uniq(self, args: List[str]) -> str:
+        """Collapse adjacent duplicate lines: uniq [-c] [-d] [-u] [file]."""
+        count = only_dups = only_unique = False
+        files = []
+        for arg in args:
+            if arg.startswith('-') and len(arg) > 1:
+                for flag in arg[1:]:
+                    if flag == 'c':
+                        count = True
+                    elif flag == 'd':
+                        only_dups = True
+                    elif flag == 'u':
+                        only_unique = True
+                    else:
+                        return f"uniq: invalid option: {arg}"
+            else:
+                files.append(arg)
+
+        output = []
+
+        def flush(line: str, n: int):
+            if (only_dups and n < 2) or (only_unique and n > 1):
+                return
+            output.append(f"{n:>7} {line}" if count else line)
+
+        try:
+            previous = None
+            run = 0
+            for line in self._iter_lines(files):
+                line = line.rstrip('\n')
+                if line == previous:
+                    run += 1
+                    continue
+                if previous is not None:
+                    flush(previous, run)
+                previous = line
+                run = 1
+            if previous is not None:
+                flush(previous, run)
+        except ValueError as e:
+            return f"uniq: {str(e)}"
+
+        return "\n".join(output)
+
+    def wc(self, args: List[str]) -> str:
+        """Count lines, words and bytes: wc [-l] [-w] [-c] [file...]."""
+        show_lines = show_words = show_bytes = False
+        files = []
+        for arg in args:
+            if arg.startswith('-') and len(arg) > 1:
+                for flag in arg[1:]:
+                    if flag == 'l':
+                        show_lines = True
+                    elif flag == 'w':
+                        show_words = True
+                    elif flag == 'c':
+                        show_bytes = True
+                    else:
+                        return f"wc: invalid option: {arg}"
+            else:
+                files.append(arg)
+
+        if not (show_lines or show_words or show_bytes):
+            show_lines = show_words = show_bytes = True
+
+        def format_counts(counts: Tuple[int, int, int], name: str) -> str:
+            fields = []
+            for shown, value in zip((show_lines, show_words, show_bytes), counts):
+                if shown:
+                    fields.append(f"{value:>7}")
+            if name:
+                fields.append(name)
+            return " ".join(fields)
+
+        if not files:
+            if self.state.stdin is None:
+                return "wc: missing file operand"
+            return format_counts(_count_stream(self.state.stdin, show_words), "")
+
+        output = []
+        totals = [0, 0, 0]
+        for filename in files:
+            full_path = self.state.get_full_path(filename)
+            try:
+                counts = count_file(full_path, show_words)
+            except IsADirectoryError:
+                output.append(f"wc: {filename}: Is a directory")
+                continue
+            except FileNotFoundError:
+                output.append(f"wc: {filename}: No such file or directory")
+                continue
+            except OSError as e:
+                output.append(f"wc: {filename}: {e.strerror or e}")
+                continue
+            totals = [a + b for a, b in zip(totals, counts)]
+            output.append(format_counts(counts, filename))
+
+        if len(files) > 1:
+            output.append(format_counts(tuple(totals), "total"))
+        return "\n".join(output)
+
+    def diff(self, args: List[str]) -> str:
+        """Compare two files line by line: diff [-q] [-u] [-U N] FILE1 FILE2."""
+        brief = False
+        context = 3
+        files = []
+        
+        i = 0
+        while i < len(args):
+            arg = args[i]
+            if arg in ('-q', '--brief'):
+                brief = True
+            elif arg == '-u':
+                pass  # unified is the only output format
+            elif arg == '-U' or arg.startswith('-U'):
+                value = arg[2:] or (args[i + 1] if i + 1 < len(args) else '')
+                if not arg[2:]:
+                    i += 1
+                if not value.isdigit():
+                    return f"diff: invalid context length '{value}'"
+                context = int(value)
+            elif arg.startswith('-') and len(arg) > 1:
+                return f"diff: invalid option: {arg}"
+            else:
+                files.append(arg)
+            i += 1
+        
+        if len(files) != 2:
+            return "diff: expected two file operands"
+        
+        contents = []
+        stats = []
+        for filename in files:
+            full_path = self.state.get_full_path(filename)
+            try:
+                with open(full_path, 'rb') as f:
+                    contents.append(f.read())
+                    stats.append(os.fstat(f.fileno()))
+            except IsADirectoryError:
+                return f"diff: {filename}: Is a directory"
+            except FileNotFoundError:
+                return f"diff: {filename}: No such file or directory"
+            except OSError as e:
+                return f"diff: {filename}: {e.strerror or e}"
+        
+        # Identical bytes need no line work at all
+        if contents[0] == contents[1]:
+            return ""
+        if brief:
+            return f"Files {files[0]} and {files[1]} differ"
+        
+        a_lines = contents[0].decode('utf-8', errors='replace').splitlines(keepends=True)
+        b_lines = contents[1].decode('utf-8', errors='replace').splitlines(keepends=True)
+        labels = [f"{name}\t{datetime.fromtimestamp(st.st_mtime).strftime('%Y-%m-%d %H:%M:%S.%f')}"
+                  for name, st in zip(files, stats)]
+        return "\n".join(unified_diff(a_lines, b_lines, labels[0], labels[1], context))
+
+
+def count_file(path: str, count_words: bool = True) -> Tuple[int, int, int]:
+    """
+    Count (lines, words, bytes) of a file without decoding it.
+
+    Lines are counted with `bytes.count` over large chunks; words are only
+    split out when asked for, carrying word boundaries across chunks.
+    """
+    lines = words = size = 0
+    in_word = False
+    buf = bytearray(WC_CHUNK_SIZE)
+    with open(path, 'rb', buffering=0) as f:
+        while True:
+            n = f.readinto(buf)
+            if not n:
+                break
+            chunk = buf if n == len(buf) else buf[:n]
+            size += n
+            lines += chunk.count(b'\n')
+            if count_words:
+                words += len(chunk.split())
+                # A word split across the chunk boundary was counted twice
+                if in_word and not chunk[:1].isspace():
+                    words -= 1
+                in_word = not chunk[-1:].isspace()
+    return lines, words, size
+
+
+def _count_stream(stream, count_words: bool = True) -> Tuple[int, int, int]:
+    """Count (lines, words, bytes) of a text stream, line by line."""
+    lines = words = size = 0
+    for line in stream:
+        lines += line.endswith('\n')
+        size += len(line.encode('utf-8'))
+        if count_words:
+            words += len(line.split())
+    return lines, words, size
+
+
+def _parse_key(value: str) -> Optional[Tuple[int, Optional[int]]]:
+    """Parse a -k N[,M] field specification."""
+    start, _, end = value.partition(',')
+    if not start.isdigit() or int(start) < 1 or (end and not end.isdigit()):
+        return None
+    return int(start), int(end) if end else None
+
+
+def _parse_size(value: str) -> Optional[int]:
+    """Parse a -S buffer size like 512K, 64M or a plain byte count."""
+    multiplier = 1
+    if value and value[-1].upper() in SIZE_SUFFIXES:
+        multiplier = SIZE_SUFFIXES[value[-1].upper()]
+        value = value[:-1]
+    if not value.isdigit():
+        return None
+    return int(value) * multiplier
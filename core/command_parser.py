@@ -39,12 +39,37 @@ class CommandParser:
     @staticmethod
     def split_pipes(command_line: str) -> List[str]:
         """
-        Split command line by pipes for future pipe support.
-        Currently just returns the command as a single item.
+        Split command line into pipeline stages on unquoted '|'.
+        
+        Raises:
+            ValueError: If a stage is empty (e.g. "ls |")
         """
-        # For now, return as single command
-        # TODO: Implement proper pipe parsing
-        return [command_line.strip()]
+        stages = []
+        current = []
+        quote = None
+        escaped = False
+        
+        for char in command_line:
+            if escaped:
+                escaped = False
+            elif char == '\\' and quote != "'":
+                escaped = True
+            elif quote:
+                if char == quote:
+                    quote = None
+            elif char in ('"', "'"):
+                quote = char
+            elif char == '|':
+                stages.append(''.join(current).strip())
+                current = []
+                continue
+            current.append(char)
+        
+        stages.append(''.join(current).strip())
+        
+        if len(stages) > 1 and not all(stages):
+            raise ValueError("Empty command in pipeline")
+        return stages
     
     @staticmethod
     def parse_redirections(args: List[str]) -> Tuple[List[str], dict]:
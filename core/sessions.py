@@ -0,0 +1,251 @@
+"""
+Pool of server-side terminal sessions for the web API.
+"""
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+# Handle both relative and absolute imports
+try:
+    from .terminal import TerminalEngine
+    from ..utils.vfs import MemoryFileSystem
+except ImportError:
+    # Fallback for absolute imports when running directly
+    from core.terminal import TerminalEngine
+    from utils.vfs import MemoryFileSystem
+
+
+# Commands a web session may run: those that only touch the session's own
+# in-memory filesystem, or only read host statistics. Commands that still
+# open host paths directly (search, text, archive and checksum commands,
+# the file index) or change the host are left out.
+WEB_COMMANDS = frozenset([
+    'ls', 'dir', 'cd', 'pwd', 'mkdir', 'md', 'rmdir', 'rd', 'rm', 'del', 'cp', 'copy',
+    'mv', 'move', 'touch', 'cat', 'type', 'du',
+    'ps', 'pstree', 'top', 'df', 'free', 'sar', 'whoami',
+    'help', 'history', 'clear', 'cls', 'echo', 'set', 'env',
+])
+
+# Options refused in web sessions: top's -d/-n would hold a server thread
+# (and the session lock) for as long as the client asks, and ps -f would
+# show every host process's full command line, secrets in argv included
+RESTRICTED_OPTIONS = {
+    'top': frozenset(['-d', '-n']),
+    'ps': frozenset(['-f', '--full']),
+}
+
+DEFAULT_MAX_SESSIONS = 256
+DEFAULT_IDLE_TIMEOUT = 30 * 60
+# Per-session filesystem quota and the cap on all sessions together
+DEFAULT_SESSION_BYTES = 8 * 1024 * 1024
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+# Most commands one batch request may carry, and threads it may use
+MAX_BATCH = 100
+BATCH_WORKERS = 8
+
+# Range a client's terminal width is clamped to
+MIN_COLUMNS = 20
+MAX_COLUMNS = 500
+
+
+class Session:
+    """One web user's engine, filesystem and bookkeeping."""
+
+    def __init__(self, session_id: str, session_bytes: int):
+        self.id = session_id
+        self.fs = MemoryFileSystem(max_bytes=session_bytes)
+        self.engine = TerminalEngine(self.fs)
+        self.engine.commands = {name: _restricted(name, func)
+                                for name, func in self.engine.commands.items()
+                                if name in WEB_COMMANDS}
+        self.last_used = time.monotonic()
+        # Commands of one session run one at a time, in arrival order
+        self.lock = threading.Lock()
+
+    def memory_bytes(self) -> int:
+        """File contents plus history, the part of a session that grows with use."""
+        return self.fs.used_bytes + sum(len(line) for line in self.engine.history.history)
+
+
+def _restricted(name: str, func):
+    """`func`, refusing the options RESTRICTED_OPTIONS lists for `name`."""
+    refused = RESTRICTED_OPTIONS.get(name)
+    if not refused:
+        return func
+
+    def command(args: List[str]) -> str:
+        for arg in args:
+            if arg in refused:
+                return f"{name}: option '{arg}' is not available in web sessions"
+        return func(args)
+
+    command.__doc__ = func.__doc__
+    return command
+
+
+def clamp_columns(value) -> Optional[int]:
+    """A client-supplied terminal width clamped to MIN_COLUMNS..MAX_COLUMNS, or None if unusable."""
+    if isinstance(value, str) and value.strip().isdigit():
+        value = int(value)
+    if not isinstance(value, int) or isinstance(value, bool):
+        return None
+    return max(MIN_COLUMNS, min(MAX_COLUMNS, value))
+
+
+class SessionPool:
+    """
+    Maps session ids to live TerminalEngine instances.
+
+    Sessions are kept in least-recently-used order. Before a new one is
+    created, sessions idle for longer than `idle_timeout` are dropped, then
+    the least recently used ones until there is room under both
+    `max_sessions` and the `max_bytes` memory cap. A session that is
+    running a command is never evicted.
+    """
+
+    def __init__(self, max_sessions: int = DEFAULT_MAX_SESSIONS,
+                 idle_timeout: float = DEFAULT_IDLE_TIMEOUT,
+                 session_bytes: int = DEFAULT_SESSION_BYTES,
+                 max_bytes: int = DEFAULT_MAX_BYTES):
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self.session_bytes = session_bytes
+        self.max_bytes = max_bytes
+        self._sessions: "OrderedDict[str, Session]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.created = 0
+        self.evicted = 0
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def get(self, session_id: Optional[str] = None) -> Session:
+        """The session for `session_id`, or a new one if it is unknown or expired."""
+        with self._lock:
+            session = self._sessions.get(session_id) if session_id else None
+            if session is not None:
+                self._sessions.move_to_end(session_id)
+            else:
+                self._evict(reserve=1)
+                session = Session(secrets.token_urlsafe(16), self.session_bytes)
+                self._sessions[session.id] = session
+                self.created += 1
+            session.last_used = time.monotonic()
+            return session
+
+    def close(self, session_id: str) -> bool:
+        with self._lock:
+            return self._sessions.pop(session_id, None) is not None
+
+    def execute(self, session_id: Optional[str], command_line: str,
+                columns: Optional[int] = None) -> Dict[str, object]:
+        """
+        Run one command line in a session and describe the result for the client.
+
+        `columns`, the client's terminal width, is kept for the session's
+        later commands too; see clamp_columns().
+        """
+        return self._run(self.get(session_id), command_line, columns)
+
+    def _run(self, session: Session, command_line: str, columns: Optional[int] = None) -> Dict[str, object]:
+        """Run one command line in an already resolved session."""
+        columns = clamp_columns(columns)
+        with session.lock:
+            if columns is not None:
+                session.engine.state.columns = columns
+            output = session.engine.execute_command(command_line)
+            session.last_used = time.monotonic()
+            result = {
+                'success': True,
+                'output': output,
+                'currentDir': session.engine.state.current_directory,
+                'sessionId': session.id,
+            }
+        if output == "__CLEAR_SCREEN__":
+            result['output'] = ''
+            result['clear'] = True
+        return result
+
+    def execute_batch(self, session_id: Optional[str], items: List[object],
+                      columns: Optional[int] = None) -> Dict[str, object]:
+        """
+        Run several commands in one call and return their results in order.
+
+        Each item is a command line, or a dict with "commandLine" and
+        optionally "independent" and its own "sessionId". Items run one
+        after another, except that consecutive items marked independent
+        run concurrently. Commands of the same session still take turns
+        on its lock, so only independent items in different sessions
+        overlap, and one session's state never sees two commands at once.
+        Items without their own session, or naming one that doesn't
+        exist, use `session_id`; a batch creates at most that one session.
+        """
+        if len(items) > MAX_BATCH:
+            return {'success': False, 'error': f'batch: at most {MAX_BATCH} commands per request',
+                    'output': ''}
+        session = self.get(session_id)
+        default = session.id
+        columns = clamp_columns(columns)
+        if columns is not None:
+            with session.lock:
+                session.engine.state.columns = columns
+        jobs = []
+        with self._lock:
+            for item in items:
+                if isinstance(item, dict):
+                    # Unknown ids must not mint sessions and push others out of the pool
+                    own = self._sessions.get(item.get('sessionId'), session)
+                    jobs.append((own, str(item.get('commandLine', '')),
+                                 bool(item.get('independent'))))
+                else:
+                    jobs.append((session, str(item), False))
+
+        results: List[Dict[str, object]] = []
+        i = 0
+        while i < len(jobs):
+            end = i + 1
+            if jobs[i][2]:
+                while end < len(jobs) and jobs[end][2]:
+                    end += 1
+            group = jobs[i:end]
+            if len(group) == 1:
+                results.append(self._run(group[0][0], group[0][1]))
+            else:
+                with ThreadPoolExecutor(max_workers=min(len(group), BATCH_WORKERS),
+                                        thread_name_prefix='batch') as executor:
+                    results.extend(executor.map(lambda job: self._run(job[0], job[1]), group))
+            i = end
+        return {'success': True, 'sessionId': default, 'results': results}
+
+    def memory_bytes(self) -> int:
+        return sum(session.memory_bytes() for session in list(self._sessions.values()))
+
+    def _evict(self, reserve: int = 0):
+        """Drop idle sessions, then LRU ones, until `reserve` more fit. Caller holds the lock."""
+        now = time.monotonic()
+        for session_id, session in list(self._sessions.items()):
+            if now - session.last_used > self.idle_timeout and not session.lock.locked():
+                self._drop(session_id)
+
+        used = self.memory_bytes()
+        for session_id, session in list(self._sessions.items()):
+            if (len(self._sessions) + reserve <= self.max_sessions
+                    and used + reserve * self.session_bytes <= self.max_bytes):
+                break
+            if session.lock.locked():
+                continue
+            used -= session.memory_bytes()
+            self._drop(session_id)
+
+    def _drop(self, session_id: str):
+        del self._sessions[session_id]
+        self.evicted += 1
+
+    def stats(self) -> Tuple[int, int]:
+        """(live sessions, bytes they hold)."""
+        with self._lock:
+            return len(self._sessions), self.memory_bytes()
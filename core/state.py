@@ -4,15 +4,39 @@ Terminal state management - handles current directory, environment variables, et
 import os
 from typing import Dict, Any
 
+# Handle both relative and absolute imports
+try:
+    from ..utils.vfs import FileSystem, DiskFileSystem
+    from ..utils.columns import terminal_width
+except ImportError:
+    # Fallback for absolute imports when running directly
+    from utils.vfs import FileSystem, DiskFileSystem
+    from utils.columns import terminal_width
+
 
 class TerminalState:
     """Manages the current state of the terminal session."""
     
-    def __init__(self):
-        self.current_directory = os.getcwd()
-        self.environment_vars = dict(os.environ)
+    def __init__(self, fs: FileSystem = None):
+        # Filesystem every path of this session refers to
+        self.fs = fs if fs is not None else DiskFileSystem()
+        self.current_directory = self.fs.getcwd()
+        if self.fs.native:
+            self.environment_vars = dict(os.environ)
+        else:
+            # A virtual session sees none of the host's environment
+            self.environment_vars = {'HOME': self.fs.home(), 'PATH': '/usr/bin:/bin'}
         self.user = os.getenv('USERNAME', os.getenv('USER', 'user'))
         self.hostname = os.getenv('COMPUTERNAME', os.getenv('HOSTNAME', 'localhost'))
+        # Text stream feeding the running command (pipe or '<' input), else None
+        self.stdin = None
+        # Output width set by the client (e.g. the web API); None means detect it
+        self.columns = None
+        # Interactive terminal full-screen commands may draw on directly, else None
+        self.tty = None
+        # True while the running command's output goes to a file or the next
+        # pipeline stage; commands may then return an iterator of lines
+        self.streaming = False
     
     def get_current_directory(self) -> str:
         """Get the current working directory."""
@@ -25,16 +49,16 @@ class TerminalState:
         """
         try:
             # Resolve path relative to current directory
-            if not os.path.isabs(path):
-                new_path = os.path.join(self.current_directory, path)
+            if not self.fs.isabs(path):
+                new_path = self.fs.join(self.current_directory, path)
             else:
                 new_path = path
             
             # Normalize the path
-            new_path = os.path.normpath(new_path)
+            new_path = self.fs.normpath(new_path)
             
             # Check if directory exists
-            if os.path.isdir(new_path):
+            if self.fs.isdir(new_path):
                 self.current_directory = new_path
                 return True
             else:
@@ -42,6 +66,10 @@ class TerminalState:
         except (OSError, IOError):
             return False
     
+    def terminal_width(self) -> int:
+        """Width to lay output out for."""
+        return self.columns or terminal_width()
+    
     def get_env_var(self, name: str) -> str:
         """Get environment variable value."""
         return self.environment_vars.get(name, '')
@@ -49,17 +77,18 @@ class TerminalState:
     def set_env_var(self, name: str, value: str):
         """Set environment variable."""
         self.environment_vars[name] = value
-        os.environ[name] = value
+        if self.fs.native:
+            os.environ[name] = value
     
     def get_prompt(self) -> str:
         """Generate terminal prompt string."""
         # Get current directory name (last part of path)
-        current_dir = os.path.basename(self.current_directory) or self.current_directory
+        current_dir = self.fs.basename(self.current_directory) or self.current_directory
         return f"{self.user}@{self.hostname}:{current_dir}$ "
     
     def get_full_path(self, path: str) -> str:
         """Convert relative path to absolute path based on current directory."""
-        if os.path.isabs(path):
-            return os.path.normpath(path)
+        if self.fs.isabs(path):
+            return self.fs.normpath(path)
         else:
-            return os.path.normpath(os.path.join(self.current_directory, path))
\ No newline at end of file
+            return self.fs.normpath(self.fs.join(self.current_directory, path))
\ No newline at end of file
@@ -1,45 +1,105 @@
 """
 Main terminal engine - orchestrates command execution and terminal state.
 """
+import io
 import os
 import sys
-from typing import Dict, Any, Optional, List
+import time
+from typing import Dict, Any, Iterable, Iterator, Optional, List, Union
 
 # Handle both relative and absolute imports
 try:
     from .state import TerminalState
     from .command_parser import CommandParser
     from ..utils.history import CommandHistory
+    from ..utils.trash import TrashManager
+    from ..utils.fs_index import FileIndex
+    from ..utils.vfs import FileSystem
+    from ..utils.telemetry import telemetry
 except ImportError:
     # Fallback for absolute imports when running directly
     from core.state import TerminalState
     from core.command_parser import CommandParser
     from utils.history import CommandHistory
+    from utils.trash import TrashManager
+    from utils.fs_index import FileIndex
+    from utils.vfs import FileSystem
+    from utils.telemetry import telemetry
+
+
+class LineStream(io.TextIOBase):
+    """Read-only text stream over an iterator of lines, for piping streamed output."""
+    
+    def __init__(self, lines: Iterable[str]):
+        self._lines = iter(lines)
+    
+    def readable(self) -> bool:
+        return True
+    
+    def readline(self, size: int = -1) -> str:
+        line = next(self._lines, None)
+        return "" if line is None else line + "\n"
+    
+    def read(self, size: int = -1) -> str:
+        return "".join(line + "\n" for line in self._lines)
+    
+    def close(self):
+        # Closing the source lets it release temporary files early
+        close = getattr(self._lines, 'close', None)
+        if close is not None:
+            close()
+        super().close()
 
 
 class TerminalEngine:
     """Main terminal engine that coordinates all terminal operations."""
     
-    def __init__(self):
-        self.state = TerminalState()
+    def __init__(self, fs: FileSystem = None):
+        self.state = TerminalState(fs)
         self.parser = CommandParser()
-        self.history = CommandHistory()
+        self.history = CommandHistory(persistent=self.state.fs.native)
+        self.trash = TrashManager()
+        self.index = FileIndex()
         self.commands = {}
         self.running = True
         
         # Register built-in commands
         self._register_builtin_commands()
+        
+        if self.state.fs.native:
+            # Finish deleting anything an earlier session left half-purged
+            self.trash.purge_pending()
+            
+            # Keep configured index roots fresh in the background
+            if self.index.roots():
+                self.index.start_background()
+        
+        # Count this session in the exported metrics
+        telemetry.engines.add(self)
+        telemetry.register_gauge('terminal_active_sessions', "Live terminal sessions.",
+                                 lambda: [({}, len(telemetry.engines))])
+        telemetry.register_gauge('terminal_history_entries', "Commands held in session histories.",
+                                 lambda: [({}, sum(len(engine.history.history)
+                                                   for engine in list(telemetry.engines)))])
     
     def _register_builtin_commands(self):
         """Register built-in terminal commands."""
         try:
             from ..commands.file_ops import FileOperations
             from ..commands.system_info import SystemInfo
+            from ..commands.search import SearchCommands
+            from ..commands.checksum import ChecksumCommands
+            from ..commands.text_ops import TextCommands
+            from ..commands.archive import ArchiveCommands
         except ImportError:
             # Fallback for absolute imports
             try:
                 from commands.file_ops import FileOperations
                 from commands.system_info import SystemInfo
+                from commands.search import SearchCommands
+                from commands.checksum import ChecksumCommands
+                from commands.text_ops import TextCommands
+                from commands.archive import ArchiveCommands
             except ImportError:
                 # Final fallback - add parent directory to path
                 import sys
@@ -49,9 +109,13 @@ class TerminalEngine:
                     sys.path.insert(0, parent_dir)
                 from commands.file_ops import FileOperations
                 from commands.system_info import SystemInfo
+                from commands.search import SearchCommands
+                from commands.checksum import ChecksumCommands
+                from commands.text_ops import TextCommands
+                from commands.archive import ArchiveCommands
         
         # File operations
-        file_ops = FileOperations(self.state)
+        file_ops = FileOperations(self.state, self.trash, self.index)
         self.commands.update({
             'ls': file_ops.ls,
             'dir': file_ops.ls,  # Windows alias
@@ -70,15 +134,58 @@ class TerminalEngine:
             'touch': file_ops.touch,
             'cat': file_ops.cat,
             'type': file_ops.cat,  # Windows alias
+            'trash': file_ops.trash,
+            'du': file_ops.du,
+            'dedupe': file_ops.dedupe,
+        })
+        
+        # Search
+        search = SearchCommands(self.state, self.index)
+        self.commands.update({
+            'find': search.find,
+            'grep': search.grep,
+            'ff': search.ff,
+            'locate': search.locate,
+            'updatedb': search.updatedb,
+        })
+        
+        # Text processing
+        text = TextCommands(self.state)
+        self.commands.update({
+            'sort': text.sort,
+            'uniq': text.uniq,
+            'wc': text.wc,
+            'diff': text.diff,
+        })
+        
+        # Archives
+        archives = ArchiveCommands(self.state)
+        self.commands.update({
+            'tar': archives.tar,
+            'gzip': archives.gzip,
+            'gunzip': archives.gunzip,
+        })
+        
+        # Checksums
+        checksums = ChecksumCommands(self.state)
+        self.commands.update({
+            'md5sum': checksums.md5sum,
+            'sha1sum': checksums.sha1sum,
+            'sha256sum': checksums.sha256sum,
+            'sha512sum': checksums.sha512sum,
+            'b2sum': checksums.b2sum,
         })
         
         # System information
-        sys_info = SystemInfo()
+        sys_info = SystemInfo(self.state)
         self.commands.update({
             'ps': sys_info.ps,
+            'pstree': sys_info.pstree,
             'top': sys_info.top,
             'df': sys_info.df,
             'free': sys_info.free,
+            'sar': sys_info.sar,
+            'metrics': sys_info.metrics,
             'whoami': sys_info.whoami,
         })
         
@@ -112,47 +219,108 @@ class TerminalEngine:
             # Add to history
             self.history.add(command_line)
             
-            # Parse command
-            command, args = self.parser.parse(command_line)
-            
-            if command is None:
-                return ""
+            # Run each pipeline stage, feeding it the previous stage's output
+            output = None
+            stages = self.parser.split_pipes(command_line)
+            for i, stage in enumerate(stages):
+                output, ok = self._execute_stage(stage, output, last=i == len(stages) - 1)
+                if not ok:
+                    break
             
-            # Parse redirections
-            args, redirections = self.parser.parse_redirections(args)
-            
-            # Execute command
-            if command in self.commands:
-                try:
-                    output = self.commands[command](args)
-                    
-                    # Handle output redirections
-                    if 'stdout' in redirections:
-                        self._write_to_file(output, redirections['stdout'], 'w')
-                        return f"Output redirected to {redirections['stdout']}"
-                    elif 'stdout_append' in redirections:
-                        self._write_to_file(output, redirections['stdout_append'], 'a')
-                        return f"Output appended to {redirections['stdout_append']}"
-                    
-                    return output
-                except Exception as e:
-                    return f"Error executing command '{command}': {str(e)}"
-            else:
-                return f"Command not found: {command}"
+            return output or ""
                 
         except ValueError as e:
             return f"Parse error: {str(e)}"
         except Exception as e:
             return f"Unexpected error: {str(e)}"
     
-    def _write_to_file(self, content: str, filename: str, mode: str):
-        """Write content to file."""
+    def _execute_stage(self, stage: str, piped_input: Union[str, Iterator[str], None],
+                       last: bool = True):
+        """
+        Execute one pipeline stage.
+        
+        Args:
+            stage: Command line of this stage
+            piped_input: Output of the previous stage, if any: a string, or
+                an iterator of lines from a command that streams its output
+            last: Whether this stage's output goes to the terminal
+            
+        Returns:
+            Tuple of (output, success)
+        """
+        # Parse command
+        command, args = self.parser.parse(stage)
+        
+        if command is None:
+            return "", True
+        
+        # Parse redirections
+        args, redirections = self.parser.parse_redirections(args)
+        
+        if command not in self.commands:
+            telemetry.record_command(None, 0.0)
+            return f"Command not found: {command}", False
+        
+        stdin = None
+        tty = self.state.tty
+        try:
+            # Only a stage writing straight to the terminal may draw on it;
+            # any other stage may stream its output instead of building a string
+            if not last or 'stdout' in redirections or 'stdout_append' in redirections:
+                self.state.tty = None
+                self.state.streaming = True
+            
+            # Input comes from '<' if given, otherwise from the pipe
+            if 'stdin' in redirections:
+                stdin = self.state.fs.open(self.state.get_full_path(redirections['stdin']), 'r',
+                                           encoding='utf-8', errors='replace')
+            elif isinstance(piped_input, str):
+                # Stage output has no final newline; restore it so the last line counts
+                stdin = io.StringIO(piped_input + "\n" if piped_input else "")
+            elif piped_input is not None:
+                stdin = LineStream(piped_input)
+            self.state.stdin = stdin
+            
+            # Execute command
+            started = time.perf_counter()
+            try:
+                output = self.commands[command](args)
+            except Exception:
+                telemetry.record_command(command, time.perf_counter() - started, ok=False)
+                raise
+            telemetry.record_command(command, time.perf_counter() - started)
+            
+            # Handle output redirections
+            if 'stdout' in redirections:
+                self._write_to_file(output, redirections['stdout'], 'w')
+                return f"Output redirected to {redirections['stdout']}", True
+            elif 'stdout_append' in redirections:
+                self._write_to_file(output, redirections['stdout_append'], 'a')
+                return f"Output appended to {redirections['stdout_append']}", True
+            
+            return output, True
+        except Exception as e:
+            return f"Error executing command '{command}': {str(e)}", False
+        finally:
+            self.state.stdin = None
+            self.state.tty = tty
+            self.state.streaming = False
+            if stdin is not None:
+                stdin.close()
+    
+    def _write_to_file(self, content: Union[str, Iterator[str]], filename: str, mode: str):
+        """Write content, a string or an iterator of lines, to file."""
         filepath = self.state.get_full_path(filename)
         try:
-            with open(filepath, mode, encoding='utf-8') as f:
-                f.write(content)
-                if not content.endswith('\n'):
-                    f.write('\n')
+            with self.state.fs.open(filepath, mode, encoding='utf-8') as f:
+                if isinstance(content, str):
+                    f.write(content)
+                    if not content.endswith('\n'):
+                        f.write('\n')
+                else:
+                    for line in content:
+                        f.write(line)
+                        f.write('\n')
         except Exception as e:
             raise Exception(f"Cannot write to file '{filename}': {str(e)}")
     
@@ -188,12 +356,35 @@ class TerminalEngine:
         help_text += "  cp/copy       - Copy files\n"
         help_text += "  mv/move       - Move/rename files\n"
         help_text += "  touch         - Create empty file\n"
-        help_text += "  cat/type      - Display file contents\n\n"
+        help_text += "  cat/type      - Display file contents\n"
+        help_text += "  trash         - List, restore or empty trashed files\n"
+        help_text += "  du            - Show disk usage of directory trees\n"
+        help_text += "  dedupe        - Find duplicate files, optionally replacing them with links\n\n"
+        help_text += "Search:\n"
+        help_text += "  find          - Find files by name, type, size or age\n"
+        help_text += "  grep          - Search file contents\n"
+        help_text += "  ff            - Fuzzy-find paths below the current directory\n"
+        help_text += "  locate        - Look up file names in the index\n"
+        help_text += "  updatedb      - Manage and refresh the file index\n\n"
+        help_text += "Text Processing:\n"
+        help_text += "  sort          - Sort lines (spills to disk for large inputs)\n"
+        help_text += "  uniq          - Collapse adjacent duplicate lines\n"
+        help_text += "  wc            - Count lines, words and bytes\n"
+        help_text += "  diff          - Compare files (unified output)\n\n"
+        help_text += "Archives:\n"
+        help_text += "  tar           - Create, extract or list tar archives\n"
+        help_text += "  gzip/gunzip   - Compress or decompress files\n\n"
+        help_text += "Checksums:\n"
+        help_text += "  md5sum/sha1sum/sha256sum/sha512sum/b2sum\n"
+        help_text += "                - Compute digests, or verify them with -c\n\n"
         help_text += "System Information:\n"
         help_text += "  ps            - Show processes\n"
-        help_text += "  top           - Show system resources\n"
+        help_text += "  pstree        - Show the process tree (-r sums CPU/MEM per subtree)\n"
+        help_text += "  top           - Show system resources (-d SECS refreshes in place)\n"
         help_text += "  df            - Show disk usage\n"
         help_text += "  free          - Show memory usage\n"
+        help_text += "  sar           - Show CPU, memory, disk and load history\n"
+        help_text += "  metrics       - Export terminal and host metrics (OpenMetrics)\n"
         help_text += "  whoami        - Show current user\n\n"
         help_text += "Built-in:\n"
         help_text += "  help          - Show this help\n"
@@ -202,7 +393,8 @@ class TerminalEngine:
         help_text += "  exit/quit     - Exit terminal\n"
         help_text += "  echo          - Echo text\n"
         help_text += "  set           - Set environment variable\n"
-        help_text += "  env           - Show environment variables\n"
+        help_text += "  env           - Show environment variables\n\n"
+        help_text += "Commands can be chained with '|' and read input with '<'.\n"
         
         return help_text
     
@@ -17,6 +17,8 @@ class CLIInterface:
     
     def __init__(self):
         self.terminal = TerminalEngine()
+        if sys.stdout.isatty():
+            self.terminal.state.tty = sys.stdout
     
     def run(self):
         """Run the CLI terminal."""
@@ -1,12 +1,16 @@
 """
 Basic tests for the Python Terminal system.
 """
+import io
 import unittest
 import tempfile
 import os
 import shutil
+from concurrent.futures import Future
 from unittest.mock import Mock, patch
 
+import psutil
+
 # Add parent directory to path for imports
 import sys
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -15,7 +19,27 @@ from core.terminal import TerminalEngine
 from core.state import TerminalState
 from core.command_parser import CommandParser
 from commands.file_ops import FileOperations
+from commands.search import SearchCommands, GrepMatcher, iter_grep
+from commands.checksum import ChecksumCommands
+from commands.text_ops import TextCommands
+from commands.archive import ArchiveCommands
+from utils.external_sort import ExternalSorter
 from utils.history import CommandHistory
+from utils.trash import TrashManager
+from utils.disk_usage import DiskUsageCache, DiskUsageScanner
+from utils.fs_index import FileIndex
+from utils.vfs import MemoryFileSystem
+from utils.columns import columnize, display_width, format_table
+from commands.system_info import SystemInfo
+from utils.processes import (parse_sort, sort_processes, ProcessScanner, ProcessInfo,
+                             build_tree, subtree_totals)
+from utils.sampler import SystemSampler
+from utils.screen import LiveScreen
+from utils.metrics import MetricsRecorder
+from utils import procfs
+from utils.mounts import Mount, MountTable, TIMED_OUT
+from utils.telemetry import Telemetry
+from core.sessions import SessionPool
 
 
 class TestTerminalState(unittest.TestCase):
@@ -86,6 +110,13 @@ class TestCommandParser(unittest.TestCase):
         cleaned_args, redirections = CommandParser.parse_redirections(args)
         self.assertEqual(cleaned_args, ["ls", "-l"])
         self.assertEqual(redirections, {"stdout": "output.txt"})
+    
+    def test_split_pipes(self):
+        """Test pipeline splitting respects quotes."""
+        stages = CommandParser.split_pipes('cat log | grep "a|b" | wc -l')
+        self.assertEqual(stages, ['cat log', 'grep "a|b"', 'wc -l'])
+        with self.assertRaises(ValueError):
+            CommandParser.split_pipes("ls |")
 
 
 class TestFileOperations(unittest.TestCase):
@@ -95,7 +126,8 @@ class TestFileOperations(unittest.TestCase):
         self.test_dir = tempfile.mkdtemp()
         self.state = TerminalState()
         self.state.set_current_directory(self.test_dir)
-        self.file_ops = FileOperations(self.state)
+        self.trash = TrashManager(trash_dir=os.path.join(self.test_dir, ".trash"))
+        self.file_ops = FileOperations(self.state, self.trash)
     
     def tearDown(self):
         shutil.rmtree(self.test_dir, ignore_errors=True)
@@ -142,6 +174,835 @@ class TestFileOperations(unittest.TestCase):
         result = self.file_ops.rm(["to_delete.txt"])
         self.assertEqual(result, "")
         self.assertFalse(os.path.exists(test_file))
+    
+    def test_cp_recursive(self):
+        """Test recursive copy preserves contents and mtimes."""
+        src = os.path.join(self.test_dir, "src")
+        os.makedirs(os.path.join(src, "nested"))
+        for i in range(20):
+            with open(os.path.join(src, "nested", f"f{i}.txt"), 'w') as f:
+                f.write(f"file {i}")
+        big = os.path.join(src, "big.bin")
+        with open(big, 'wb') as f:
+            f.write(os.urandom(2 * 1024 * 1024))
+        os.utime(big, (1000000000, 1000000000))
+        
+        result = self.file_ops.cp(["-r", "src", "dst"])
+        self.assertEqual(result, "")
+        dst = os.path.join(self.test_dir, "dst")
+        with open(os.path.join(dst, "nested", "f7.txt")) as f:
+            self.assertEqual(f.read(), "file 7")
+        with open(big, 'rb') as a, open(os.path.join(dst, "big.bin"), 'rb') as b:
+            self.assertEqual(a.read(), b.read())
+        self.assertEqual(os.stat(os.path.join(dst, "big.bin")).st_mtime, 1000000000)
+    
+    def test_cp_no_clobber_and_update(self):
+        """Test -n and -u skip existing destinations."""
+        src = os.path.join(self.test_dir, "a.txt")
+        dst = os.path.join(self.test_dir, "b.txt")
+        with open(src, 'w') as f:
+            f.write("new")
+        with open(dst, 'w') as f:
+            f.write("old")
+        
+        self.assertEqual(self.file_ops.cp(["-n", "a.txt", "b.txt"]), "")
+        with open(dst) as f:
+            self.assertEqual(f.read(), "old")
+        
+        # Destination is newer than the source, so -u skips it
+        os.utime(src, (1000, 1000))
+        result = self.file_ops.cp(["-uv", "a.txt", "b.txt"])
+        self.assertIn("0 copied, 1 skipped", result)
+        with open(dst) as f:
+            self.assertEqual(f.read(), "old")
+        
+        os.utime(dst, (500, 500))
+        self.file_ops.cp(["-u", "a.txt", "b.txt"])
+        with open(dst) as f:
+            self.assertEqual(f.read(), "new")
+    
+    def test_cp_sync(self):
+        """Test incremental sync skips unchanged files and patches changed blocks."""
+        src = os.path.join(self.test_dir, "src")
+        os.mkdir(src)
+        data = bytearray(os.urandom(512 * 1024))
+        with open(os.path.join(src, "data.bin"), 'wb') as f:
+            f.write(data)
+        with open(os.path.join(src, "same.txt"), 'w') as f:
+            f.write("unchanged")
+        
+        os.mkdir(os.path.join(self.test_dir, "backup"))
+        self.file_ops.cp(["--sync", "src", "backup"])
+        mirror = os.path.join(self.test_dir, "backup", "src")
+        with open(os.path.join(mirror, "stale.txt"), 'w') as f:
+            f.write("only in mirror")
+        
+        result = self.file_ops.cp(["--sync", "-v", "src", "backup"])
+        self.assertIn("0 copied, 2 skipped", result)
+        
+        data[300000:300010] = b"x" * 10
+        with open(os.path.join(src, "data.bin"), 'wb') as f:
+            f.write(data)
+        os.utime(os.path.join(src, "data.bin"), (2000000000, 2000000000))
+        
+        result = self.file_ops.cp(["--sync", "--checksum", "--delete", "-v", "src", "backup"])
+        self.assertIn("1 copied, 1 skipped, 128.0K", result)
+        self.assertIn("1 deleted", result)
+        with open(os.path.join(mirror, "data.bin"), 'rb') as f:
+            self.assertEqual(f.read(), bytes(data))
+        self.assertFalse(os.path.exists(os.path.join(mirror, "stale.txt")))
+    
+    def test_cp_same_file(self):
+        """Test copying a file onto itself is refused and leaves it intact."""
+        path = os.path.join(self.test_dir, "a")
+        with open(path, 'w') as f:
+            f.write("keep me")
+        
+        self.assertEqual(self.file_ops.cp(["a", "a"]), "cp: 'a' and 'a' are the same file")
+        self.assertIn("are the same file", self.file_ops.cp(["a", "."]))
+        self.assertIn("are the same file", self.file_ops.cp(["-l", "a", "a"]))
+        with open(path) as f:
+            self.assertEqual(f.read(), "keep me")
+    
+    def test_cp_link_and_reflink(self):
+        """Test --link shares inodes and --reflink=auto always produces a copy."""
+        src = os.path.join(self.test_dir, "src")
+        os.mkdir(src)
+        with open(os.path.join(src, "big.bin"), 'wb') as f:
+            f.write(os.urandom(200 * 1024))
+        
+        self.assertEqual(self.file_ops.cp(["-r", "--link", "src", "linked"]), "")
+        self.assertTrue(os.path.samefile(os.path.join(src, "big.bin"),
+                                         os.path.join(self.test_dir, "linked", "big.bin")))
+        
+        self.assertEqual(self.file_ops.cp(["-r", "--reflink=auto", "src", "cloned"]), "")
+        cloned = os.path.join(self.test_dir, "cloned", "big.bin")
+        self.assertFalse(os.path.samefile(os.path.join(src, "big.bin"), cloned))
+        with open(os.path.join(src, "big.bin"), 'rb') as a, open(cloned, 'rb') as b:
+            self.assertEqual(a.read(), b.read())
+        
+        self.assertIn("invalid argument", self.file_ops.cp(["--reflink=maybe", "src", "x"]))
+        self.assertIn("mutually exclusive", self.file_ops.cp(["-rl", "--reflink", "src", "x"]))
+    
+    def test_dedupe(self):
+        """Test duplicate detection by size and hash, then hard-link replacement."""
+        os.makedirs(os.path.join(self.test_dir, "tree", "sub"))
+        payload = os.urandom(100 * 1024)
+        for name, data in [("a.bin", payload), ("sub/b.bin", payload),
+                           ("sub/c.bin", payload[:-1] + b"!"), ("small.txt", b"hi")]:
+            with open(os.path.join(self.test_dir, "tree", name), 'wb') as f:
+                f.write(data)
+        
+        result = self.file_ops.dedupe(["tree"])
+        self.assertIn(os.path.join(self.test_dir, "tree", "a.bin"), result)
+        self.assertNotIn("c.bin", result)
+        self.assertIn("1 duplicate files in 1 groups, 100.0K reclaimable", result)
+        
+        result = self.file_ops.dedupe(["--hardlink", "tree"])
+        self.assertIn("Replaced 1 of 1 duplicate files", result)
+        self.assertTrue(os.path.samefile(os.path.join(self.test_dir, "tree", "a.bin"),
+                                         os.path.join(self.test_dir, "tree", "sub", "b.bin")))
+        
+        # Existing hard links are not reported again
+        self.assertIn("0 duplicate files in 0 groups", self.file_ops.dedupe(["tree"]))
+    
+    def test_rm_recursive_background_purge(self):
+        """Test rm -r renames the tree away and purges it in the background."""
+        tree = os.path.join(self.test_dir, "tree")
+        for i in range(5):
+            os.makedirs(os.path.join(tree, f"d{i}"))
+            for j in range(10):
+                open(os.path.join(tree, f"d{i}", f"f{j}"), 'w').close()
+        
+        result = self.file_ops.rm(["-r", "tree"])
+        self.assertEqual(result, "")
+        self.assertFalse(os.path.exists(tree))
+        
+        self.trash.wait()
+        self.assertEqual(os.listdir(os.path.join(self.test_dir, ".trash", "purge")), [])
+    
+    def test_trash_restore(self):
+        """Test rm --trash keeps items restorable."""
+        with open(os.path.join(self.test_dir, "keep.txt"), 'w') as f:
+            f.write("precious")
+        
+        self.assertEqual(self.file_ops.rm(["--trash", "keep.txt"]), "")
+        self.assertFalse(os.path.exists(os.path.join(self.test_dir, "keep.txt")))
+        
+        items = self.trash.list_items()
+        self.assertEqual(len(items), 1)
+        self.assertIn("keep.txt", self.file_ops.trash([]))
+        
+        result = self.file_ops.trash(["restore", items[0]['id']])
+        self.assertIn("restored", result)
+        with open(os.path.join(self.test_dir, "keep.txt")) as f:
+            self.assertEqual(f.read(), "precious")
+        self.assertEqual(self.file_ops.trash(["list"]), "trash: empty")
+    
+    def test_du(self):
+        """Test du output order, depth limits and hard link counting."""
+        os.makedirs(os.path.join(self.test_dir, "data", "sub"))
+        with open(os.path.join(self.test_dir, "data", "sub", "big"), 'wb') as f:
+            f.write(b"x" * 64 * 1024)
+        os.link(os.path.join(self.test_dir, "data", "sub", "big"),
+                os.path.join(self.test_dir, "data", "again"))
+        
+        lines = self.file_ops.du(["data"]).splitlines()
+        self.assertEqual([line.split("\t")[1] for line in lines], ["data/sub", "data"])
+        total = int(lines[1].split("\t")[0])
+        # The second hard link must not be counted again
+        self.assertGreaterEqual(total, 64)
+        self.assertLess(total, 128)
+        
+        summary = self.file_ops.du(["-sh", "data"])
+        self.assertEqual(len(summary.splitlines()), 1)
+        self.assertTrue(summary.endswith("\tdata"))
+    
+    def test_du_cache(self):
+        """Test that unchanged directories are served from the cache."""
+        for name in ("a", "b", "c"):
+            os.makedirs(os.path.join(self.test_dir, "tree", name))
+            with open(os.path.join(self.test_dir, "tree", name, "f"), 'w') as f:
+                f.write("data")
+        tree = os.path.join(self.test_dir, "tree")
+        cache_file = os.path.join(self.test_dir, "du.cache")
+        
+        first = DiskUsageScanner(cache=DiskUsageCache(cache_file))
+        totals = first.scan(tree)
+        self.assertEqual(first.scanned, 4)
+        
+        with open(os.path.join(tree, "b", "new"), 'w') as f:
+            f.write("more" * 2048)
+        second = DiskUsageScanner(cache=DiskUsageCache(cache_file))
+        updated = second.scan(tree)
+        self.assertEqual((second.scanned, second.cached), (1, 3))
+        self.assertGreater(updated[tree], totals[tree])
+
+
+class TestColumnLayout(unittest.TestCase):
+    """Test the shared column layout engine."""
+    
+    def test_columnize(self):
+        """Test column-major fill, per-column widths and wide characters."""
+        items = ["alpha", "b", "charlie_long_name", "d", "echo", "foxtrot", "golf", "h", "日本語"]
+        self.assertEqual(columnize(items, 40), "alpha              d        golf\n"
+                                               "b                  echo     h\n"
+                                               "charlie_long_name  foxtrot  日本語")
+        self.assertEqual(columnize(items, 33), "alpha              foxtrot\n"
+                                               "b                  golf\n"
+                                               "charlie_long_name  h\n"
+                                               "d                  日本語\n"
+                                               "echo")
+        self.assertEqual(columnize(items, 200), "  ".join(items))
+        self.assertEqual(columnize(items, 5), "\n".join(items))
+        self.assertEqual(display_width("日本語"), 6)
+        self.assertEqual(display_width("e\u0301"), 1)
+    
+    def test_format_table(self):
+        """Test alignment, unpadded last column and truncation to width."""
+        table = format_table([("1", "root", "python3 -m http.server"), ("12345", "me", "sh")],
+                             headers=("PID", "USER", "COMMAND"), align="><<", width=20)
+        self.assertEqual(table, "  PID USER COMMAND\n"
+                                "    1 root python...\n"
+                                "12345 me   sh")
+    
+    def test_ls_uses_session_width(self):
+        """Test ls lays out names for the width set on the session."""
+        state = TerminalState(MemoryFileSystem())
+        for name in ("one", "two", "three", "four"):
+            with state.fs.open(f"/home/user/{name}", 'w'):
+                pass
+        state.columns = 20
+        self.assertEqual(FileOperations(state).ls([]), "four  three\none   two")
+        state.columns = 80
+        self.assertEqual(FileOperations(state).ls([]), "four  one  three  two")
+
+
+class TestMemoryFileSystem(unittest.TestCase):
+    """Test file operations on the in-memory filesystem."""
+    
+    def setUp(self):
+        self.fs = MemoryFileSystem()
+        self.state = TerminalState(self.fs)
+        self.file_ops = FileOperations(self.state)
+    
+    def test_sandboxed_file_operations(self):
+        """Test the basic file commands never touch the disk."""
+        self.assertEqual(self.state.current_directory, "/home/user")
+        self.assertEqual(self.file_ops.mkdir(["-p", "proj/src"]), "")
+        self.assertEqual(self.file_ops.touch(["proj/src/main.py"]), "")
+        with self.fs.open("/home/user/proj/src/main.py", 'w') as f:
+            f.write("print('hi')\n")
+        
+        self.assertEqual(self.file_ops.ls(["proj"]), "src/")
+        self.assertEqual(self.file_ops.cat(["proj/src/main.py"]), "print('hi')")
+        self.assertFalse(os.path.exists("/home/user/proj"))
+        
+        self.assertEqual(self.file_ops.cp(["-r", "proj", "copy"]), "")
+        self.assertEqual(self.file_ops.cat(["copy/src/main.py"]), "print('hi')")
+        self.assertIn("1 skipped", self.file_ops.cp(["-nv", "proj/src/main.py", "copy/src"]))
+        self.assertEqual(self.file_ops.mv(["copy", "moved"]), "")
+        self.assertEqual(self.file_ops.du(["-s", "moved"]), "1\tmoved")
+        
+        self.assertEqual(self.file_ops.rm(["-r", "moved"]), "")
+        self.assertIn("No such file", self.file_ops.cat(["moved/src/main.py"]))
+        self.assertEqual(self.file_ops.cd(["proj"]), "")
+        self.assertEqual(self.file_ops.pwd([]), "/home/user/proj")
+        self.assertIn("disk filesystem", self.file_ops.cp(["--sync", "src", "x"]))
+    
+    def test_memory_limit(self):
+        """Test writes past the byte limit fail with ENOSPC and free space is reclaimed."""
+        fs = MemoryFileSystem(max_bytes=1024)
+        with fs.open("/tmp/a.bin", 'wb') as f:
+            f.write(b"x" * 1000)
+        with self.assertRaises(OSError):
+            with fs.open("/tmp/b.bin", 'wb') as f:
+                f.write(b"y" * 100)
+        fs.remove("/tmp/a.bin")
+        self.assertEqual(fs.used_bytes, 0)
+    
+    def test_engine_redirection(self):
+        """Test output redirection writes into the session's filesystem."""
+        engine = TerminalEngine(MemoryFileSystem())
+        engine.execute_command("pwd > where.txt")
+        self.assertEqual(engine.execute_command("cat where.txt"), "/home/user")
+
+
+class TestSearchCommands(unittest.TestCase):
+    """Test search commands."""
+    
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.state = TerminalState()
+        self.state.set_current_directory(self.test_dir)
+        self.search = SearchCommands(self.state)
+        
+        os.makedirs(os.path.join(self.test_dir, "src", "pkg"))
+        for name, size in [("src/main.py", 10), ("src/pkg/util.py", 5000),
+                           ("src/pkg/data.txt", 0), ("README.md", 100)]:
+            with open(os.path.join(self.test_dir, name), 'w') as f:
+                f.write("x" * size)
+    
+    def tearDown(self):
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+    
+    def test_find_name_and_type(self):
+        """Test -name glob and -type filters."""
+        result = sorted(self.search.find([".", "-name", "*.py"]).splitlines())
+        self.assertEqual(result, ["./src/main.py", "./src/pkg/util.py"])
+        
+        result = sorted(self.search.find(["src", "-type", "d"]).splitlines())
+        self.assertEqual(result, ["src", "src/pkg"])
+    
+    def test_find_size_and_depth(self):
+        """Test -size and -maxdepth filters."""
+        result = self.search.find([".", "-type", "f", "-size", "+4k"])
+        self.assertEqual(result, "./src/pkg/util.py")
+        
+        result = sorted(self.search.find([".", "-maxdepth", "1", "-type", "f"]).splitlines())
+        self.assertEqual(result, ["./README.md"])
+        
+        result = self.search.find([".", "-name", "*.txt", "-mtime", "-1"])
+        self.assertEqual(result, "./src/pkg/data.txt")
+    
+    def test_find_errors(self):
+        """Test invalid expressions and missing paths."""
+        self.assertIn("unknown predicate", self.search.find(["-bogus", "x"]))
+        self.assertIn("No such file", self.search.find(["missing"]))
+    
+    def test_grep_single_file(self):
+        """Test grep line output, -n, -i, -c and -F."""
+        with open(os.path.join(self.test_dir, "log.txt"), 'w') as f:
+            f.write("INFO start\nERROR disk full\ninfo done\nerror a.b\n")
+        
+        self.assertEqual(self.search.grep(["ERROR", "log.txt"]), "ERROR disk full")
+        self.assertEqual(self.search.grep(["-in", "error", "log.txt"]),
+                         "2:ERROR disk full\n4:error a.b")
+        self.assertEqual(self.search.grep(["-c", "^info", "log.txt"]), "1")
+        self.assertEqual(self.search.grep(["-F", "a.b", "log.txt"]), "error a.b")
+        self.assertEqual(self.search.grep(["-F", "x.y", "log.txt"]), "")
+        self.assertEqual(self.search.grep(["error", "log.txt", "-n", "-i"]),
+                         "2:ERROR disk full\n4:error a.b")
+        self.assertIn("No such file", self.search.grep(["--", "x", "-n"]))
+    
+    def test_grep_line_numbers_across_chunks(self):
+        """Test -n counts lines between matches further apart than one count chunk."""
+        with open(os.path.join(self.test_dir, "long.txt"), 'w') as f:
+            f.write("hit\n" + "filler\n" * 1000 + "hit\n" + "filler\n" * 10 + "hit\n")
+        with patch("commands.search.NEWLINE_COUNT_CHUNK", 64):
+            self.assertEqual(self.search.grep(["-n", "hit", "long.txt"]),
+                             "1:hit\n1002:hit\n1013:hit")
+    
+    def test_grep_stdin_and_proc_files(self):
+        """Test grep over piped input and over files that report size 0."""
+        terminal = TerminalEngine()
+        self.assertEqual(terminal.execute_command("echo alpha beta | grep -c beta"), "1")
+        if os.path.exists("/proc/self/status"):
+            self.assertIn("Name:", self.search.grep(["^Name", "/proc/self/status"]))
+    
+    def test_grep_pool_failure_resumes(self):
+        """Test a broken process pool neither repeats nor loses files."""
+        from concurrent.futures.process import BrokenProcessPool
+        paths = [os.path.join(self.test_dir, name) for name in ("README.md", "src/main.py")]
+        
+        class DyingPool:
+            def __init__(self, *args, **kwargs):
+                pass
+            def __enter__(self):
+                return self
+            def __exit__(self, *exc):
+                return False
+            def map(self, func, jobs, chunksize=1):
+                yield "first"
+                raise BrokenProcessPool("worker died")
+        
+        with patch("commands.search.PARALLEL_GREP_BYTES", 0), \
+                patch("commands.search.ProcessPoolExecutor", DyingPool):
+            results = list(iter_grep(paths, GrepMatcher("x+"), mode='count'))
+        self.assertEqual(results, [(paths[0], "first"), (paths[1], 1)])
+    
+    def test_grep_recursive(self):
+        """Test recursive grep with -l and binary skipping."""
+        with open(os.path.join(self.test_dir, "src", "main.py"), 'w') as f:
+            f.write("import os\nprint('hi')\n")
+        with open(os.path.join(self.test_dir, "src", "blob.bin"), 'wb') as f:
+            f.write(b"\0\0import os")
+        
+        self.assertEqual(self.search.grep(["-rl", "import", "."]), "./src/main.py")
+        self.assertEqual(self.search.grep(["-rn", "print", "src"]), "src/main.py:2:print('hi')")
+        self.assertIn("Is a directory", self.search.grep(["import", "src"]))
+    
+    def test_fuzzy_find(self):
+        """Test ff ranking, refinement and cache rebuilds."""
+        self.assertEqual(self.search.ff(["-n", "1", "util"]), "src/pkg/util.py")
+        self.assertEqual(self.search.ff(["spu"]).splitlines()[0], "src/pkg/util.py")
+        self.assertEqual(self.search.ff(["spupy"]), "src/pkg/util.py")
+        self.assertEqual(self.search.ff(["zzz"]), "")
+        self.assertIn("src/pkg/", self.search.ff(["pkg"]).splitlines())
+        
+        # Candidates are cached per root until rebuilt
+        with open(os.path.join(self.test_dir, "src", "utility.py"), 'w') as f:
+            f.write("")
+        self.assertNotIn("src/utility.py", self.search.ff(["utility"]))
+        self.assertEqual(self.search.ff(["-r", "utility"]), "src/utility.py")
+        
+        # Walks stop at the depth and candidate limits
+        self.search.finder.max_depth = 0
+        self.assertEqual(self.search.ff(["-r", "util"]), "")
+        self.search.finder.max_depth = None
+        self.search.finder.max_candidates = 2
+        self.assertIn("searched only the first 2 paths", self.search.ff(["-r", "s"]))
+    
+    def test_locate_and_updatedb(self):
+        """Test indexing a root, locate lookups and incremental refresh."""
+        index_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, index_dir, ignore_errors=True)
+        self.search = SearchCommands(self.state, FileIndex(os.path.join(index_dir, "index.db")))
+        self.assertIn("no indexed roots", self.search.locate(["util"]))
+        
+        self.assertIn("(3 directories)", self.search.updatedb(["--add", "."]))
+        self.search.index.stop_background()
+        self.assertEqual(self.search.locate(["util"]),
+                         os.path.join(self.test_dir, "src", "pkg", "util.py"))
+        self.assertEqual(len(self.search.locate(["-i", "readme*"]).splitlines()), 1)
+        
+        # New files show up after a refresh that rescans only the changed directory
+        with open(os.path.join(self.test_dir, "src", "helper_util.py"), 'w') as f:
+            f.write("pass\n")
+        self.assertEqual(len(self.search.locate(["util"]).splitlines()), 1)
+        self.assertEqual(self.search.updatedb([]), "Rescanned 1 directories, 2 unchanged")
+        self.assertEqual(len(self.search.locate(["util"]).splitlines()), 2)
+    
+    def test_index_upgrades_old_schema(self):
+        """Test an index written with the old wide entries table is rebuilt."""
+        import sqlite3
+        db_file = os.path.join(tempfile.mkdtemp(), "index.db")
+        self.addCleanup(shutil.rmtree, os.path.dirname(db_file), ignore_errors=True)
+        conn = sqlite3.connect(db_file)
+        conn.executescript(
+            "CREATE TABLE roots (path TEXT PRIMARY KEY);"
+            "CREATE TABLE dirs (path TEXT PRIMARY KEY, dev INTEGER, mtime_ns INTEGER, scanned REAL);"
+            "CREATE TABLE entries (dir TEXT, name TEXT, type TEXT, mode INTEGER, size INTEGER,"
+            " usage INTEGER, mtime REAL, ino INTEGER, nlink INTEGER, PRIMARY KEY (dir, name));")
+        conn.execute("INSERT INTO roots VALUES (?)", (self.test_dir,))
+        conn.commit()
+        conn.close()
+        
+        index = FileIndex(db_file)
+        self.assertEqual(index.refresh(), (3, 0))
+        self.assertEqual(index.stats(), (3, 6))
+        self.assertEqual(index.refresh(), (0, 3))
+        self.assertEqual(sorted(entry.name for entry in index.snapshot_dir(self.test_dir)),
+                         ["README.md", "src"])
+    
+    def test_find_falls_back_when_index_is_stale(self):
+        """Test that find, du and ls agree with and without the index."""
+        index = FileIndex(os.path.join(tempfile.mkdtemp(), "index.db"))
+        self.addCleanup(shutil.rmtree, os.path.dirname(index.db_file), ignore_errors=True)
+        index.add_root(self.test_dir)
+        index.refresh()
+        
+        indexed = SearchCommands(self.state, index)
+        src = os.path.join(self.test_dir, "src")
+        self.assertIsNotNone(index.snapshot_dir(src))
+        self.assertEqual(sorted(indexed.find([".", "-size", "+4k"]).splitlines()),
+                         sorted(self.search.find([".", "-size", "+4k"]).splitlines()))
+        
+        file_ops = FileOperations(self.state, file_index=index)
+        self.assertEqual(file_ops.du(["-s", "."]), FileOperations(self.state).du(["-s", "."]))
+        self.assertIn("pkg/", file_ops.ls(["src"]))
+        
+        # A changed directory is listed live until the next refresh
+        os.makedirs(os.path.join(src, "new"))
+        self.assertIsNone(index.snapshot_dir(src))
+        self.assertIn("src/new", indexed.find(["src", "-type", "d"]).splitlines())
+        self.assertIn("new/", file_ops.ls(["src"]))
+        
+        # A file rewritten in place leaves its directory current; sizes are still live
+        index.refresh()
+        pkg = os.path.join(src, "pkg")
+        mtime = os.stat(pkg).st_mtime_ns
+        with open(os.path.join(pkg, "data.txt"), 'w') as f:
+            f.write("x" * 20000)
+        os.utime(pkg, ns=(mtime, mtime))
+        self.assertIsNotNone(index.snapshot_dir(pkg))
+        self.assertIn("./src/pkg/data.txt", indexed.find([".", "-size", "+16k"]).splitlines())
+        self.assertEqual(file_ops.du(["-s", "."]), FileOperations(self.state).du(["-s", "."]))
+
+
+class TestChecksumCommands(unittest.TestCase):
+    """Test checksum commands."""
+    
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.state = TerminalState()
+        self.state.set_current_directory(self.test_dir)
+        self.checksums = ChecksumCommands(self.state)
+        with open(os.path.join(self.test_dir, "a.txt"), 'wb') as f:
+            f.write(b"hello\n")
+        with open(os.path.join(self.test_dir, "big.bin"), 'wb') as f:
+            f.write(b"\x01" * (3 * 1024 * 1024 + 17))
+    
+    def tearDown(self):
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+    
+    def test_sha256sum(self):
+        """Test digests match hashlib, including multi-chunk files."""
+        import hashlib
+        result = self.checksums.sha256sum(["a.txt", "big.bin"]).splitlines()
+        self.assertEqual(result[0], hashlib.sha256(b"hello\n").hexdigest() + "  a.txt")
+        expected = hashlib.sha256(b"\x01" * (3 * 1024 * 1024 + 17)).hexdigest()
+        self.assertEqual(result[1], expected + "  big.bin")
+        self.assertIn("No such file", self.checksums.md5sum(["missing"]))
+    
+    def test_verify_manifest(self):
+        """Test -c verification of a manifest."""
+        manifest = self.checksums.md5sum(["a.txt", "big.bin"])
+        with open(os.path.join(self.test_dir, "SUMS"), 'w') as f:
+            f.write(manifest + "\n")
+        self.assertEqual(self.checksums.md5sum(["-c", "SUMS"]), "a.txt: OK\nbig.bin: OK")
+        
+        with open(os.path.join(self.test_dir, "a.txt"), 'wb') as f:
+            f.write(b"changed\n")
+        result = self.checksums.md5sum(["-c", "SUMS"])
+        self.assertIn("a.txt: FAILED", result)
+        self.assertIn("1 computed checksum(s) did NOT match", result)
+    
+    def test_stdin_operand(self):
+        """Test '-' and no operand read piped input."""
+        import hashlib
+        terminal = TerminalEngine()
+        terminal.state.set_current_directory(self.test_dir)
+        expected = hashlib.sha256(b"hello\n").hexdigest()
+        self.assertEqual(terminal.execute_command("cat a.txt | sha256sum -"), f"{expected}  -")
+        self.assertEqual(terminal.execute_command("sha256sum < a.txt"), f"{expected}  -")
+        self.assertIn("no piped input", self.checksums.sha256sum(["-"]))
+        
+        terminal.execute_command("md5sum a.txt > SUMS")
+        self.assertEqual(terminal.execute_command("cat SUMS | md5sum -c -"), "a.txt: OK")
+
+
+class TestTextCommands(unittest.TestCase):
+    """Test sort, uniq and wc."""
+    
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.state = TerminalState()
+        self.state.set_current_directory(self.test_dir)
+        self.text = TextCommands(self.state)
+        with open(os.path.join(self.test_dir, "data.txt"), 'w') as f:
+            f.write("b 10\na 2\nc 1\na 2\n")
+    
+    def tearDown(self):
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+    
+    def test_sort_options(self):
+        """Test -n, -r, -k and -u."""
+        self.assertEqual(self.text.sort(["data.txt"]), "a 2\na 2\nb 10\nc 1")
+        self.assertEqual(self.text.sort(["-u", "data.txt"]), "a 2\nb 10\nc 1")
+        self.assertEqual(self.text.sort(["-n", "-k", "2", "data.txt"]), "c 1\na 2\na 2\nb 10")
+        self.assertEqual(self.text.sort(["-rn", "-k", "2", "-u", "data.txt"]), "b 10\na 2\nc 1")
+    
+    def test_external_sort_spills(self):
+        """Test that inputs over the memory budget merge correctly from spill files."""
+        import random
+        lines = [f"{random.randint(0, 10 ** 6):07d}" for _ in range(5000)]
+        sorter = ExternalSorter(memory_limit=4096)
+        result = list(sorter.sort(iter(lines)))
+        self.assertEqual(result, sorted(lines))
+        
+        sorter = ExternalSorter(memory_limit=4096, reverse=True, unique=True)
+        self.assertEqual(list(sorter.sort(iter(lines))), sorted(set(lines), reverse=True))
+    
+    def test_uniq_and_wc(self):
+        """Test uniq -c and wc counts."""
+        self.assertEqual(self.text.uniq(["data.txt"]), "b 10\na 2\nc 1\na 2")
+        self.assertEqual(self.text.wc(["data.txt"]), "      4       8      17 data.txt")
+        self.assertEqual(self.text.wc(["-l", "data.txt", "data.txt"]).splitlines()[-1],
+                         "      8 total")
+    
+    def test_diff(self):
+        """Test unified and brief diff output."""
+        with open(os.path.join(self.test_dir, "old.txt"), 'w') as f:
+            f.write("".join(f"line {i}\n" for i in range(20)))
+        with open(os.path.join(self.test_dir, "new.txt"), 'w') as f:
+            f.write("".join(f"line {i}\n" for i in range(20) if i != 10).replace("line 2\n", "line two\n"))
+        
+        self.assertEqual(self.text.diff(["old.txt", "old.txt"]), "")
+        self.assertEqual(self.text.diff(["-q", "old.txt", "new.txt"]), "Files old.txt and new.txt differ")
+        
+        lines = self.text.diff(["old.txt", "new.txt"]).splitlines()
+        self.assertTrue(lines[0].startswith("--- old.txt\t"))
+        self.assertTrue(lines[1].startswith("+++ new.txt\t"))
+        self.assertEqual(lines[2:11], ["@@ -1,6 +1,6 @@", " line 0", " line 1", "-line 2", "+line two",
+                                       " line 3", " line 4", " line 5", "@@ -8,7 +8,6 @@"])
+        self.assertIn("-line 10", lines)
+    
+    def test_pipeline(self):
+        """Test commands consuming piped and redirected input through the engine."""
+        terminal = TerminalEngine()
+        terminal.state.set_current_directory(self.test_dir)
+        self.assertEqual(terminal.execute_command("sort data.txt | uniq -c"),
+                         "      2 a 2\n      1 b 10\n      1 c 1")
+        self.assertEqual(terminal.execute_command("wc -l < data.txt"), "      4")
+        self.assertEqual(terminal.execute_command("echo one two | wc -w"), "      2")
+        self.assertEqual(terminal.execute_command("cat data.txt | wc -l"), "      4")
+        self.assertEqual(terminal.execute_command("sort data.txt | uniq | wc -l"), "      3")
+        
+        # Streamed sort output reaches files and later stages whole
+        terminal.execute_command("sort -S 1K -k 2 -n data.txt > sorted.txt")
+        with open(os.path.join(self.test_dir, "sorted.txt")) as f:
+            self.assertEqual(f.read(), "c 1\na 2\na 2\nb 10\n")
+        self.assertEqual(terminal.execute_command("sort data.txt | wc -l"), "      4")
+
+
+class TestArchiveCommands(unittest.TestCase):
+    """Test tar and gzip."""
+    
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.state = TerminalState()
+        self.state.set_current_directory(self.test_dir)
+        self.archives = ArchiveCommands(self.state)
+        os.makedirs(os.path.join(self.test_dir, "logs", "old"))
+        with open(os.path.join(self.test_dir, "logs", "app.log"), 'w') as f:
+            f.write("request ok\n" * 50000)
+        with open(os.path.join(self.test_dir, "logs", "old", "app.1.log"), 'w') as f:
+            f.write("archived\n")
+    
+    def tearDown(self):
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+    
+    def test_gzip_roundtrip(self):
+        """Test multi-member gzip output reads back with the standard library."""
+        import gzip
+        log = os.path.join(self.test_dir, "logs", "app.log")
+        self.assertEqual(self.archives.gzip(["-k", "logs/app.log"]), "")
+        with gzip.open(log + ".gz", 'rb') as f:
+            self.assertEqual(f.read(), b"request ok\n" * 50000)
+        
+        os.remove(log)
+        self.assertEqual(self.archives.gunzip(["logs/app.log.gz"]), "")
+        with open(log, 'rb') as f:
+            self.assertEqual(f.read(), b"request ok\n" * 50000)
+        self.assertFalse(os.path.exists(log + ".gz"))
+    
+    def test_gunzip_corrupt_member(self):
+        """Test a damaged deflate block is reported and leaves no partial output."""
+        import gzip
+        data = bytearray(gzip.compress(b"payload\n" * 1000, mtime=0))
+        data[10] = 0x07  # final block with the reserved block type
+        with open(os.path.join(self.test_dir, "bad.gz"), 'wb') as f:
+            f.write(data)
+        
+        result = self.archives.gunzip(["-k", "bad.gz"])
+        self.assertTrue(result.startswith("gunzip: bad.gz: "), result)
+        self.assertFalse(os.path.exists(os.path.join(self.test_dir, "bad")))
+    
+    def test_tar_create_list_extract(self):
+        """Test tar -czf, -tf and -xf round trip."""
+        self.assertEqual(self.archives.tar(["-czf", "bundle.tgz", "logs"]), "")
+        listing = self.archives.tar(["-tzf", "bundle.tgz"]).splitlines()
+        self.assertEqual(sorted(listing), ["logs", "logs/app.log", "logs/old", "logs/old/app.1.log"])
+        
+        os.mkdir(os.path.join(self.test_dir, "out"))
+        self.assertEqual(self.archives.tar(["xf", "bundle.tgz", "-C", "out"]), "")
+        with open(os.path.join(self.test_dir, "out", "logs", "old", "app.1.log")) as f:
+            self.assertEqual(f.read(), "archived\n")
+        
+        self.assertIn("No such file", self.archives.tar(["-tf", "missing.tar"]))
+
+
+class TestSystemInfo(unittest.TestCase):
+    """Test process and system information commands."""
+    
+    def setUp(self):
+        self.state = TerminalState()
+        self.state.columns = 200
+        self.sys_info = SystemInfo(self.state)
+    
+    def test_ps_pid_filter(self):
+        """Test ps -p selects exactly the given processes."""
+        pid = os.getpid()
+        lines = self.sys_info.ps(["-f", "-p", str(pid)]).splitlines()
+        self.assertEqual(len(lines), 2)
+        self.assertEqual(lines[0].split()[0], "PID")
+        self.assertEqual(lines[1].split()[0], str(pid))
+    
+    def test_ps_errors(self):
+        """Test ps reports bad sort keys and unknown users."""
+        self.assertIn("unknown sort key", self.sys_info.ps(["--sort=bogus"]))
+        self.assertIn("no-such-user-xyz", self.sys_info.ps(["-u", "no-such-user-xyz"]))
+    
+    def test_sort_processes(self):
+        """Test multi-key sorting with descending keys."""
+        procs = ProcessScanner().scan(pids=[os.getpid(), os.getppid()])
+        ordered = sort_processes(list(procs), parse_sort("-pid"))
+        self.assertEqual([p.pid for p in ordered], sorted((p.pid for p in procs), reverse=True))
+        self.assertRaises(ValueError, parse_sort, "cpu,nope")
+    
+    def test_pstree(self):
+        """Test tree drawing, leaf merging, rollups and very deep chains."""
+        def proc(pid, ppid, name, cpu=1.0):
+            return ProcessInfo(pid, ppid, name, 0, 'root', 'sleeping', cpu, 0.5, 0, 0.0, 0.0, None)
+        
+        procs = [proc(1, 0, 'init'), proc(2, 1, 'sh'), proc(3, 2, 'sleep'), proc(4, 2, 'sleep'),
+                 proc(5, 1, 'cron', cpu=2.0)]
+        sys_info = SystemInfo(self.state, sampler=Mock(latest=lambda: Mock(processes=procs)))
+        self.assertEqual(sys_info.pstree([]), "init\n├─ sh\n│  └─ 2*[sleep]\n└─ cron")
+        self.assertEqual(sys_info.pstree(["-p", "2"]), "sh(2)\n├─ sleep(3)\n└─ sleep(4)")
+        self.assertIn("init [cpu 6.0% mem 2.5%]", sys_info.pstree(["-r"]))
+        
+        chain = [proc(pid, pid - 1, 'p') for pid in range(1, 5001)]
+        by_pid, children, roots = build_tree(chain)
+        self.assertEqual(roots, [1])
+        self.assertEqual(subtree_totals(1, by_pid, children)[1][0], 5000.0)
+    
+    def test_df_mount_timeouts(self):
+        """Test a hung mount times out once and isn't queried again while stuck."""
+        table = MountTable()
+        mounts = [Mount('/dev/a', '/', 'ext4', 'rw'), Mount('nfs:/x', '/mnt/dead', 'nfs', 'rw')]
+        table.mounts = lambda ttl=None: mounts
+        started = []
+        
+        def statvfs(mountpoint):
+            started.append(mountpoint)
+            if mountpoint == '/':
+                return MountTable._statvfs(mountpoint)
+            return Future()  # never completes
+        
+        table._statvfs = statvfs
+        results = dict((m.mountpoint, u) for m, u in table.usage(mounts, ttl=60, timeout=0.05))
+        self.assertIs(results['/mnt/dead'], TIMED_OUT)
+        self.assertGreater(results['/'].total, 0)
+        
+        output = SystemInfo(self.state, mounts=table).df(["--ttl", "60"])
+        self.assertRegex(output, r"nfs:/x +\? +\? +\? +- /mnt/dead")
+        self.assertEqual(sorted(started), ['/', '/mnt/dead'])
+    
+    @unittest.skipUnless(procfs.AVAILABLE, "requires Linux /proc")
+    def test_procfs_scanner_matches_psutil(self):
+        """Test the /proc reader agrees with psutil on this process."""
+        fast, = ProcessScanner(use_procfs=True, with_cmdline=True).scan(pids=[os.getpid()])
+        slow, = ProcessScanner(use_procfs=False, with_cmdline=True).scan(pids=[os.getpid()])
+        for field in ('pid', 'ppid', 'name', 'user', 'status', 'cmdline'):
+            self.assertEqual(getattr(fast, field), getattr(slow, field))
+        self.assertAlmostEqual(fast.create_time, slow.create_time, delta=0.05)
+        self.assertEqual(procfs.virtual_memory().total, psutil.virtual_memory().total)
+        self.assertEqual(ProcessScanner(use_procfs=True).scan(pids=[2 ** 22 + 1]), [])
+    
+    def test_sampler_reuses_latest_snapshot(self):
+        """Test readers get the cached sample and CPU% is measured between samples."""
+        sampler = SystemSampler(interval=60)
+        first = sampler.sample()
+        sum(range(200000))
+        second = sampler.sample()
+        self.assertGreater(second.interval, 0)
+        self.assertIn(os.getpid(), [p.pid for p in second.processes])
+        self.assertTrue(0 <= second.cpu_percent <= 100)
+        self.assertIs(sampler.latest(), second)
+        self.assertEqual(sampler.samples, 2)
+        sampler.stop()
+    
+    def test_top_batch_frames(self):
+        """Test top -d/-n prints successive frames when there is no terminal to draw on."""
+        output = self.sys_info.top(["-d", "0.01", "-n", "2", "-o", "pid"])
+        self.assertEqual(output.count("Top Processes by PID:"), 2)
+        self.assertIn("invalid delay", self.sys_info.top(["-d", "0"]))
+    
+    def test_metrics_ring_buffer(self):
+        """Test the recorder keeps the newest samples in fixed memory and downsamples them."""
+        recorder = MetricsRecorder(capacity=4)
+        size = recorder.memory_bytes()
+        for t in range(10):
+            recorder.record(float(t), {'cpu': t * 10.0})
+        self.assertEqual(recorder.memory_bytes(), size)
+        times, series = recorder.window()
+        self.assertEqual(list(times), [6.0, 7.0, 8.0, 9.0])
+        self.assertEqual(list(recorder.window(1.5)[0]), [8.0, 9.0])
+        
+        buckets = recorder.downsample(2, fields=['cpu'])
+        self.assertEqual([b['cpu'] for b in buckets], [(60.0, 65.0, 70.0), (80.0, 85.0, 90.0)])
+        
+        output = SystemInfo(recorder=recorder).sar(["-w", "1"])
+        self.assertIn("Average:", output)
+    
+    def test_telemetry_exposition(self):
+        """Test per-thread counters are merged into cumulative OpenMetrics output."""
+        import threading
+        registry = Telemetry()
+        registry.record_command('ls', 0.002)
+        worker = threading.Thread(target=registry.record_command, args=('ls', 20.0, False))
+        worker.start()
+        worker.join()
+        registry.record_command(None, 0.0)
+        registry.record_cache('du', hits=3, misses=1)
+        registry.register_gauge('host_up', "Always one.", lambda: [({}, 1)])
+        
+        text = registry.render()
+        self.assertIn('terminal_commands_total{command="ls"} 2', text)
+        self.assertIn('terminal_command_errors_total{command="ls"} 1', text)
+        self.assertIn('terminal_command_duration_seconds_bucket{command="ls",le="0.001"} 0', text)
+        self.assertIn('terminal_command_duration_seconds_bucket{command="ls",le="0.005"} 1', text)
+        self.assertIn('terminal_command_duration_seconds_bucket{command="ls",le="+Inf"} 2', text)
+        self.assertIn('terminal_unknown_commands_total 1', text)
+        self.assertIn('terminal_cache_hits_total{cache="du"} 3', text)
+        self.assertIn('host_up 1', text)
+        self.assertTrue(text.endswith("# EOF\n"))
+        # The finished thread's shard was folded away, keeping its counts
+        self.assertEqual(len(registry._shards), 1)
+        self.assertIn('terminal_commands_total{command="ls"} 2', registry.render())
+    
+    def test_live_screen_redraws_changed_lines(self):
+        """Test only changed rows are rewritten between frames."""
+        stream = io.StringIO()
+        screen = LiveScreen(stream)
+        screen.size = lambda: os.terminal_size((40, 10))
+        self.assertEqual(screen.draw(["header", "row 1", "row 2"]), 3)
+        stream.seek(0)
+        stream.truncate()
+        self.assertEqual(screen.draw(["header", "row one"]), 2)
+        self.assertEqual(stream.getvalue(), "\x1b[2;1Hrow one\x1b[K\x1b[3;1H\x1b[K")
 
 
 class TestCommandHistory(unittest.TestCase):
@@ -232,6 +1093,98 @@ class TestTerminalEngine(unittest.TestCase):
         self.assertEqual(result, "hello world")
 
 
+class TestSessionPool(unittest.TestCase):
+    """Test the pooled web sessions."""
+    
+    def test_state_persists_within_session(self):
+        pool = SessionPool()
+        first = pool.execute(None, "mkdir work")
+        sid = first['sessionId']
+        pool.execute(sid, "cd work")
+        pool.execute(sid, "echo hi > note.txt")
+        result = pool.execute(sid, "cat note.txt")
+        self.assertEqual(result['sessionId'], sid)
+        self.assertEqual(result['output'].strip(), "hi")
+        self.assertTrue(result['currentDir'].endswith("/work"))
+    
+    def test_sessions_are_isolated(self):
+        pool = SessionPool()
+        a = pool.execute(None, "touch only_a.txt")['sessionId']
+        b = pool.execute(None, "ls")['sessionId']
+        self.assertNotEqual(a, b)
+        self.assertNotIn("only_a.txt", pool.execute(b, "ls")['output'])
+        self.assertFalse(os.path.exists(os.path.join(os.getcwd(), "only_a.txt")))
+    
+    def test_host_commands_not_available(self):
+        pool = SessionPool()
+        result = pool.execute(None, "grep root /etc/passwd")
+        self.assertIn("Command not found", result['output'])
+        self.assertTrue(pool.execute(result['sessionId'], "clear")['clear'])
+        
+        # Nothing that would hold the session or reveal host command lines
+        sid = result['sessionId']
+        self.assertIn("not available", pool.execute(sid, "top -d 3600 -n 1000000")['output'])
+        self.assertIn("not available", pool.execute(sid, "ps -a -f")['output'])
+        self.assertIn("PID", pool.execute(sid, "ps -a")['output'])
+    
+    def test_columns_from_request(self):
+        pool = SessionPool()
+        sid = pool.execute(None, "touch one two three four")['sessionId']
+        self.assertEqual(pool.execute(sid, "ls", columns=20)['output'], "four  three\none   two")
+        # The width sticks to the session, and is clamped or ignored when unusable
+        self.assertEqual(pool.execute(sid, "ls")['output'], "four  three\none   two")
+        self.assertEqual(pool.execute(sid, "ls", columns=100000)['output'], "four  one  three  two")
+        pool.execute(sid, "pwd", columns="wide")
+        self.assertEqual(pool.get(sid).engine.state.columns, 500)
+        pool.execute(sid, "pwd", columns=1)
+        self.assertEqual(pool.get(sid).engine.state.columns, 20)
+        reply = pool.execute_batch(sid, ["ls"], columns=80)
+        self.assertEqual(reply['results'][0]['output'], "four  one  three  two")
+    
+    def test_lru_and_memory_eviction(self):
+        pool = SessionPool(max_sessions=2)
+        a = pool.get().id
+        b = pool.get().id
+        pool.get(a)
+        c = pool.get().id
+        self.assertEqual(set(pool._sessions), {a, c})
+        self.assertNotEqual(pool.get(b).id, b)
+        
+        pool = SessionPool(session_bytes=1024, max_bytes=4000)
+        fill = "echo " + "x" * 900 + " > f"
+        first = pool.execute(None, fill)['sessionId']
+        second = pool.execute(None, fill)['sessionId']
+        pool.get()
+        self.assertNotIn(first, pool._sessions)
+        self.assertIn(second, pool._sessions)
+    
+    def test_batch_runs_in_order(self):
+        pool = SessionPool()
+        reply = pool.execute_batch(None, ["mkdir docs", "cd docs", "echo hi > a.txt", "cat a.txt"])
+        self.assertEqual(len(reply['results']), 4)
+        self.assertEqual(reply['results'][3]['output'].strip(), "hi")
+        self.assertTrue(all(r['sessionId'] == reply['sessionId'] for r in reply['results']))
+        
+        other = pool.get().id
+        reply = pool.execute_batch(reply['sessionId'], [
+            {'commandLine': "pwd", 'independent': True},
+            {'commandLine': "pwd", 'independent': True, 'sessionId': other},
+            "echo done",
+        ])
+        outputs = [r['output'] for r in reply['results']]
+        self.assertEqual(outputs, ["/home/user/docs", "/home/user", "done"])
+        self.assertFalse(pool.execute_batch(None, ["pwd"] * 101)['success'])
+        
+        # Made-up ids fall back to the batch's session instead of creating more
+        pool = SessionPool(max_sessions=3)
+        keep = pool.get().id
+        reply = pool.execute_batch(None, [{'commandLine': "pwd", 'sessionId': f"fake{i}"}
+                                          for i in range(50)])
+        self.assertEqual(len(pool), 2)
+        self.assertIn(keep, pool._sessions)
+        self.assertTrue(all(r['sessionId'] == reply['sessionId'] for r in reply['results']))
+
+
 if __name__ == '__main__':
     # Run all tests
     unittest.main(verbosity=2)
\ No newline at end of file
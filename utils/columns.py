@@ -0,0 +1,150 @@
+"""
+Terminal-width-aware column layout for listings and tables.
+"""
+import os
+import shutil
+import unicodedata
+from typing import List, Optional, Sequence
+
+# One character plus the separator, as in GNU ls
+MIN_COLUMN_WIDTH = 3
+DEFAULT_WIDTH = 80
+
+
+def terminal_width(default: int = DEFAULT_WIDTH) -> int:
+    """Width of the attached terminal, honouring $COLUMNS, else `default`."""
+    columns = os.environ.get('COLUMNS', '')
+    if columns.isdigit() and int(columns) > 0:
+        return int(columns)
+    return shutil.get_terminal_size((default, 24)).columns
+
+
+def display_width(text: str) -> int:
+    """Cells `text` occupies: wide East Asian characters take two, combining marks none."""
+    if text.isascii():
+        return len(text)
+    width = 0
+    for char in text:
+        if unicodedata.combining(char):
+            continue
+        width += 2 if unicodedata.east_asian_width(char) in ('W', 'F') else 1
+    return width
+
+
+def truncate(text: str, width: int, ellipsis: str = "...") -> str:
+    """Cut `text` to at most `width` cells, marking the cut with an ellipsis."""
+    if display_width(text) <= width:
+        return text
+    if width <= len(ellipsis):
+        return ellipsis[:width]
+    budget = width - len(ellipsis)
+    used = 0
+    for i, char in enumerate(text):
+        char_width = display_width(char)
+        if used + char_width > budget:
+            return text[:i] + ellipsis
+        used += char_width
+    return text
+
+
+def columnize(items: Sequence[str], width: Optional[int] = None, separator: int = 2) -> str:
+    """
+    Lay out `items` in columns, filled top to bottom, like `ls -C`.
+
+    Every candidate column count is evaluated in one pass over the
+    precomputed item widths, tracking each candidate's column widths and
+    total line length as GNU ls does, and the largest count that fits is
+    used. Columns are only as wide as their own longest item.
+    """
+    n = len(items)
+    if not n:
+        return ""
+    width = width or terminal_width()
+    widths = [display_width(item) for item in items]
+
+    max_cols = max(1, min(n, width // MIN_COLUMN_WIDTH))
+    valid = [True] * max_cols
+    line_len = [0] * max_cols
+    col_widths = [[0] * cols for cols in range(1, max_cols + 1)]
+    rows_for = [-(-n // cols) for cols in range(1, max_cols + 1)]
+
+    for i, item_width in enumerate(widths):
+        for c in range(max_cols):
+            if not valid[c]:
+                continue
+            rows = rows_for[c]
+            col = i // rows
+            # The last column used for this count needs no trailing separator
+            needed = item_width + (separator if col != (n - 1) // rows else 0)
+            if needed > col_widths[c][col]:
+                line_len[c] += needed - col_widths[c][col]
+                col_widths[c][col] = needed
+                valid[c] = line_len[c] <= width
+
+    cols = next((c + 1 for c in range(max_cols - 1, -1, -1) if valid[c]), 1)
+    rows = rows_for[cols - 1]
+    col_width = col_widths[cols - 1]
+
+    lines = []
+    for row in range(rows):
+        cells = []
+        for col in range(cols):
+            index = col * rows + row
+            if index >= n:
+                break
+            item = items[index]
+            if index + rows < n:
+                item += " " * (col_width[col] - widths[index])
+            cells.append(item)
+        lines.append("".join(cells))
+    return "\n".join(lines)
+
+
+def format_table(rows: Sequence[Sequence[str]], headers: Optional[Sequence[str]] = None,
+                 align: Optional[str] = None, width: Optional[int] = None,
+                 separator: str = " ") -> str:
+    """
+    Render rows of strings as aligned columns sized to their contents.
+
+    Args:
+        rows: Table cells, already formatted as strings
+        headers: Optional header row
+        align: One '<' or '>' per column (default: all left)
+        width: If given, the last column is truncated so lines fit
+        separator: Text placed between columns
+
+    The last column is never padded, so lines carry no trailing spaces.
+    """
+    table: List[Sequence[str]] = ([headers] if headers else []) + list(rows)
+    if not table:
+        return ""
+    ncols = max(len(row) for row in table)
+    align = align or '<' * ncols
+    cell_widths = [[display_width(cell) for cell in row] for row in table]
+    col_widths = [0] * ncols
+    for row_widths in cell_widths:
+        for col, cell_width in enumerate(row_widths):
+            if cell_width > col_widths[col]:
+                col_widths[col] = cell_width
+
+    last_budget = None
+    if width is not None:
+        fixed = sum(col_widths[:-1]) + len(separator) * (ncols - 1)
+        last_budget = max(width - fixed, MIN_COLUMN_WIDTH)
+
+    lines = []
+    for row, row_widths in zip(table, cell_widths):
+        cells = []
+        last = len(row) - 1
+        for col, (cell, cell_width) in enumerate(zip(row, row_widths)):
+            if col == last:
+                if col == ncols - 1 and last_budget is not None:
+                    cell = truncate(cell, last_budget)
+                if align[col] == '>':
+                    cell = " " * (col_widths[col] - cell_width) + cell
+                cells.append(cell)
+                continue
+            padding = " " * (col_widths[col] - cell_width)
+            cells.append(padding + cell if align[col] == '>' else cell + padding)
+        lines.append(separator.join(cells))
+    return "\n".join(lines)
@@ -0,0 +1,156 @@
+"""
+Duplicate file detection and replacement with hard links or reflinks.
+"""
+import os
+import shutil
+import stat
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+# Handle both relative and absolute imports
+try:
+    from .copy_engine import clone_fd
+    from .hashing import hash_files
+    from .walker import walk_parallel
+except ImportError:
+    # Fallback for absolute imports when running directly
+    from utils.copy_engine import clone_fd
+    from utils.hashing import hash_files
+    from utils.walker import walk_parallel
+
+
+# Bytes hashed by the prefilter pass
+PARTIAL_HASH_SIZE = 64 * 1024
+
+HASH_ALGORITHM = 'blake2b'
+
+LINK_MODES = ('hardlink', 'reflink')
+
+
+class DuplicateFinder:
+    """
+    Finds groups of files with identical contents.
+
+    Candidates are narrowed in three passes so that most files are never
+    read: files are grouped by size, same-size files by a hash of their
+    first PARTIAL_HASH_SIZE bytes, and only the survivors are hashed in
+    full. Files that are already hard links of each other count once.
+    """
+
+    def __init__(self, min_size: int = 1, workers: int = None):
+        self.min_size = min_size
+        self.workers = workers
+        self.files_scanned = 0
+        self.bytes_hashed = 0
+        self.errors = []
+
+    def find(self, roots: List[str]) -> List[List[str]]:
+        """
+        Return duplicate groups, each sorted, largest files first.
+
+        Args:
+            roots: Files or directories to search
+        """
+        by_size = defaultdict(list)
+        for path, st in self._collect(roots):
+            by_size[st.st_size].append((path, st))
+
+        groups = []
+        for size in sorted(by_size, reverse=True):
+            candidates = self._unique_inodes(by_size[size])
+            if len(candidates) < 2:
+                continue
+            for group in self._split_by_hash(candidates, size, PARTIAL_HASH_SIZE):
+                if size > PARTIAL_HASH_SIZE:
+                    # The prefix matched; compare whole contents
+                    groups.extend(self._split_by_hash(group, size, None))
+                else:
+                    groups.append(group)
+        return [sorted(group) for group in groups]
+
+    def _collect(self, roots: List[str]) -> List[Tuple[str, os.stat_result]]:
+        """Regular files under the roots that are at least min_size bytes."""
+        found = []
+
+        def visit(path: str, depth: int, entries) -> List[Tuple[str, os.stat_result]]:
+            files = []
+            for entry in entries:
+                try:
+                    if not entry.is_file(follow_symlinks=False):
+                        continue
+                    st = entry.stat(follow_symlinks=False)
+                except OSError:
+                    continue
+                if st.st_size >= self.min_size:
+                    files.append((entry.path, st))
+            return files
+
+        for root in roots:
+            st = os.lstat(root)
+            if stat.S_ISREG(st.st_mode):
+                if st.st_size >= self.min_size:
+                    found.append((root, st))
+                continue
+            if not stat.S_ISDIR(st.st_mode):
+                continue
+            for result in walk_parallel(root, visit, workers=self.workers):
+                if result.error is not None:
+                    self.errors.append(f"cannot read directory '{result.path}': "
+                                       f"{result.error.strerror or result.error}")
+                    continue
+                found.extend(result.value)
+
+        self.files_scanned += len(found)
+        return found
+
+    def _unique_inodes(self, files: List[Tuple[str, os.stat_result]]) -> List[str]:
+        """Drop extra names of the same inode; they are already deduplicated."""
+        seen = set()
+        unique = []
+        for path, st in files:
+            key = (st.st_dev, st.st_ino)
+            if key not in seen:
+                seen.add(key)
+                unique.append(path)
+        return unique
+
+    def _split_by_hash(self, paths: List[str], size: int, limit) -> List[List[str]]:
+        """Group same-size paths by content hash (of the first `limit` bytes, or all)."""
+        by_digest: Dict[str, List[str]] = defaultdict(list)
+        for path, digest, error in hash_files(paths, HASH_ALGORITHM, self.workers, limit):
+            if error is not None:
+                self.errors.append(f"{path}: {error.strerror or error}")
+                continue
+            by_digest[digest].append(path)
+            self.bytes_hashed += size if limit is None else min(size, limit)
+        return [group for group in by_digest.values() if len(group) > 1]
+
+
+def replace_with_link(original: str, duplicate: str, mode: str = 'hardlink'):
+    """
+    Atomically replace `duplicate` with a hard link or reflink of `original`.
+
+    The new file is built under a temporary name in the duplicate's
+    directory and renamed over it, so the duplicate is never missing. A
+    reflink keeps the duplicate's own permissions and timestamps; a hard
+    link necessarily shares the original's.
+
+    Raises:
+        OSError: if linking fails, e.g. across filesystems
+    """
+    if mode not in LINK_MODES:
+        raise ValueError(f"invalid link mode '{mode}'")
+    directory, name = os.path.split(duplicate)
+    temp = os.path.join(directory, f".{name}.dedupe-{os.getpid()}")
+    try:
+        if mode == 'hardlink':
+            os.link(original, temp)
+        else:
+            with open(original, 'rb') as fsrc, open(temp, 'wb') as fdst:
+                clone_fd(fsrc.fileno(), fdst.fileno())
+            shutil.copystat(duplicate, temp)
+        os.replace(temp, duplicate)
+    except BaseException:
+        if os.path.lexists(temp):
+            os.remove(temp)
+        raise
@@ -0,0 +1,231 @@
+"""
+Line diffing with Myers' linear-space algorithm and unified output.
+"""
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+# (a_start, b_start, length) runs of equal lines, like difflib's matching blocks
+Block = Tuple[int, int, int]
+
+
+def intern_lines(a_lines: Sequence, b_lines: Sequence) -> Tuple[List[int], List[int]]:
+    """Map lines to small integers so the diff compares ints, not strings."""
+    ids: Dict = {}
+    a = [ids.setdefault(line, len(ids)) for line in a_lines]
+    b = [ids.setdefault(line, len(ids)) for line in b_lines]
+    return a, b
+
+
+def matching_blocks(a: Sequence[int], b: Sequence[int]) -> List[Block]:
+    """
+    Compute a minimal diff of two sequences as a list of matching blocks.
+
+    Uses Myers' O(ND) algorithm in its linear-space, divide-and-conquer
+    form: each subproblem strips its common prefix and suffix, then a
+    bisection finds the middle of an optimal edit path and both halves are
+    solved independently. Subproblems are kept on an explicit stack, so
+    deep splits never touch the recursion limit.
+
+    Returns:
+        Sorted (a_start, b_start, length) blocks, ending with a zero-length
+        sentinel at (len(a), len(b)) like difflib.
+    """
+    blocks = []
+    stack = [(0, len(a), 0, len(b))]
+    while stack:
+        a0, a1, b0, b1 = stack.pop()
+
+        # Common prefix
+        start = a0
+        while a0 < a1 and b0 < b1 and a[a0] == b[b0]:
+            a0 += 1
+            b0 += 1
+        if a0 > start:
+            blocks.append((start, b0 - (a0 - start), a0 - start))
+
+        # Common suffix
+        end = a1
+        while a1 > a0 and b1 > b0 and a[a1 - 1] == b[b1 - 1]:
+            a1 -= 1
+            b1 -= 1
+        if a1 < end:
+            blocks.append((a1, b1, end - a1))
+
+        if a0 == a1 or b0 == b1:
+            continue
+
+        split = _bisect(a, a0, a1, b, b0, b1)
+        if split is None:
+            # Nothing in common; the whole range is a replacement
+            continue
+        x, y = split
+        stack.append((x, a1, y, b1))
+        stack.append((a0, x, b0, y))
+
+    blocks.sort()
+
+    # Merge adjacent runs produced by neighbouring subproblems
+    merged = []
+    for block in blocks:
+        if merged and merged[-1][0] + merged[-1][2] == block[0] and merged[-1][1] + merged[-1][2] == block[1]:
+            last = merged[-1]
+            merged[-1] = (last[0], last[1], last[2] + block[2])
+        else:
+            merged.append(block)
+    merged.append((len(a), len(b), 0))
+    return merged
+
+
+def _bisect(a: Sequence[int], a0: int, a1: int, b: Sequence[int], b0: int, b1: int) -> Optional[Tuple[int, int]]:
+    """
+    Find the point where forward and reverse Myers searches meet.
+
+    Returns absolute (x, y) indexes splitting the range into two smaller
+    diff problems, or None if the ranges share no element.
+    """
+    n = a1 - a0
+    m = b1 - b0
+    max_d = (n + m + 1) // 2
+    v_offset = max_d
+    v_length = 2 * max_d + 2
+    v1 = [-1] * v_length
+    v2 = [-1] * v_length
+    v1[v_offset + 1] = 0
+    v2[v_offset + 1] = 0
+    delta = n - m
+    # With an odd delta the paths meet while extending forward
+    front = delta % 2 != 0
+    k1start = k1end = k2start = k2end = 0
+
+    for d in range(max_d):
+        for k1 in range(-d + k1start, d + 1 - k1end, 2):
+            k1_offset = v_offset + k1
+            if k1 == -d or (k1 != d and v1[k1_offset - 1] < v1[k1_offset + 1]):
+                x1 = v1[k1_offset + 1]
+            else:
+                x1 = v1[k1_offset - 1] + 1
+            y1 = x1 - k1
+            while x1 < n and y1 < m and a[a0 + x1] == b[b0 + y1]:
+                x1 += 1
+                y1 += 1
+            v1[k1_offset] = x1
+            if x1 > n:
+                k1end += 2
+            elif y1 > m:
+                k1start += 2
+            elif front:
+                k2_offset = v_offset + delta - k1
+                if 0 <= k2_offset < v_length and v2[k2_offset] != -1:
+                    if x1 >= n - v2[k2_offset]:
+                        return a0 + x1, b0 + y1
+
+        for k2 in range(-d + k2start, d + 1 - k2end, 2):
+            k2_offset = v_offset + k2
+            if k2 == -d or (k2 != d and v2[k2_offset - 1] < v2[k2_offset + 1]):
+                x2 = v2[k2_offset + 1]
+            else:
+                x2 = v2[k2_offset - 1] + 1
+            y2 = x2 - k2
+            while x2 < n and y2 < m and a[a1 - 1 - x2] == b[b1 - 1 - y2]:
+                x2 += 1
+                y2 += 1
+            v2[k2_offset] = x2
+            if x2 > n:
+                k2end += 2
+            elif y2 > m:
+                k2start += 2
+            elif not front:
+                k1_offset = v_offset + delta - k2
+                if 0 <= k1_offset < v_length and v1[k1_offset] != -1:
+                    x1 = v1[k1_offset]
+                    y1 = v_offset + x1 - k1_offset
+                    if x1 >= n - x2:
+                        return a0 + x1, b0 + y1
+
+    return None
+
+
+def opcodes(blocks: List[Block]) -> List[Tuple[str, int, int, int, int]]:
+    """Turn matching blocks into difflib-style (tag, i1, i2, j1, j2) opcodes."""
+    codes = []
+    i = j = 0
+    for ai, bj, size in blocks:
+        if i < ai and j < bj:
+            codes.append(('replace', i, ai, j, bj))
+        elif i < ai:
+            codes.append(('delete', i, ai, j, bj))
+        elif j < bj:
+            codes.append(('insert', i, ai, j, bj))
+        if size:
+            codes.append(('equal', ai, ai + size, bj, bj + size))
+        i, j = ai + size, bj + size
+    return codes
+
+
+def _format_range(start: int, stop: int) -> str:
+    """Unified diff range: 1-based start, omitting a length of 1."""
+    beginning = start + 1
+    length = stop - start
+    if length == 1:
+        return str(beginning)
+    if not length:
+        beginning -= 1
+    return f"{beginning},{length}"
+
+
+def unified_diff(a_lines: Sequence[str], b_lines: Sequence[str], a_label: str, b_label: str,
+                 context: int = 3) -> Iterator[str]:
+    """
+    Yield unified diff lines (without trailing newlines) for two line lists.
+
+    Lines keep their line endings on input so that a missing final newline
+    shows up as a change, marked with "\\ No newline at end of file".
+    """
+    a, b = intern_lines(a_lines, b_lines)
+    codes = opcodes(matching_blocks(a, b))
+    if all(code[0] == 'equal' for code in codes):
+        return
+
+    # Trim unchanged lead-in and tail to the context size
+    if codes[0][0] == 'equal':
+        tag, i1, i2, j1, j2 = codes[0]
+        codes[0] = (tag, max(i1, i2 - context), i2, max(j1, j2 - context), j2)
+    if codes[-1][0] == 'equal':
+        tag, i1, i2, j1, j2 = codes[-1]
+        codes[-1] = (tag, i1, min(i2, i1 + context), j1, min(j2, j1 + context))
+
+    # Start a new hunk wherever more than 2 * context lines are unchanged
+    groups = []
+    group = []
+    for tag, i1, i2, j1, j2 in codes:
+        if tag == 'equal' and i2 - i1 > 2 * context:
+            group.append((tag, i1, min(i2, i1 + context), j1, min(j2, j1 + context)))
+            groups.append(group)
+            group = []
+            i1, j1 = max(i1, i2 - context), max(j1, j2 - context)
+        group.append((tag, i1, i2, j1, j2))
+    if group and not (len(group) == 1 and group[0][0] == 'equal'):
+        groups.append(group)
+
+    yield f"--- {a_label}"
+    yield f"+++ {b_label}"
+    for group in groups:
+        first, last = group[0], group[-1]
+        yield (f"@@ -{_format_range(first[1], last[2])} "
+               f"+{_format_range(first[3], last[4])} @@")
+        for tag, i1, i2, j1, j2 in group:
+            if tag == 'equal':
+                yield from _emit(' ', a_lines[i1:i2])
+                continue
+            if tag in ('replace', 'delete'):
+                yield from _emit('-', a_lines[i1:i2])
+            if tag in ('replace', 'insert'):
+                yield from _emit('+', b_lines[j1:j2])
+
+
+def _emit(prefix: str, lines: Sequence[str]) -> Iterator[str]:
+    for line in lines:
+        if line.endswith('\n'):
+            yield prefix + line[:-1]
+        else:
+            yield prefix + line
+            yield "\\ No newline at end of file"
@@ -0,0 +1,221 @@
+"""
+Disk usage scanning with an optional per-directory size cache.
+"""
+import json
+import os
+import stat
+import threading
+from typing import Dict, List, Optional, Tuple
+
+# Handle both relative and absolute imports
+try:
+    from .walker import walk_tree_parallel
+except ImportError:
+    # Fallback for absolute imports when running directly
+    from utils.walker import walk_tree_parallel
+
+
+def _usage(st: os.stat_result) -> int:
+    """Bytes allocated on disk, or the apparent size where blocks aren't reported."""
+    blocks = getattr(st, 'st_blocks', None)
+    return blocks * 512 if blocks is not None else st.st_size
+
+
+class DirUsage:
+    """Sizes found directly inside one directory (not including subdirectories)."""
+
+    __slots__ = ('mtime_ns', 'own', 'links', 'subdirs')
+
+    def __init__(self, mtime_ns: int, own: int, links: List[Tuple[int, int, int]], subdirs: List[str]):
+        self.mtime_ns = mtime_ns
+        self.own = own          # the directory itself plus singly-linked files
+        self.links = links      # (dev, inode, bytes) for files with several hard links
+        self.subdirs = subdirs  # subdirectory names
+
+    def to_json(self) -> list:
+        return [self.mtime_ns, self.own, self.links, self.subdirs]
+
+    @classmethod
+    def from_json(cls, data: list) -> 'DirUsage':
+        mtime_ns, own, links, subdirs = data
+        return cls(mtime_ns, own, [tuple(link) for link in links], subdirs)
+
+
+class DiskUsageCache:
+    """
+    On-disk cache of DirUsage records keyed by directory path.
+
+    A record is reused while the directory's mtime is unchanged, which holds
+    as long as no entry was added, removed or renamed in it. Files growing
+    in place don't touch the directory mtime, so cached totals can lag
+    behind appends until the directory itself changes.
+    """
+
+    def __init__(self, cache_file: str = None):
+        if cache_file is None:
+            home_dir = os.path.expanduser("~")
+            self.cache_file = os.path.join(home_dir, ".python_terminal_du_cache")
+        else:
+            self.cache_file = cache_file
+        self.entries = {}
+        self.dirty = False
+        self._load()
+
+    def get(self, path: str, mtime_ns: int) -> Optional[DirUsage]:
+        """Return the cached record if it is still valid for this mtime."""
+        data = self.entries.get(path)
+        if data is None or data[0] != mtime_ns:
+            return None
+        return DirUsage.from_json(data)
+
+    def put(self, path: str, usage: DirUsage):
+        """Store a freshly scanned record."""
+        self.entries[path] = usage.to_json()
+        self.dirty = True
+
+    def prune(self, root: str, seen: set):
+        """Forget directories under `root` that no longer exist."""
+        prefix = root.rstrip(os.sep) + os.sep
+        stale = [path for path in self.entries
+                 if (path == root or path.startswith(prefix)) and path not in seen]
+        for path in stale:
+            del self.entries[path]
+        if stale:
+            self.dirty = True
+
+    def save(self):
+        """Write the cache back if anything changed."""
+        if not self.dirty:
+            return
+        try:
+            tmp_file = self.cache_file + '.tmp'
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump({'dirs': self.entries}, f, separators=(',', ':'))
+            os.replace(tmp_file, self.cache_file)
+            self.dirty = False
+        except IOError:
+            # Silently fail if we can't write the cache
+            pass
+
+    def _load(self):
+        try:
+            if os.path.exists(self.cache_file):
+                with open(self.cache_file, 'r', encoding='utf-8') as f:
+                    self.entries = json.load(f).get('dirs', {})
+        except (IOError, json.JSONDecodeError, AttributeError):
+            self.entries = {}
+
+
+class DiskUsageScanner:
+    """
+    Computes per-directory disk usage for a tree.
+
+    Directories are scanned concurrently. Hard-linked files are counted once
+    per run by (device, inode). With a cache, directories whose mtime is
+    unchanged are not listed again; only their subdirectories are stat'ed
+    to check whether those changed. A file index, when given, supplies
+    listings for directories it holds a current snapshot of.
+    """
+
+    def __init__(self, cache: DiskUsageCache = None, workers: int = None, index=None):
+        self.cache = cache
+        self.workers = workers
+        self.index = index
+        self.scanned = 0
+        self.cached = 0
+        self.errors = []
+        self._lock = threading.Lock()
+
+    def scan(self, root: str) -> Dict[str, int]:
+        """
+        Compute the total usage of `root` and every directory below it.
+
+        Returns:
+            Mapping of directory path to total bytes, including subdirectories
+        """
+        root_stat = os.lstat(root)
+        if not stat.S_ISDIR(root_stat.st_mode):
+            return {root: _usage(root_stat)}
+
+        records = {}
+        for result in walk_tree_parallel(root, self._scan_dir, workers=self.workers):
+            if result.error is not None:
+                self.errors.append(f"cannot read directory '{result.path}': "
+                                   f"{result.error.strerror or result.error}")
+                continue
+            records[result.path] = result.value
+
+        if self.cache is not None:
+            self.cache.prune(root, set(records))
+            self.cache.save()
+
+        return self._aggregate(root, records)
+
+    def _scan_dir(self, path: str, depth: int) -> Tuple[DirUsage, List[str]]:
+        """Read one directory, from the cache when its mtime is unchanged."""
+        dir_stat = os.lstat(path)
+        if self.cache is not None:
+            usage = self.cache.get(path, dir_stat.st_mtime_ns)
+            if usage is not None:
+                with self._lock:
+                    self.cached += 1
+                return usage, [os.path.join(path, name) for name in usage.subdirs]
+
+        own = _usage(dir_stat)
+        links = []
+        subdirs = []
+        entries = self.index.snapshot_dir(path) if self.index is not None else None
+        if entries is None:
+            with os.scandir(path) as it:
+                entries = list(it)
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    subdirs.append(entry.name)
+                    continue
+                st = entry.stat(follow_symlinks=False)
+            except OSError:
+                continue
+            if st.st_nlink > 1:
+                links.append((st.st_dev, st.st_ino, _usage(st)))
+            else:
+                own += _usage(st)
+
+        usage = DirUsage(dir_stat.st_mtime_ns, own, links, subdirs)
+        with self._lock:
+            self.scanned += 1
+            if self.cache is not None:
+                self.cache.put(path, usage)
+        return usage, [os.path.join(path, name) for name in subdirs]
+
+    def _aggregate(self, root: str, records: Dict[str, DirUsage]) -> Dict[str, int]:
+        """Roll sizes up the tree, counting each hard-linked inode once."""
+        # Depth-first, sorted order so the directory "owning" a shared inode is stable
+        order = []
+        stack = [root]
+        while stack:
+            path = stack.pop()
+            usage = records.get(path)
+            if usage is None:
+                continue
+            order.append(path)
+            stack.extend(os.path.join(path, name) for name in sorted(usage.subdirs, reverse=True))
+
+        seen_inodes = set()
+        totals = {}
+        for path in order:
+            usage = records[path]
+            total = usage.own
+            for dev, ino, size in usage.links:
+                if (dev, ino) not in seen_inodes:
+                    seen_inodes.add((dev, ino))
+                    total += size
+            totals[path] = total
+
+        # Parents come before children in `order`, so add children in reverse
+        for path in reversed(order):
+            if path != root:
+                parent = os.path.dirname(path)
+                totals[parent] += totals[path]
+
+        return {path: totals[path] for path in order}
@@ -0,0 +1,127 @@
+"""
+External merge sort for inputs larger than memory.
+"""
+import heapq
+import os
+import sys
+import tempfile
+from typing import Callable, Iterable, Iterator, List, Optional
+
+# Default in-memory budget before sorted runs are spilled to disk
+DEFAULT_MEMORY_LIMIT = 64 * 1024 * 1024
+
+
+class ExternalSorter:
+    """
+    Sorts a stream of lines with bounded memory.
+
+    Lines are collected until their estimated size exceeds the memory
+    budget; each full batch is sorted and written to a temporary spill file
+    (a "run"). The final output is a `heapq.merge` over all runs plus the
+    in-memory tail, so only one line per run is held at a time. Inputs that
+    fit in the budget never touch the disk.
+    """
+
+    def __init__(self, key: Callable[[str], object] = None, reverse: bool = False,
+                 unique: bool = False, memory_limit: int = DEFAULT_MEMORY_LIMIT,
+                 tmp_dir: str = None):
+        self.key = key
+        self.reverse = reverse
+        self.unique = unique
+        self.memory_limit = memory_limit
+        self.tmp_dir = tmp_dir
+        self.runs = []
+
+    def sort(self, lines: Iterable[str]) -> Iterator[str]:
+        """
+        Sort lines, yielding them without trailing newlines.
+
+        Spill files are removed once the generator is exhausted or closed.
+        """
+        batch = []
+        used = 0
+        # Rough per-line overhead of a str object plus its list slot
+        overhead = sys.getsizeof('') + 8
+        try:
+            for line in lines:
+                if line.endswith('\n'):
+                    line = line[:-1]
+                batch.append(line)
+                used += len(line) + overhead
+                if used >= self.memory_limit:
+                    self._spill(batch)
+                    batch = []
+                    used = 0
+
+            batch.sort(key=self.key, reverse=self.reverse)
+            if not self.runs:
+                yield from self._emit(iter(batch))
+                return
+
+            files = [open(path, 'r', encoding='utf-8', errors='surrogateescape', newline='\n')
+                     for path in self.runs]
+            try:
+                runs = [(line[:-1] for line in f) for f in files]
+                yield from self._emit(heapq.merge(*runs, batch, key=self.key, reverse=self.reverse))
+            finally:
+                for f in files:
+                    f.close()
+        finally:
+            self._cleanup()
+
+    def _emit(self, merged: Iterator[str]) -> Iterator[str]:
+        """Drop key-equal neighbours in unique mode."""
+        if not self.unique:
+            yield from merged
+            return
+
+        key = self.key or (lambda line: line)
+        previous = object()
+        for line in merged:
+            current = key(line)
+            if current != previous:
+                yield line
+                previous = current
+
+    def _spill(self, batch: List[str]):
+        """Sort a batch and write it out as one run."""
+        batch.sort(key=self.key, reverse=self.reverse)
+        fd, path = tempfile.mkstemp(prefix='sort-run-', dir=self.tmp_dir)
+        self.runs.append(path)
+        with os.fdopen(fd, 'w', encoding='utf-8', errors='surrogateescape', newline='\n') as f:
+            for line in batch:
+                f.write(line)
+                f.write('\n')
+
+    def _cleanup(self):
+        for path in self.runs:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        self.runs = []
+
+
+def field_key(start: int, end: Optional[int] = None) -> Callable[[str], str]:
+    """Key selecting whitespace-separated fields start..end (1-based, like sort -k)."""
+    def key(line: str) -> str:
+        fields = line.split()
+        return ' '.join(fields[start - 1:end])
+    return key
+
+
+def numeric_key(inner: Callable[[str], str] = None) -> Callable[[str], float]:
+    """Key comparing the leading number of a line (or field); non-numbers sort as 0."""
+    def key(line: str) -> float:
+        text = (inner(line) if inner else line).lstrip()
+        end = 0
+        for i, char in enumerate(text):
+            if char.isdigit() or char == '.' or (i == 0 and char in '+-'):
+                end = i + 1
+            else:
+                break
+        try:
+            return float(text[:end])
+        except ValueError:
+            return 0.0
+    return key
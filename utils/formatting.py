@@ -0,0 +1,14 @@
+"""
+Shared output formatting helpers.
+"""
+
+
+def format_size(value: float) -> str:
+    """Format a byte count in human readable form."""
+    for unit in ['B', 'K', 'M', 'G', 'T']:
+        if value < 1024.0:
+            if unit == 'B':
+                return f"{value:.0f}{unit}"
+            return f"{value:.1f}{unit}"
+        value /= 1024.0
+    return f"{value:.1f}P"
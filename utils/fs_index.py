@@ -0,0 +1,364 @@
+"""
+Persistent filesystem metadata index backed by SQLite.
+"""
+import os
+import sqlite3
+import stat
+import threading
+import time
+import urllib.parse
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# Handle both relative and absolute imports
+try:
+    from .telemetry import telemetry
+    from .walker import walk_tree_parallel
+except ImportError:
+    # Fallback for absolute imports when running directly
+    from utils.telemetry import telemetry
+    from utils.walker import walk_tree_parallel
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS roots (path TEXT PRIMARY KEY);
+CREATE TABLE IF NOT EXISTS dirs (
+    path TEXT PRIMARY KEY,
+    dev INTEGER,
+    mtime_ns INTEGER,
+    scanned REAL
+);
+CREATE TABLE IF NOT EXISTS entries (
+    dir TEXT,
+    name TEXT,
+    type TEXT,
+    mode INTEGER,
+    PRIMARY KEY (dir, name)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS entries_name ON entries (name);
+"""
+
+# Bumped when the tables change; older indexes are rebuilt on the next refresh
+SCHEMA_VERSION = 2
+
+
+def _entry_type(mode: int) -> str:
+    if stat.S_ISDIR(mode):
+        return 'd'
+    if stat.S_ISLNK(mode):
+        return 'l'
+    if stat.S_ISREG(mode):
+        return 'f'
+    return 'o'
+
+
+class IndexedEntry:
+    """
+    os.DirEntry look-alike served from the index.
+
+    The name and type come from the index. Like DirEntry, stat() reads the
+    file live on first use and caches that result: a file rewritten in
+    place leaves its directory's mtime unchanged, so indexed sizes and
+    mtimes may be stale even when the listing itself is current.
+    """
+
+    __slots__ = ('name', 'path', '_mode', '_stat', '_lstat')
+
+    def __init__(self, directory: str, name: str, mode: int):
+        self.name = name
+        self.path = os.path.join(directory, name)
+        self._mode = mode
+        self._stat = None
+        self._lstat = None
+
+    def is_dir(self, follow_symlinks: bool = True) -> bool:
+        if follow_symlinks and stat.S_ISLNK(self._mode):
+            return os.path.isdir(self.path)
+        return stat.S_ISDIR(self._mode)
+
+    def is_file(self, follow_symlinks: bool = True) -> bool:
+        if follow_symlinks and stat.S_ISLNK(self._mode):
+            return os.path.isfile(self.path)
+        return stat.S_ISREG(self._mode)
+
+    def is_symlink(self) -> bool:
+        return stat.S_ISLNK(self._mode)
+
+    def stat(self, follow_symlinks: bool = True) -> os.stat_result:
+        if not follow_symlinks or not stat.S_ISLNK(self._mode):
+            if self._lstat is None:
+                self._lstat = os.lstat(self.path)
+            return self._lstat
+        if self._stat is None:
+            self._stat = os.stat(self.path)
+        return self._stat
+
+
+class FileIndex:
+    """
+    On-disk index of the names and types of everything under configured roots.
+
+    Each directory row records the directory's mtime at scan time. A
+    directory listing is served from the index only while that mtime still
+    matches, which costs a single stat; otherwise callers read the disk
+    live. Refreshes only rescan directories whose mtime changed. A file
+    rewritten in place does not change its directory's mtime, so served
+    entries carry only names and types; sizes and mtimes are always
+    stat'ed live.
+
+    The database file is only created once a root is added, so an unused
+    index costs nothing.
+    """
+
+    def __init__(self, db_file: str = None):
+        if db_file is None:
+            home_dir = os.path.expanduser("~")
+            self.db_file = os.path.join(home_dir, ".python_terminal_index.db")
+        else:
+            self.db_file = db_file
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._thread = None
+        self._stop = threading.Event()
+        self._schema_ready = False
+        self.last_refresh = {}
+
+    # Connections
+
+    def _connect(self, write: bool = False) -> Optional[sqlite3.Connection]:
+        """
+        Per-thread connection; None for reads while the database doesn't exist.
+
+        Readers (walker threads serving snapshots, among others) get
+        read-only connections with no setup statements. The writer
+        connection creates the database, and the schema is set up once
+        per index, not once per thread.
+        """
+        attr = 'writer' if write else 'reader'
+        conn = getattr(self._local, attr, None)
+        if conn is not None:
+            return conn
+        if write:
+            conn = sqlite3.connect(self.db_file, timeout=30)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            with self._write_lock:
+                if not self._schema_ready:
+                    self._create_schema(conn)
+                    self._schema_ready = True
+        else:
+            if not os.path.exists(self.db_file):
+                return None
+            conn = sqlite3.connect(f"file:{urllib.parse.quote(self.db_file)}?mode=ro", uri=True, timeout=30)
+        setattr(self._local, attr, conn)
+        return conn
+
+    @staticmethod
+    def _create_schema(conn: sqlite3.Connection):
+        # WAL is a property of the database file, so setting it once is enough
+        conn.execute("PRAGMA journal_mode=WAL")
+        if conn.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+            # Old layout: drop the listings, keep the roots; the next refresh rescans
+            conn.executescript("DROP TABLE IF EXISTS entries; DROP TABLE IF EXISTS dirs;")
+        conn.executescript(SCHEMA)
+        conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    # Roots
+
+    def roots(self) -> List[str]:
+        conn = self._connect()
+        if conn is None:
+            return []
+        return [row[0] for row in conn.execute("SELECT path FROM roots ORDER BY path")]
+
+    def add_root(self, path: str):
+        conn = self._connect(write=True)
+        with self._write_lock, conn:
+            conn.execute("INSERT OR IGNORE INTO roots (path) VALUES (?)", (path,))
+
+    def remove_root(self, path: str):
+        if not os.path.exists(self.db_file):
+            return
+        conn = self._connect(write=True)
+        with self._write_lock, conn:
+            conn.execute("DELETE FROM roots WHERE path = ?", (path,))
+            self._delete_tree(conn, path)
+
+    def covers(self, path: str) -> bool:
+        """True if `path` lies under one of the indexed roots."""
+        return any(path == root or path.startswith(root.rstrip(os.sep) + os.sep)
+                   for root in self.roots())
+
+    # Reads
+
+    def snapshot_dir(self, path: str) -> Optional[List[IndexedEntry]]:
+        """
+        Return the indexed entries of a directory if they are still current.
+
+        Returns None when the directory is not indexed or changed since it
+        was scanned; the caller should then list it from disk.
+        """
+        conn = self._connect()
+        if conn is None:
+            return None
+        row = conn.execute("SELECT mtime_ns FROM dirs WHERE path = ?", (path,)).fetchone()
+        try:
+            if row is None or os.stat(path).st_mtime_ns != row[0]:
+                telemetry.record_cache('fs_index', misses=1)
+                return None
+        except OSError:
+            telemetry.record_cache('fs_index', misses=1)
+            return None
+        telemetry.record_cache('fs_index', hits=1)
+        return [IndexedEntry(path, name, mode)
+                for name, mode in conn.execute("SELECT name, mode FROM entries WHERE dir = ?", (path,))]
+
+    def locate(self, pattern: str, ignore_case: bool = False, limit: int = None) -> Iterator[str]:
+        """
+        Yield indexed paths whose name matches a glob (substring if no wildcards).
+        """
+        conn = self._connect()
+        if conn is None:
+            return
+        if not any(char in pattern for char in '*?['):
+            pattern = f"*{pattern}*"
+        if ignore_case:
+            # GLOB is case-sensitive; match against a lower-cased name instead
+            query = "SELECT dir, name FROM entries WHERE lower(name) GLOB ? ORDER BY dir, name"
+            pattern = pattern.lower()
+        else:
+            query = "SELECT dir, name FROM entries WHERE name GLOB ? ORDER BY dir, name"
+        if limit is not None:
+            query += f" LIMIT {int(limit)}"
+        for directory, name in conn.execute(query, (pattern,)):
+            yield os.path.join(directory, name)
+
+    def stats(self) -> Tuple[int, int]:
+        """Return (indexed directories, indexed entries)."""
+        conn = self._connect()
+        if conn is None:
+            return 0, 0
+        dirs = conn.execute("SELECT count(*) FROM dirs").fetchone()[0]
+        entries = conn.execute("SELECT count(*) FROM entries").fetchone()[0]
+        return dirs, entries
+
+    # Refreshing
+
+    def refresh(self, root: str = None) -> Tuple[int, int]:
+        """
+        Bring the index up to date for one root (or all roots).
+
+        Returns:
+            (directories rescanned, directories unchanged)
+        """
+        if root is None:
+            totals = [0, 0]
+            for indexed_root in self.roots():
+                rescanned, unchanged = self.refresh(indexed_root)
+                totals[0] += rescanned
+                totals[1] += unchanged
+            return totals[0], totals[1]
+
+        # Overlapping refreshes of one root would race on the same rows
+        with self._refresh_lock:
+            return self._refresh_root(root)
+
+    def _refresh_root(self, root: str) -> Tuple[int, int]:
+        conn = self._connect(write=True)
+        known = self._known_dirs(conn, root)
+        # Subdirectories of indexed directories, read up front so the walker
+        # threads never need a database connection of their own
+        known_subdirs: Dict[str, List[str]] = {}
+        for directory, name in self._known_subdirs(conn, root):
+            known_subdirs.setdefault(directory, []).append(os.path.join(directory, name))
+        rescanned = unchanged = 0
+        seen = set()
+        changes = []
+
+        def scan(path: str, depth: int):
+            dir_stat = os.stat(path)
+            if known.get(path) == dir_stat.st_mtime_ns:
+                # Unchanged: reuse the indexed subdirectory list
+                return None, known_subdirs.get(path, [])
+
+            rows = []
+            subdirs = []
+            with os.scandir(path) as it:
+                for entry in it:
+                    try:
+                        # Mode only; d_type can't give permissions, and links need lstat
+                        mode = entry.stat(follow_symlinks=False).st_mode
+                    except OSError:
+                        continue
+                    kind = _entry_type(mode)
+                    if kind == 'd':
+                        subdirs.append(entry.path)
+                    rows.append((path, entry.name, kind, mode))
+            return (dir_stat, rows), subdirs
+
+        for result in walk_tree_parallel(root, scan):
+            if result.error is not None:
+                continue
+            seen.add(result.path)
+            if result.value is None:
+                unchanged += 1
+            else:
+                rescanned += 1
+                changes.append((result.path, result.value))
+
+        with self._write_lock, conn:
+            for path, (dir_stat, rows) in changes:
+                conn.execute("DELETE FROM entries WHERE dir = ?", (path,))
+                conn.executemany("INSERT INTO entries VALUES (?, ?, ?, ?)", rows)
+                conn.execute("INSERT OR REPLACE INTO dirs VALUES (?, ?, ?, ?)",
+                             (path, dir_stat.st_dev, dir_stat.st_mtime_ns, time.time()))
+            gone = [path for path in known if path not in seen]
+            conn.executemany("DELETE FROM dirs WHERE path = ?", [(path,) for path in gone])
+            conn.executemany("DELETE FROM entries WHERE dir = ?", [(path,) for path in gone])
+
+        self.last_refresh[root] = time.time()
+        return rescanned, unchanged
+
+    def _known_dirs(self, conn: sqlite3.Connection, root: str) -> Dict[str, int]:
+        """Indexed directories under `root` with their recorded mtimes."""
+        prefix = root.rstrip(os.sep) + os.sep
+        rows = conn.execute(
+            "SELECT path, mtime_ns FROM dirs WHERE path = ? OR substr(path, 1, ?) = ?",
+            (root, len(prefix), prefix))
+        return dict(rows)
+
+    def _known_subdirs(self, conn: sqlite3.Connection, root: str) -> Iterator[Tuple[str, str]]:
+        """(directory, name) of every indexed subdirectory under `root`."""
+        prefix = root.rstrip(os.sep) + os.sep
+        return conn.execute(
+            "SELECT dir, name FROM entries WHERE type = 'd' AND (dir = ? OR substr(dir, 1, ?) = ?)",
+            (root, len(prefix), prefix))
+
+    def _delete_tree(self, conn: sqlite3.Connection, root: str):
+        prefix = root.rstrip(os.sep) + os.sep
+        conn.execute("DELETE FROM dirs WHERE path = ? OR substr(path, 1, ?) = ?",
+                     (root, len(prefix), prefix))
+        conn.execute("DELETE FROM entries WHERE dir = ? OR substr(dir, 1, ?) = ?",
+                     (root, len(prefix), prefix))
+
+    # Background indexing
+
+    def start_background(self, interval: float = 300.0):
+        """Refresh all roots periodically on a daemon thread."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._background_loop, args=(interval,),
+                                        name='fs-indexer', daemon=True)
+        self._thread.start()
+
+    def stop_background(self):
+        self._stop.set()
+
+    def _background_loop(self, interval: float):
+        # Stale directories are read live meanwhile, so the first pass can wait
+        while not self._stop.wait(interval):
+            try:
+                self.refresh()
+            except (OSError, sqlite3.Error):
+                # Try again next round
+                pass
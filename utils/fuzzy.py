@@ -0,0 +1,233 @@
+"""
+fzf-style fuzzy path matching over a cached, per-root candidate list.
+"""
+import heapq
+import os
+import re
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+# Handle both relative and absolute imports
+try:
+    from .telemetry import telemetry
+    from .walker import walk_parallel
+except ImportError:
+    # Fallback for absolute imports when running directly
+    from utils.telemetry import telemetry
+    from utils.walker import walk_parallel
+
+
+# Score components, loosely following fzf's scheme
+SCORE_MATCH = 16
+BONUS_CONSECUTIVE = 8
+BONUS_BOUNDARY = 10
+BONUS_DELIMITER = 8
+BONUS_CAMEL = 7
+BONUS_BASENAME = 2
+PENALTY_GAP_START = 3
+PENALTY_GAP_EXTEND = 1
+
+# Seconds a root's candidate list is reused before it is rebuilt
+CANDIDATE_TTL = 30.0
+
+# Bounds on one candidate walk, so ff from / or $HOME returns promptly:
+# directories deeper than MAX_DEPTH below the root are not listed, and the
+# walk stops once MAX_CANDIDATES paths are collected
+MAX_DEPTH = 12
+MAX_CANDIDATES = 200000
+
+
+def smart_case(query: str) -> bool:
+    """Match case-sensitively only when the query has an upper-case letter."""
+    return query != query.lower()
+
+
+def subsequence_pattern(query: str, case_sensitive: bool) -> 're.Pattern':
+    """
+    Compile a regex matching whole lines that contain `query` as a subsequence.
+
+    Each gap is a negated class excluding the next query character, so the
+    match is the leftmost greedy one and the engine never backtracks.
+    """
+    parts = ['^']
+    for char in query:
+        escaped = re.escape(char)
+        parts.append(f"[^{escaped}\\n]*{escaped}")
+    parts.append('.*$')
+    flags = re.MULTILINE if case_sensitive else re.MULTILINE | re.IGNORECASE
+    return re.compile(''.join(parts), flags)
+
+
+def fuzzy_score(query: str, path: str, case_sensitive: bool = False) -> Optional[int]:
+    """
+    Score `path` against `query`, or None if the query isn't a subsequence.
+
+    A forward scan finds where the earliest match ends and a backward scan
+    from there picks the tightest start, as fzf's v1 algorithm does. Matches
+    on path segment starts, after delimiters, on camelCase humps, in runs
+    and inside the basename score higher; gaps cost points.
+    """
+    text = path if case_sensitive else path.lower()
+    needle = query if case_sensitive else query.lower()
+
+    pos = -1
+    for char in needle:
+        pos = text.find(char, pos + 1)
+        if pos < 0:
+            return None
+
+    positions = []
+    pos += 1
+    for char in reversed(needle):
+        pos = text.rfind(char, 0, pos)
+        positions.append(pos)
+    positions.reverse()
+
+    basename_start = path.rfind('/', 0, len(path) - 1) + 1
+    score = 0
+    previous = None
+    for i in positions:
+        score += SCORE_MATCH
+        if previous is not None:
+            if i == previous + 1:
+                score += BONUS_CONSECUTIVE
+            else:
+                score -= PENALTY_GAP_START + PENALTY_GAP_EXTEND * (i - previous - 2)
+        if i == 0 or path[i - 1] == '/':
+            score += BONUS_BOUNDARY
+        elif path[i - 1] in '_-. ':
+            score += BONUS_DELIMITER
+        elif path[i - 1].islower() and path[i].isupper():
+            score += BONUS_CAMEL
+        if i >= basename_start:
+            score += BONUS_BASENAME
+        previous = i
+    return score
+
+
+def _is_subsequence(short: str, long: str) -> bool:
+    it = iter(long)
+    return all(char in it for char in short)
+
+
+class FuzzyFinder:
+    """
+    Ranks paths under a root against fuzzy queries.
+
+    Candidate paths are collected once per root (reading current index
+    snapshots where available) and kept for CANDIDATE_TTL seconds as one
+    newline-joined string. Each query first filters that whole string with
+    a single compiled regex, so the per-path Python work only happens for
+    actual matches. Successive queries that refine the previous one (the
+    old query is a subsequence of the new) filter the previous matches
+    instead of the full candidate list.
+
+    Walks are bounded by `max_depth` and `max_candidates`; `truncated()`
+    tells whether the last walk of a root hit the candidate limit.
+    """
+
+    def __init__(self, file_index=None, ttl: float = CANDIDATE_TTL,
+                 max_depth: Optional[int] = MAX_DEPTH, max_candidates: int = MAX_CANDIDATES):
+        self.index = file_index
+        self.ttl = ttl
+        self.max_depth = max_depth
+        self.max_candidates = max_candidates
+        self._candidates: Dict[Tuple[str, bool], Tuple[float, str]] = {}
+        self._truncated = set()
+        self._last = None
+        self._lock = threading.Lock()
+
+    def candidates(self, root: str, show_hidden: bool = False) -> str:
+        """Newline-joined paths below `root`, relative to it; directories end in '/'."""
+        key = (root, show_hidden)
+        with self._lock:
+            cached = self._candidates.get(key)
+            if cached is not None and time.monotonic() - cached[0] < self.ttl:
+                telemetry.record_cache('fuzzy_candidates', hits=1)
+                return cached[1]
+        telemetry.record_cache('fuzzy_candidates', misses=1)
+
+        prefix_len = len(root.rstrip(os.sep)) + 1
+
+        def visit(path: str, depth: int, entries) -> List[str]:
+            found = []
+            for entry in entries:
+                if not show_hidden and entry.name.startswith('.'):
+                    continue
+                rel = entry.path[prefix_len:]
+                if os.sep != '/':
+                    rel = rel.replace(os.sep, '/')
+                found.append(rel + '/' if entry.is_dir(follow_symlinks=False) else rel)
+            return found
+
+        def descend(entry) -> bool:
+            return show_hidden or not entry.name.startswith('.')
+
+        list_dir = self.index.snapshot_dir if self.index is not None else None
+        paths = []
+        truncated = False
+        for result in walk_parallel(root, visit, max_depth=self.max_depth, descend=descend,
+                                    list_dir=list_dir):
+            if result.error is None:
+                paths.extend(result.value)
+                if len(paths) >= self.max_candidates:
+                    # Leaving the loop stops the walk
+                    del paths[self.max_candidates:]
+                    truncated = True
+                    break
+        paths.sort()
+        text = "\n".join(paths)
+
+        with self._lock:
+            self._candidates[key] = (time.monotonic(), text)
+            if truncated:
+                self._truncated.add(key)
+            else:
+                self._truncated.discard(key)
+            if self._last is not None and self._last[0] == key:
+                self._last = None
+        return text
+
+    def truncated(self, root: str, show_hidden: bool = False) -> bool:
+        """Whether the cached candidates of `root` stopped at `max_candidates`."""
+        with self._lock:
+            return (root, show_hidden) in self._truncated
+
+    def search(self, root: str, query: str, limit: int = 20,
+               show_hidden: bool = False) -> List[Tuple[int, str]]:
+        """
+        Return up to `limit` (score, path) pairs, best first.
+
+        Ties go to the shorter path, then alphabetical order.
+        """
+        key = (root, show_hidden)
+        case_sensitive = smart_case(query)
+        text = self.candidates(root, show_hidden)
+
+        with self._lock:
+            last = self._last
+        if (last is not None and last[0] == key and last[2] == case_sensitive
+                and _is_subsequence(last[1], query)):
+            # Refinement: only what matched before can match now
+            text = last[3]
+
+        matched = subsequence_pattern(query, case_sensitive).findall(text) if query else text.split("\n")
+        matched = [path for path in matched if path]
+
+        with self._lock:
+            self._last = (key, query, case_sensitive, "\n".join(matched))
+
+        scored = ((fuzzy_score(query, path, case_sensitive), path) for path in matched)
+        best = heapq.nsmallest(limit, scored, key=lambda item: (-item[0], len(item[1]), item[1]))
+        return best
+
+    def invalidate(self, root: str = None):
+        """Drop cached candidates for one root, or all of them."""
+        with self._lock:
+            if root is None:
+                self._candidates.clear()
+            else:
+                for key in [key for key in self._candidates if key[0] == root]:
+                    del self._candidates[key]
+            self._last = None
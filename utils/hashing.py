@@ -0,0 +1,78 @@
+"""
+File hashing with reused read buffers and concurrent hashing of many files.
+"""
+import hashlib
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, List, Optional, Tuple
+
+# Read size; a multiple of common page and RAID stripe sizes
+CHUNK_SIZE = 1024 * 1024
+
+ALGORITHMS = ('md5', 'sha1', 'sha256', 'sha512', 'blake2b')
+
+_local = threading.local()
+
+
+def _buffer() -> memoryview:
+    """Per-thread read buffer, allocated once and reused for every chunk."""
+    view = getattr(_local, 'view', None)
+    if view is None:
+        _local.view = view = memoryview(bytearray(CHUNK_SIZE))
+    return view
+
+
+def hash_file(path: str, algorithm: str = 'sha256', limit: Optional[int] = None) -> str:
+    """
+    Hash a file's contents.
+
+    Data is read with `readinto` into a reused buffer, so there is no
+    allocation per chunk.
+
+    Args:
+        path: File to hash
+        algorithm: Any name accepted by hashlib.new
+        limit: Only hash the first `limit` bytes
+
+    Returns:
+        Hex digest
+    """
+    digest = hashlib.new(algorithm)
+    view = _buffer()
+    remaining = limit
+    with open(path, 'rb', buffering=0) as f:
+        while remaining is None or remaining > 0:
+            target = view if remaining is None or remaining >= len(view) else view[:remaining]
+            n = f.readinto(target)
+            if not n:
+                break
+            digest.update(view[:n])
+            if remaining is not None:
+                remaining -= n
+    return digest.hexdigest()
+
+
+def hash_files(paths: List[str], algorithm: str = 'sha256', workers: int = None,
+               limit: Optional[int] = None) -> Iterator[Tuple[str, Optional[str], Optional[OSError]]]:
+    """
+    Hash many files concurrently, yielding (path, digest, error) in input order.
+
+    hashlib releases the GIL while digesting buffers, and file reads release
+    it too, so a thread pool keeps several cores busy without the pickling
+    and start-up cost of worker processes.
+    """
+    def work(path: str):
+        try:
+            return path, hash_file(path, algorithm, limit), None
+        except OSError as e:
+            return path, None, e
+
+    if len(paths) <= 1:
+        for path in paths:
+            yield work(path)
+        return
+
+    workers = workers or min(len(paths), os.cpu_count() or 1)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        yield from pool.map(work, paths)
@@ -10,9 +10,11 @@ from datetime import datetime
 class CommandHistory:
     """Manages command history storage and retrieval."""
     
-    def __init__(self, max_history: int = 1000, history_file: str = None):
+    def __init__(self, max_history: int = 1000, history_file: str = None, persistent: bool = True):
         self.max_history = max_history
         self.history = []
+        # In-memory only sessions (e.g. web sessions) never touch the history file
+        self.persistent = persistent
         
         # Default history file location
         if history_file is None:
@@ -21,7 +23,8 @@ class CommandHistory:
         else:
             self.history_file = history_file
         
-        self._load_history()
+        if self.persistent:
+            self._load_history()
     
     def add(self, command: str):
         """Add a command to history."""
@@ -32,7 +35,8 @@ class CommandHistory:
             if len(self.history) > self.max_history:
                 self.history = self.history[-self.max_history:]
             
-            self._save_history()
+            if self.persistent:
+                self._save_history()
     
     def get_history(self) -> List[str]:
         """Get the complete command history."""
@@ -49,7 +53,8 @@ class CommandHistory:
     def clear(self):
         """Clear the command history."""
         self.history = []
-        self._save_history()
+        if self.persistent:
+            self._save_history()
     
     def _load_history(self):
         """Load history from file."""
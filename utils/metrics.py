@@ -0,0 +1,171 @@
+"""
+Fixed-memory time series of host metrics for history views.
+"""
+import os
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import psutil
+
+# Handle both relative and absolute imports
+try:
+    from .sampler import cpu_busy_percent
+except ImportError:
+    # Fallback for absolute imports when running directly
+    from utils.sampler import cpu_busy_percent
+
+
+# Recorded series, all percentages except the 1-minute load average
+METRIC_FIELDS = ('cpu', 'mem', 'swap', 'disk', 'load1')
+
+# One hour at the default interval
+DEFAULT_INTERVAL = 5.0
+DEFAULT_CAPACITY = 720
+
+
+class MetricsRecorder:
+    """
+    Ring buffers of host metrics, one preallocated array('d') per series.
+
+    The newest `capacity` samples are kept; older ones are overwritten in
+    place, so memory use is fixed at creation no matter how long the
+    process runs. Reads unroll the ring into chronological arrays with two
+    slices and aggregate with the C-level builtins over array slices.
+    """
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY, interval: float = DEFAULT_INTERVAL,
+                 disk_path: str = '/'):
+        self.capacity = capacity
+        self.interval = interval
+        self.disk_path = disk_path
+        self.times = array('d', bytes(8 * capacity))
+        self.series = {field: array('d', bytes(8 * capacity)) for field in METRIC_FIELDS}
+        self.count = 0
+        self._next = 0
+        self._prev_cpu_times = None
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stop = threading.Event()
+
+    def record(self, timestamp: float, values: Dict[str, float]):
+        """Store one sample; fields missing from `values` are recorded as 0."""
+        with self._lock:
+            i = self._next
+            self.times[i] = timestamp
+            for field, column in self.series.items():
+                column[i] = values.get(field, 0.0)
+            self._next = (i + 1) % self.capacity
+            self.count = min(self.count + 1, self.capacity)
+
+    def sample(self):
+        """Measure the host now and record it."""
+        cpu_times = psutil.cpu_times()
+        values = {
+            'cpu': cpu_busy_percent(self._prev_cpu_times, cpu_times),
+            'mem': psutil.virtual_memory().percent,
+            'swap': psutil.swap_memory().percent,
+        }
+        self._prev_cpu_times = cpu_times
+        try:
+            values['disk'] = psutil.disk_usage(self.disk_path).percent
+        except OSError:
+            pass
+        try:
+            values['load1'] = os.getloadavg()[0]
+        except (OSError, AttributeError):
+            # Windows doesn't have load averages
+            pass
+        self.record(time.time(), values)
+
+    def window(self, seconds: Optional[float] = None) -> Tuple[array, Dict[str, array]]:
+        """Samples of the last `seconds` (default: all), oldest first."""
+        with self._lock:
+            if self.count < self.capacity:
+                times = self.times[:self.count]
+                series = {field: column[:self.count] for field, column in self.series.items()}
+            else:
+                start = self._next
+                times = self.times[start:] + self.times[:start]
+                series = {field: column[start:] + column[:start]
+                          for field, column in self.series.items()}
+        if seconds is not None and times:
+            first = bisect_left(times, times[-1] - seconds)
+            times = times[first:]
+            series = {field: column[first:] for field, column in series.items()}
+        return times, series
+
+    def downsample(self, buckets: int, seconds: Optional[float] = None,
+                   fields: Sequence[str] = METRIC_FIELDS) -> List[dict]:
+        """
+        Aggregate the window into `buckets` equal time spans.
+
+        Returns one dict per non-empty bucket, oldest first:
+        {'time': bucket start, 'samples': n, field: (min, avg, max), ...}
+        """
+        times, series = self.window(seconds)
+        if not times:
+            return []
+        start = times[0] if seconds is None else times[-1] - seconds
+        span = max(times[-1] - start, 1e-9) / buckets
+
+        rows = []
+        lo = 0
+        for bucket in range(buckets):
+            if bucket == buckets - 1:
+                hi = len(times)
+            else:
+                hi = bisect_left(times, start + (bucket + 1) * span, lo)
+            if hi > lo:
+                row = {'time': start + bucket * span, 'samples': hi - lo}
+                for field in fields:
+                    values = series[field][lo:hi]
+                    row[field] = (min(values), sum(values) / len(values), max(values))
+                rows.append(row)
+            lo = hi
+        return rows
+
+    def memory_bytes(self) -> int:
+        """Bytes held by the sample buffers."""
+        return sum(column.itemsize * len(column)
+                   for column in [self.times, *self.series.values()])
+
+    # Background thread
+
+    def start(self):
+        """Record a sample every interval on a daemon thread."""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, name='metrics-recorder', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _loop(self):
+        # The first pass only primes the CPU counters
+        self._prev_cpu_times = psutil.cpu_times()
+        while not self._stop.wait(self.interval):
+            try:
+                self.sample()
+            except (OSError, psutil.Error):
+                # Try again next round
+                pass
+
+
+_shared_recorder = None
+_shared_lock = threading.Lock()
+
+
+def shared_recorder() -> MetricsRecorder:
+    """The process-wide recorder, started on first use."""
+    global _shared_recorder
+    with _shared_lock:
+        if _shared_recorder is None:
+            _shared_recorder = MetricsRecorder()
+            _shared_recorder.start()
+        return _shared_recorder
@@ -0,0 +1,206 @@
+"""
+Cached mount table and disk usage with per-mount timeouts for df.
+"""
+import select
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import Future, wait
+from typing import Dict, List, Optional, Tuple
+
+import psutil
+
+# Handle both relative and absolute imports
+try:
+    from .telemetry import telemetry
+except ImportError:
+    # Fallback for absolute imports when running directly
+    from utils.telemetry import telemetry
+
+MOUNTINFO = '/proc/self/mountinfo'
+
+# Seconds a df waits on any one mount before reporting it unavailable
+MOUNT_TIMEOUT = 2.0
+
+# Usage results younger than this are reused
+DEFAULT_TTL = 2.0
+
+Mount = namedtuple('Mount', ['device', 'mountpoint', 'fstype', 'opts'])
+
+# Placeholder for a mount whose statvfs did not return in time
+TIMED_OUT = object()
+
+
+def _unescape(field: bytes) -> str:
+    """Undo mountinfo's octal escapes (\\040 for space, etc.)."""
+    if b'\\' in field:
+        field = field.decode('unicode_escape').encode('latin-1')
+    return field.decode('utf-8', 'replace')
+
+
+def _physical_fstypes() -> set:
+    """Filesystem types backed by a device, as psutil.disk_partitions() keeps them."""
+    fstypes = {'zfs'}
+    with open('/proc/filesystems', 'rb') as f:
+        for line in f:
+            if not line.startswith(b'nodev'):
+                fstypes.add(line.strip().decode())
+    return fstypes
+
+
+class MountTable:
+    """
+    Mounted filesystems and their usage, cached for df.
+
+    On Linux the list is re-read only when /proc/self/mountinfo reports a
+    change: the kernel flags the open file with POLLPRI whenever a mount
+    is added or removed, so checking costs one poll(). Elsewhere the list
+    comes from psutil, refreshed after `ttl` seconds.
+
+    Usage is gathered with one daemon thread per mount, and the caller
+    waits at most `timeout` seconds overall. A mount whose statvfs hangs
+    (a dead NFS server, say) is reported as timed out, and later calls
+    don't start another thread for it until the first one returns.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._mounts: Optional[List[Mount]] = None
+        self._read_at = 0.0
+        self._file = None
+        self._poller = None
+        self._fstypes = None
+        # mountpoint -> (monotonic time, usage or None)
+        self._usage: Dict[str, Tuple[float, object]] = {}
+        # mountpoint -> (future, monotonic deadline)
+        self._inflight: Dict[str, Tuple[Future, float]] = {}
+        self.reads = 0
+        try:
+            self._file = open(MOUNTINFO, 'rb')
+            self._poller = select.poll()
+            self._poller.register(self._file.fileno(), select.POLLPRI | select.POLLERR)
+            self._fstypes = _physical_fstypes()
+        except (OSError, AttributeError):
+            # No mountinfo, or no poll() on this platform
+            if self._file is not None:
+                self._file.close()
+            self._file = None
+            self._poller = None
+
+    def mounts(self, ttl: float = DEFAULT_TTL) -> List[Mount]:
+        """Current physical mounts, re-read only after a change."""
+        with self._lock:
+            if self._mounts is None or self._changed(ttl):
+                telemetry.record_cache('mount_table', misses=1)
+                self._mounts = self._read()
+                self._read_at = time.monotonic()
+                self.reads += 1
+            else:
+                telemetry.record_cache('mount_table', hits=1)
+            return self._mounts
+
+    def _changed(self, ttl: float) -> bool:
+        if self._poller is not None:
+            return bool(self._poller.poll(0))
+        return time.monotonic() - self._read_at > ttl
+
+    def _read(self) -> List[Mount]:
+        if self._file is None:
+            return [Mount(p.device, p.mountpoint, p.fstype, p.opts)
+                    for p in psutil.disk_partitions(all=False)]
+
+        # Reading from the start also clears the pending change event
+        self._file.seek(0)
+        mounts = []
+        for line in self._file.read().splitlines():
+            fields = line.split(b' ')
+            try:
+                sep = fields.index(b'-', 6)
+            except ValueError:
+                continue
+            fstype = fields[sep + 1].decode()
+            if fstype not in self._fstypes:
+                continue
+            device = _unescape(fields[sep + 2])
+            if device in ('none', ''):
+                continue
+            opts = fields[5].decode()
+            if len(fields) > sep + 3:
+                extra = [opt for opt in fields[sep + 3].decode().split(',')
+                         if opt not in opts.split(',')]
+                opts = ','.join([opts] + extra) if extra else opts
+            mounts.append(Mount(device, _unescape(fields[4]), fstype, opts))
+        return mounts
+
+    def usage(self, mounts: List[Mount], ttl: float = DEFAULT_TTL,
+              timeout: float = MOUNT_TIMEOUT) -> List[Tuple[Mount, object]]:
+        """
+        Pair each mount with its psutil.disk_usage() result.
+
+        The result is None for a mount that could not be read and
+        TIMED_OUT for one that did not answer within `timeout`.
+        """
+        now = time.monotonic()
+        results: Dict[str, object] = {}
+        pending: Dict[Future, str] = {}
+        with self._lock:
+            for mountpoint in {mount.mountpoint for mount in mounts}:
+                cached = self._usage.get(mountpoint)
+                if cached is not None and now - cached[0] <= ttl:
+                    results[mountpoint] = cached[1]
+                    continue
+                inflight = self._inflight.get(mountpoint)
+                if inflight is None:
+                    future = self._statvfs(mountpoint)
+                    self._inflight[mountpoint] = (future, now + timeout)
+                elif inflight[0].done() or now < inflight[1]:
+                    # An earlier call's request: finished meanwhile, or still within its time
+                    future = inflight[0]
+                else:
+                    # Still stuck from an earlier call; don't pile up threads
+                    results[mountpoint] = TIMED_OUT
+                    continue
+                pending[future] = mountpoint
+
+        done, _ = wait(pending, timeout=timeout)
+        with self._lock:
+            for future, mountpoint in pending.items():
+                if future not in done:
+                    results[mountpoint] = TIMED_OUT
+                    continue
+                self._inflight.pop(mountpoint, None)
+                try:
+                    usage = future.result()
+                except OSError:
+                    usage = None
+                self._usage[mountpoint] = (time.monotonic(), usage)
+                results[mountpoint] = usage
+        telemetry.record_cache('disk_usage', hits=len(results) - len(pending), misses=len(pending))
+        return [(mount, results[mount.mountpoint]) for mount in mounts]
+
+    @staticmethod
+    def _statvfs(mountpoint: str) -> Future:
+        """disk_usage() on a daemon thread, so a hung mount never blocks exit."""
+        future = Future()
+
+        def run():
+            try:
+                future.set_result(psutil.disk_usage(mountpoint))
+            except BaseException as e:
+                future.set_exception(e)
+
+        threading.Thread(target=run, name='statvfs', daemon=True).start()
+        return future
+
+
+_shared_table = None
+_shared_lock = threading.Lock()
+
+
+def shared_mount_table() -> MountTable:
+    """The process-wide mount table, so every df shares one cache."""
+    global _shared_table
+    with _shared_lock:
+        if _shared_table is None:
+            _shared_table = MountTable()
+        return _shared_table
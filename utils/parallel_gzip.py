@@ -0,0 +1,93 @@
+"""
+Block-parallel gzip compression (pigz-style) and streaming decompression.
+"""
+import gzip
+import os
+import shutil
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import BinaryIO
+
+# Uncompressed bytes per gzip member
+BLOCK_SIZE = 1024 * 1024
+COPY_CHUNK = 1024 * 1024
+
+
+def _compress_block(data: bytes, level: int) -> bytes:
+    """Compress one block into a complete, independent gzip member."""
+    return gzip.compress(data, compresslevel=level, mtime=0)
+
+
+class ParallelGzipWriter:
+    """
+    Write-only file object producing gzip output from parallel workers.
+
+    Input is cut into fixed-size blocks and each block becomes its own gzip
+    member; concatenated members are a valid gzip stream that gunzip and
+    Python's gzip module read transparently. zlib releases the GIL while
+    deflating, so threads compress blocks on separate cores. At most
+    `2 * workers` blocks are in flight, keeping memory bounded no matter
+    how large the input is.
+    """
+
+    def __init__(self, fileobj: BinaryIO, level: int = 6, block_size: int = BLOCK_SIZE,
+                 workers: int = None):
+        self.fileobj = fileobj
+        self.level = level
+        self.block_size = block_size
+        self.workers = workers or os.cpu_count() or 1
+        self._pool = ThreadPoolExecutor(max_workers=self.workers)
+        self._pending = deque()
+        self._buffer = bytearray()
+        self._members = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        self._buffer += data
+        while len(self._buffer) >= self.block_size:
+            block = bytes(self._buffer[:self.block_size])
+            del self._buffer[:self.block_size]
+            self._submit(block)
+        return len(data)
+
+    def _submit(self, block: bytes):
+        self._pending.append(self._pool.submit(_compress_block, block, self.level))
+        self._members += 1
+        while len(self._pending) > 2 * self.workers:
+            self.fileobj.write(self._pending.popleft().result())
+
+    def flush(self):
+        """Compressed output is written as blocks finish; nothing to force."""
+
+    def close(self):
+        """Compress the tail, write every pending member in order and stop the workers."""
+        if self.closed:
+            return
+        try:
+            if self._buffer or not self._members:
+                # An empty input still needs one member to be valid gzip
+                self._submit(bytes(self._buffer))
+                self._buffer = bytearray()
+            while self._pending:
+                self.fileobj.write(self._pending.popleft().result())
+        finally:
+            self._pool.shutdown()
+            self.closed = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def compress_stream(src: BinaryIO, dst: BinaryIO, level: int = 6, workers: int = None):
+    """Gzip everything from `src` into `dst` using parallel members."""
+    with ParallelGzipWriter(dst, level=level, workers=workers) as writer:
+        shutil.copyfileobj(src, writer, BLOCK_SIZE)
+
+
+def decompress_stream(src: BinaryIO, dst: BinaryIO):
+    """Gunzip `src` into `dst` chunk by chunk; multi-member input is supported."""
+    with gzip.GzipFile(fileobj=src, mode='rb') as reader:
+        shutil.copyfileobj(reader, dst, COPY_CHUNK)
@@ -0,0 +1,321 @@
+"""
+Process table snapshots for ps-style commands.
+"""
+import os
+import time
+from collections import namedtuple
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import psutil
+
+# Handle both relative and absolute imports
+try:
+    from . import procfs
+except ImportError:
+    # Fallback for absolute imports when running directly
+    from utils import procfs
+
+try:
+    import pwd
+except ImportError:
+    # Not available on Windows
+    pwd = None
+
+
+ProcessInfo = namedtuple('ProcessInfo', [
+    'pid', 'ppid', 'name', 'uid', 'user', 'status', 'cpu_percent',
+    'memory_percent', 'rss', 'cpu_time', 'create_time', 'cmdline',
+])
+
+# --sort keys and the aliases GNU ps accepts for them
+SORT_KEYS: Dict[str, Callable[[ProcessInfo], object]] = {
+    'pid': lambda p: p.pid,
+    'ppid': lambda p: p.ppid,
+    'user': lambda p: p.user,
+    'name': lambda p: p.name,
+    'cpu': lambda p: p.cpu_percent,
+    'mem': lambda p: p.memory_percent,
+    'rss': lambda p: p.rss,
+    'time': lambda p: p.cpu_time,
+    'start': lambda p: p.create_time,
+}
+SORT_ALIASES = {
+    'comm': 'name', 'cmd': 'name', 'pcpu': 'cpu', '%cpu': 'cpu', 'pmem': 'mem',
+    '%mem': 'mem', 'cputime': 'time', 'start_time': 'start', 'uid': 'user',
+}
+
+_uid_names: Dict[int, str] = {}
+
+
+def user_name(uid: Optional[int]) -> str:
+    """Resolve a uid to a login name, caching every lookup."""
+    if uid is None:
+        return '?'
+    name = _uid_names.get(uid)
+    if name is None:
+        try:
+            name = pwd.getpwuid(uid).pw_name if pwd is not None else str(uid)
+        except KeyError:
+            name = str(uid)
+        _uid_names[uid] = name
+    return name
+
+
+def resolve_uid(user: str) -> Optional[int]:
+    """Map a login name or numeric uid string to a uid (None if unknown)."""
+    if user.isdigit():
+        return int(user)
+    if pwd is None:
+        return None
+    try:
+        return pwd.getpwnam(user).pw_uid
+    except KeyError:
+        return None
+
+
+def current_uid() -> Optional[int]:
+    """Real uid of this process, or None where uids don't exist."""
+    return os.getuid() if hasattr(os, 'getuid') else None
+
+
+def parse_sort(spec: str) -> List[tuple]:
+    """
+    Parse a --sort specification like "-cpu,pid" into (key function, reverse) pairs.
+
+    Raises:
+        ValueError: for an unknown key
+    """
+    keys = []
+    for part in spec.split(','):
+        part = part.strip()
+        reverse = part.startswith('-')
+        name = part.lstrip('+-').lower()
+        name = SORT_ALIASES.get(name, name)
+        if name not in SORT_KEYS:
+            raise ValueError(f"unknown sort key '{part}'")
+        keys.append((SORT_KEYS[name], reverse))
+    return keys
+
+
+def sort_processes(processes: List[ProcessInfo], keys: List[tuple]) -> List[ProcessInfo]:
+    """Stable multi-key sort; the last key is applied first."""
+    for key, reverse in reversed(keys):
+        processes.sort(key=key, reverse=reverse)
+    return processes
+
+
+def build_tree(processes: Iterable[ProcessInfo]) -> Tuple[Dict[int, ProcessInfo],
+                                                         Dict[int, List[int]], List[int]]:
+    """
+    Parent/child graph of a snapshot in one pass.
+
+    Returns (processes by pid, child pids by parent pid, root pids). Roots
+    are processes whose parent is not in the snapshot; children and roots
+    are in pid order.
+    """
+    by_pid = {proc.pid: proc for proc in processes}
+    children: Dict[int, List[int]] = {}
+    roots = []
+    for pid in sorted(by_pid):
+        ppid = by_pid[pid].ppid
+        if ppid in by_pid and ppid != pid:
+            children.setdefault(ppid, []).append(pid)
+        else:
+            roots.append(pid)
+    return by_pid, children, roots
+
+
+def subtree_totals(root: int, by_pid: Dict[int, ProcessInfo],
+                   children: Dict[int, List[int]]) -> Dict[int, Tuple[float, float]]:
+    """
+    (CPU%, memory%) summed over each subtree below `root`, root included.
+
+    Uses an explicit stack rather than recursion, so process chains of any
+    depth are fine.
+    """
+    order = []
+    stack = [root]
+    while stack:
+        pid = stack.pop()
+        order.append(pid)
+        stack.extend(children.get(pid, ()))
+
+    totals: Dict[int, Tuple[float, float]] = {}
+    # Reversed pre-order visits every child before its parent
+    for pid in reversed(order):
+        proc = by_pid[pid]
+        cpu, mem = proc.cpu_percent, proc.memory_percent
+        for child in children.get(pid, ()):
+            child_cpu, child_mem = totals[child]
+            cpu += child_cpu
+            mem += child_mem
+        totals[pid] = (cpu, mem)
+    return totals
+
+
+class ProcessScanner:
+    """
+    Reads the process table once per call into ProcessInfo records.
+
+    On Linux the table is read straight from /proc (see utils.procfs):
+    one stat line per process, parsed in a single pass. Elsewhere, or with
+    `use_procfs=False`, each process is read inside psutil's `oneshot()`.
+    Filters run before the expensive fields are touched: `-p` only visits
+    the named pids, and a user filter compares uids before reading
+    anything else. CPU% is CPU time over lifetime, as ps reports it, so no
+    sampling interval is needed; memory% divides by a total read once.
+
+    With `track_cpu`, each scan remembers every process's CPU time, and
+    the next scan reports CPU% over the interval between the two instead,
+    like top. Processes new since the last scan fall back to lifetime.
+    """
+
+    def __init__(self, with_cmdline: bool = False, track_cpu: bool = False,
+                 use_procfs: bool = None):
+        self.with_cmdline = with_cmdline
+        self.track_cpu = track_cpu
+        self.use_procfs = procfs.AVAILABLE if use_procfs is None else use_procfs
+        self.skipped = 0
+        self._max_cpu = 100.0
+        self._cpu_seen: Dict[tuple, float] = {}
+        self._prev_cpu: Dict[tuple, float] = {}
+        self._prev_time = None
+        self._interval = 0.0
+        self._reader = procfs.StatReader() if self.use_procfs else None
+
+    def scan(self, pids: Optional[Iterable[int]] = None,
+             uids: Optional[Iterable[int]] = None) -> List[ProcessInfo]:
+        """
+        Snapshot matching processes.
+
+        Args:
+            pids: Only these pids (default: all)
+            uids: Only processes owned by one of these uids (the real
+                uid via psutil, the effective uid via /proc)
+        """
+        uid_filter = set(uids) if uids is not None else None
+        self._max_cpu = 100.0 * (psutil.cpu_count() or 1)
+        now = time.time()
+        if self.track_cpu:
+            self._prev_cpu, self._cpu_seen = self._cpu_seen, {}
+            self._interval = now - self._prev_time if self._prev_time is not None else 0.0
+            self._prev_time = now
+
+        if self.use_procfs:
+            return self._scan_procfs(pids, uid_filter, now)
+        return self._scan_psutil(pids, uid_filter, now)
+
+    def _scan_procfs(self, pids: Optional[Iterable[int]], uid_filter: Optional[set],
+                     now: float) -> List[ProcessInfo]:
+        total_memory = procfs.meminfo()['MemTotal'] or 1
+        boot_time = procfs.boot_time()
+        reader = self._reader
+
+        processes = []
+        for pid in (pids if pids is not None else procfs.pids()):
+            try:
+                uid = reader.owner(pid)
+                if uid_filter is not None and uid not in uid_filter:
+                    continue
+                pid, name, status, ppid, cpu_time, started, rss = reader.read(pid)
+            except (FileNotFoundError, ProcessLookupError):
+                # Exited since the listing
+                self.skipped += 1
+                continue
+            cmdline = None
+            if self.with_cmdline or len(name) == procfs.COMM_LENGTH:
+                try:
+                    cmdline = reader.cmdline(pid)
+                except OSError:
+                    cmdline = None
+                # Recover a truncated name from argv[0], as psutil does
+                if cmdline and len(name) == procfs.COMM_LENGTH:
+                    full_name = os.path.basename(cmdline[0])
+                    if full_name.startswith(name):
+                        name = full_name
+                if not self.with_cmdline:
+                    cmdline = None
+            processes.append(self._record(pid, ppid, name, uid, status, cpu_time,
+                                          boot_time + started, rss, cmdline, total_memory, now))
+        return processes
+
+    def _scan_psutil(self, pids: Optional[Iterable[int]], uid_filter: Optional[set],
+                     now: float) -> List[ProcessInfo]:
+        total_memory = psutil.virtual_memory().total or 1
+        if pids is not None:
+            candidates = []
+            for pid in pids:
+                try:
+                    candidates.append(psutil.Process(pid))
+                except psutil.NoSuchProcess:
+                    continue
+        else:
+            candidates = psutil.process_iter()
+
+        processes = []
+        for proc in candidates:
+            try:
+                with proc.oneshot():
+                    info = self._read(proc, uid_filter, total_memory, now)
+            except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+                self.skipped += 1
+                continue
+            if info is not None:
+                processes.append(info)
+        return processes
+
+    def _read(self, proc: psutil.Process, uid_filter: Optional[set], total_memory: int,
+              now: float) -> Optional[ProcessInfo]:
+        try:
+            uid = proc.uids().real
+        except (AttributeError, psutil.AccessDenied):
+            # No uids on Windows
+            uid = None
+        if uid_filter is not None and uid not in uid_filter:
+            return None
+
+        cpu = proc.cpu_times()
+        cmdline = None
+        if self.with_cmdline:
+            try:
+                cmdline = proc.cmdline()
+            except psutil.AccessDenied:
+                cmdline = None
+
+        info = self._record(proc.pid, proc.ppid(), proc.name(), uid, proc.status(),
+                            cpu.user + cpu.system, proc.create_time(), proc.memory_info().rss,
+                            cmdline, total_memory, now)
+        if uid is None:
+            try:
+                info = info._replace(user=proc.username())
+            except psutil.AccessDenied:
+                pass
+        return info
+
+    def _record(self, pid: int, ppid: int, name: str, uid: Optional[int], status: str,
+                cpu_time: float, create_time: float, rss: int, cmdline: Optional[list],
+                total_memory: int, now: float) -> ProcessInfo:
+        """Build a ProcessInfo, working out CPU% from lifetime or the previous scan."""
+        elapsed = max(now - create_time, 1e-6)
+        cpu_percent = cpu_time / elapsed * 100
+        if self.track_cpu:
+            key = (pid, create_time)
+            self._cpu_seen[key] = cpu_time
+            previous = self._prev_cpu.get(key)
+            if previous is not None and self._interval > 0:
+                cpu_percent = (cpu_time - previous) / self._interval * 100
+
+        return ProcessInfo(
+            pid=pid,
+            ppid=ppid,
+            name=name,
+            uid=uid,
+            user=user_name(uid),
+            status=status,
+            cpu_percent=min(max(cpu_percent, 0.0), self._max_cpu),
+            memory_percent=rss / total_memory * 100,
+            rss=rss,
+            cpu_time=cpu_time,
+            create_time=create_time,
+            cmdline=cmdline,
+        )
@@ -0,0 +1,156 @@
+"""
+Direct readers for Linux /proc, bypassing psutil's per-process objects.
+"""
+import os
+import sys
+from collections import namedtuple
+from typing import Dict, Iterator, Optional, Tuple
+
+AVAILABLE = sys.platform.startswith('linux') and os.path.exists('/proc/self/stat')
+
+CLOCK_TICKS = os.sysconf('SC_CLK_TCK') if AVAILABLE else 100
+PAGE_SIZE = os.sysconf('SC_PAGE_SIZE') if AVAILABLE else 4096
+
+# Same names psutil uses for the state letter in /proc/[pid]/stat
+STATUS_NAMES = {
+    'R': 'running', 'S': 'sleeping', 'D': 'disk-sleep', 'T': 'stopped', 't': 'tracing-stop',
+    'Z': 'zombie', 'X': 'dead', 'x': 'dead', 'K': 'wake-kill', 'W': 'waking', 'I': 'idle',
+    'P': 'parked',
+}
+
+# The fields of psutil.virtual_memory() and swap_memory() that are used here
+VirtualMemory = namedtuple('VirtualMemory', [
+    'total', 'available', 'percent', 'used', 'free', 'active', 'inactive', 'buffers',
+    'cached', 'shared', 'slab',
+])
+SwapMemory = namedtuple('SwapMemory', ['total', 'used', 'free', 'percent'])
+
+# The kernel truncates comm to this many characters
+COMM_LENGTH = 15
+
+# pid, comm, state, ppid, utime+stime seconds, start seconds after boot, rss bytes
+StatFields = Tuple[int, str, str, int, float, float, int]
+
+_boot_time = None
+
+
+def pids() -> Iterator[int]:
+    """Pids currently listed in /proc."""
+    for name in os.listdir('/proc'):
+        if name.isdigit():
+            yield int(name)
+
+
+def boot_time() -> float:
+    """System boot time from /proc/stat, read once."""
+    global _boot_time
+    if _boot_time is None:
+        with open('/proc/stat', 'rb') as f:
+            for line in f:
+                if line.startswith(b'btime'):
+                    _boot_time = float(line.split()[1])
+                    break
+            else:
+                raise OSError("btime missing from /proc/stat")
+    return _boot_time
+
+
+class StatReader:
+    """
+    Reads /proc/[pid]/stat into one reused buffer and parses it in one pass.
+
+    The stat line carries everything ps and top need except the owner,
+    which comes from the uid of the /proc/[pid] directory: one open, one
+    read and one stat per process, with no per-process allocations beyond
+    the parsed fields.
+    """
+
+    def __init__(self, buffer_size: int = 4096):
+        self._buffer = bytearray(buffer_size)
+        self._view = memoryview(self._buffer)
+
+    def read(self, pid: int) -> StatFields:
+        """
+        Parse the stat line of `pid`.
+
+        Raises:
+            OSError: FileNotFoundError or ProcessLookupError once the process is gone
+        """
+        fd = os.open(f'/proc/{pid}/stat', os.O_RDONLY)
+        try:
+            length = os.readv(fd, [self._buffer])
+        finally:
+            os.close(fd)
+        data = self._view[:length].tobytes()
+
+        # comm may contain spaces and parentheses, so split around the last ')'
+        close = data.rfind(b')')
+        name = data[data.index(b'(') + 1:close].decode('utf-8', 'replace')
+        fields = data[close + 2:].split(b' ', 22)
+        # fields[0] is field 3 of proc(5): state
+        return (
+            pid,
+            name,
+            STATUS_NAMES.get(chr(fields[0][0]), '?'),
+            int(fields[1]),
+            (int(fields[11]) + int(fields[12])) / CLOCK_TICKS,
+            int(fields[19]) / CLOCK_TICKS,
+            int(fields[21]) * PAGE_SIZE,
+        )
+
+    @staticmethod
+    def owner(pid: int) -> int:
+        """Uid owning the process (its effective uid)."""
+        return os.stat(f'/proc/{pid}').st_uid
+
+    @staticmethod
+    def cmdline(pid: int) -> list:
+        with open(f'/proc/{pid}/cmdline', 'rb') as f:
+            data = f.read()
+        return [arg.decode('utf-8', 'replace') for arg in data.rstrip(b'\0').split(b'\0')] if data else []
+
+
+def meminfo() -> Dict[str, int]:
+    """/proc/meminfo as bytes per key."""
+    info = {}
+    with open('/proc/meminfo', 'rb') as f:
+        for line in f:
+            key, _, rest = line.partition(b':')
+            parts = rest.split()
+            if parts:
+                value = int(parts[0])
+                info[key.decode()] = value * 1024 if len(parts) > 1 else value
+    return info
+
+
+def virtual_memory(info: Optional[Dict[str, int]] = None) -> VirtualMemory:
+    """psutil.virtual_memory() computed from one /proc/meminfo read, the way psutil does."""
+    info = info if info is not None else meminfo()
+    total = info['MemTotal']
+    free = info['MemFree']
+    buffers = info.get('Buffers', 0)
+    cached = info.get('Cached', 0) + info.get('SReclaimable', 0)
+    available = info.get('MemAvailable', free + buffers + cached)
+    used = total - available
+    return VirtualMemory(
+        total=total,
+        available=available,
+        percent=round((total - available) / total * 100, 1) if total else 0.0,
+        used=used,
+        free=free,
+        active=info.get('Active', 0),
+        inactive=info.get('Inactive', 0),
+        buffers=buffers,
+        cached=cached,
+        shared=info.get('Shmem', 0),
+        slab=info.get('Slab', 0),
+    )
+
+
+def swap_memory(info: Optional[Dict[str, int]] = None) -> SwapMemory:
+    info = info if info is not None else meminfo()
+    total = info.get('SwapTotal', 0)
+    free = info.get('SwapFree', 0)
+    used = total - free
+    return SwapMemory(total=total, used=used, free=free,
+                      percent=round(used / total * 100, 1) if total else 0.0)
@@ -0,0 +1,163 @@
+"""
+Background sampling of host CPU, memory, disk and process statistics.
+"""
+import os
+import threading
+import time
+from collections import namedtuple
+from typing import Optional
+
+import psutil
+
+# Handle both relative and absolute imports
+try:
+    from . import procfs
+    from .processes import ProcessScanner
+    from .telemetry import telemetry
+except ImportError:
+    # Fallback for absolute imports when running directly
+    from utils import procfs
+    from utils.processes import ProcessScanner
+    from utils.telemetry import telemetry
+
+
+SystemSnapshot = namedtuple('SystemSnapshot', [
+    'timestamp', 'interval', 'cpu_percent', 'cpu_count', 'memory', 'swap', 'disk',
+    'load_avg', 'boot_time', 'processes',
+])
+
+
+def cpu_busy_percent(previous, current) -> float:
+    """Busy share of CPU time between two psutil.cpu_times() (since boot without `previous`)."""
+    idle = current.idle + getattr(current, 'iowait', 0.0)
+    total = sum(current)
+    if previous is not None:
+        idle -= previous.idle + getattr(previous, 'iowait', 0.0)
+        total -= sum(previous)
+    if total <= 0:
+        return 0.0
+    return round(max(0.0, min(100.0, (total - idle) / total * 100)), 1)
+
+
+class SystemSampler:
+    """
+    Periodically captures a SystemSnapshot on a daemon thread.
+
+    Readers call `latest()` and get the most recent snapshot without
+    waiting on a sampling interval. CPU percentages are deltas between
+    consecutive samples, both host-wide and per process, so they reflect
+    the last `interval` seconds instead of psutil's first-call zeros.
+
+    The thread starts on the first read and stops by itself once nobody
+    has read for `idle_timeout` seconds, so an idle terminal costs nothing.
+    """
+
+    def __init__(self, interval: float = 1.0, idle_timeout: float = 60.0, disk_path: str = '/'):
+        self.interval = interval
+        self.idle_timeout = idle_timeout
+        self.disk_path = disk_path
+        self.samples = 0
+        self._scanner = ProcessScanner(track_cpu=True)
+        self._snapshot: Optional[SystemSnapshot] = None
+        self._prev_cpu_times = None
+        self._last_read = 0.0
+        self._lock = threading.Lock()
+        self._sample_lock = threading.Lock()
+        self._thread = None
+        self._stop = threading.Event()
+
+    def latest(self, max_age: float = None) -> SystemSnapshot:
+        """
+        Most recent snapshot, sampling synchronously only if there is none
+        yet or it is older than `max_age` seconds (default: two intervals).
+        """
+        self._last_read = time.monotonic()
+        self.start()
+        max_age = max_age if max_age is not None else 2 * self.interval
+        snapshot = self._snapshot
+        if snapshot is None or time.time() - snapshot.timestamp > max_age:
+            telemetry.record_cache('system_sampler', misses=1)
+            return self.sample()
+        telemetry.record_cache('system_sampler', hits=1)
+        return snapshot
+
+    def sample(self) -> SystemSnapshot:
+        """Take a snapshot now and make it the latest."""
+        with self._sample_lock:
+            now = time.time()
+            previous = self._snapshot
+            cpu_times = psutil.cpu_times()
+            cpu_percent = cpu_busy_percent(self._prev_cpu_times, cpu_times)
+            self._prev_cpu_times = cpu_times
+
+            try:
+                disk = psutil.disk_usage(self.disk_path)
+            except OSError:
+                disk = None
+            try:
+                load_avg = os.getloadavg()
+            except (OSError, AttributeError):
+                # Windows doesn't have load averages
+                load_avg = None
+
+            if procfs.AVAILABLE:
+                # Both from a single /proc/meminfo read
+                info = procfs.meminfo()
+                memory, swap = procfs.virtual_memory(info), procfs.swap_memory(info)
+            else:
+                memory, swap = psutil.virtual_memory(), psutil.swap_memory()
+
+            snapshot = SystemSnapshot(
+                timestamp=now,
+                interval=now - previous.timestamp if previous is not None else 0.0,
+                cpu_percent=cpu_percent,
+                cpu_count=psutil.cpu_count() or 1,
+                memory=memory,
+                swap=swap,
+                disk=disk,
+                load_avg=load_avg,
+                boot_time=procfs.boot_time() if procfs.AVAILABLE else psutil.boot_time(),
+                processes=self._scanner.scan(),
+            )
+            self._snapshot = snapshot
+            self.samples += 1
+            return snapshot
+
+    # Background thread
+
+    def start(self):
+        """Start the sampling thread unless it is already running."""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, name='system-sampler', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _loop(self):
+        while not self._stop.wait(self.interval):
+            if time.monotonic() - self._last_read > self.idle_timeout:
+                break
+            try:
+                self.sample()
+            except (OSError, psutil.Error):
+                # Try again next round
+                pass
+        with self._lock:
+            self._thread = None
+
+
+_shared_sampler = None
+_shared_lock = threading.Lock()
+
+
+def shared_sampler() -> SystemSampler:
+    """The process-wide sampler, so every terminal and API request reads one thread."""
+    global _shared_sampler
+    with _shared_lock:
+        if _shared_sampler is None:
+            _shared_sampler = SystemSampler()
+        return _shared_sampler
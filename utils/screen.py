@@ -0,0 +1,121 @@
+"""
+Full-screen redraw of changing text frames with ANSI cursor addressing.
+"""
+import os
+import select
+import shutil
+import sys
+import time
+from typing import List, Optional, TextIO
+
+# Handle both relative and absolute imports
+try:
+    from .columns import truncate
+except ImportError:
+    # Fallback for absolute imports when running directly
+    from utils.columns import truncate
+
+try:
+    import termios
+    import tty
+except ImportError:
+    # Not available on Windows
+    termios = None
+    tty = None
+
+
+CSI = "\x1b["
+ENTER_ALT_SCREEN = CSI + "?1049h" + CSI + "2J"
+LEAVE_ALT_SCREEN = CSI + "?1049l"
+HIDE_CURSOR = CSI + "?25l"
+SHOW_CURSOR = CSI + "?25h"
+CLEAR_LINE = CSI + "K"
+
+
+def move_to(row: int) -> str:
+    """Cursor to the start of 1-based `row`."""
+    return f"{CSI}{row};1H"
+
+
+class LiveScreen:
+    """
+    Draws successive frames of lines, rewriting only the lines that changed.
+
+    Each frame is compared with the previous one row by row; a changed row
+    is addressed directly and overwritten, and rows the new frame no longer
+    uses are blanked. Lines are cut to the screen width so nothing wraps
+    and row numbers stay exact. A resize forces a full redraw.
+    """
+
+    def __init__(self, stream: TextIO):
+        self.stream = stream
+        self._lines: List[str] = []
+        self._size = None
+
+    def __enter__(self) -> 'LiveScreen':
+        self.stream.write(ENTER_ALT_SCREEN + HIDE_CURSOR)
+        self.stream.flush()
+        return self
+
+    def __exit__(self, *exc):
+        self.stream.write(SHOW_CURSOR + LEAVE_ALT_SCREEN)
+        self.stream.flush()
+
+    def size(self) -> os.terminal_size:
+        return shutil.get_terminal_size()
+
+    def draw(self, lines: List[str]) -> int:
+        """Show `lines`, returning how many rows had to be rewritten."""
+        size = self.size()
+        if size != self._size:
+            self._size = size
+            self._lines = []
+            self.stream.write(CSI + "2J")
+        lines = [truncate(line, size.columns) for line in lines[:size.lines]]
+
+        out = []
+        for row, line in enumerate(lines):
+            if row >= len(self._lines) or self._lines[row] != line:
+                out.append(move_to(row + 1) + line + CLEAR_LINE)
+        for row in range(len(lines), len(self._lines)):
+            out.append(move_to(row + 1) + CLEAR_LINE)
+        if out:
+            self.stream.write("".join(out))
+            self.stream.flush()
+        self._lines = lines
+        return len(out)
+
+
+class KeyReader:
+    """
+    Single keypresses from an interactive stdin, without waiting for Enter.
+
+    `read(timeout)` doubles as the frame delay: it returns as soon as a key
+    arrives, or None once `timeout` elapses. Where raw input is unavailable
+    it just sleeps, and Ctrl+C is the only way out.
+    """
+
+    def __init__(self, stream: TextIO = None):
+        self.stream = stream or sys.stdin
+        self._saved = None
+
+    def __enter__(self) -> 'KeyReader':
+        if termios is not None and self.stream.isatty():
+            fd = self.stream.fileno()
+            self._saved = termios.tcgetattr(fd)
+            tty.setcbreak(fd)
+        return self
+
+    def __exit__(self, *exc):
+        if self._saved is not None:
+            termios.tcsetattr(self.stream.fileno(), termios.TCSADRAIN, self._saved)
+            self._saved = None
+
+    def read(self, timeout: float) -> Optional[str]:
+        if self._saved is None:
+            time.sleep(timeout)
+            return None
+        ready, _, _ = select.select([self.stream], [], [], timeout)
+        if not ready:
+            return None
+        return os.read(self.stream.fileno(), 1).decode('utf-8', 'replace')
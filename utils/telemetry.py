@@ -0,0 +1,186 @@
+"""
+Process-wide counters for commands and caches, exposed in OpenMetrics text format.
+"""
+import math
+import threading
+import weakref
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+# Upper bounds, in seconds, of the command latency histogram buckets
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0)
+
+CONTENT_TYPE = 'application/openmetrics-text; version=1.0.0; charset=utf-8'
+
+
+class _Shard:
+    """One thread's counters; only that thread ever writes to it."""
+
+    __slots__ = ('commands', 'unknown', 'caches')
+
+    def __init__(self):
+        # command -> [count, errors, sum of seconds, per-bucket counts...]
+        self.commands: Dict[str, List[float]] = {}
+        self.unknown = 0
+        # cache -> [hits, misses]
+        self.caches: Dict[str, List[int]] = {}
+
+
+class Telemetry:
+    """
+    Counters for executed commands, their latency and cache hit rates.
+
+    Every thread writes to its own shard, so recording is a couple of
+    list updates with no lock and no contention between sessions. The
+    shards are summed only when metrics are rendered. Gauges are read
+    through callbacks at render time, so they cost nothing in between.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+        self._shards: List[Tuple[threading.Thread, _Shard]] = []
+        # Counts of threads that have exited, folded together
+        self._retired = _Shard()
+        self._lock = threading.Lock()
+        self._gauges: List[Tuple[str, str, Callable[[], Iterable[Tuple[dict, float]]]]] = []
+        self.engines = weakref.WeakSet()
+
+    def _shard(self) -> _Shard:
+        shard = getattr(self._local, 'shard', None)
+        if shard is None:
+            shard = self._local.shard = _Shard()
+            with self._lock:
+                self._shards.append((threading.current_thread(), shard))
+        return shard
+
+    # Recording
+
+    def record_command(self, command: Optional[str], seconds: float, ok: bool = True):
+        """Count one command run; `command` is None for names that aren't commands."""
+        shard = self._shard()
+        if command is None:
+            shard.unknown += 1
+            return
+        stats = shard.commands.get(command)
+        if stats is None:
+            stats = shard.commands[command] = [0, 0, 0.0] + [0] * (len(LATENCY_BUCKETS) + 1)
+        stats[0] += 1
+        if not ok:
+            stats[1] += 1
+        stats[2] += seconds
+        stats[3 + bisect_left(LATENCY_BUCKETS, seconds)] += 1
+
+    def record_cache(self, cache: str, hits: int = 0, misses: int = 0):
+        shard = self._shard()
+        counts = shard.caches.get(cache)
+        if counts is None:
+            counts = shard.caches[cache] = [0, 0]
+        counts[0] += hits
+        counts[1] += misses
+
+    def register_gauge(self, name: str, help_text: str,
+                       collect: Callable[[], Iterable[Tuple[dict, float]]]):
+        """Add a gauge whose (labels, value) samples are read when rendering."""
+        with self._lock:
+            self._gauges = [g for g in self._gauges if g[0] != name] + [(name, help_text, collect)]
+
+    # Exposition
+
+    def totals(self) -> Tuple[Dict[str, List[float]], int, Dict[str, List[int]]]:
+        """Sum all shards: (command stats, unknown commands, cache counts)."""
+        total = _Shard()
+        with self._lock:
+            # Fold the shards of finished threads away, so per-request
+            # threads don't accumulate
+            live = []
+            for thread, shard in self._shards:
+                if thread.is_alive():
+                    live.append((thread, shard))
+                else:
+                    _merge(self._retired, shard)
+            self._shards = live
+            shards = [self._retired] + [shard for _, shard in live]
+            for shard in shards:
+                _merge(total, shard)
+        return total.commands, total.unknown, total.caches
+
+    def render(self) -> str:
+        """All metrics in OpenMetrics text format, ending with '# EOF'."""
+        commands, unknown, caches = self.totals()
+        lines = []
+
+        lines.append("# TYPE terminal_commands counter")
+        lines.append("# HELP terminal_commands Commands executed, by command name.")
+        for name in sorted(commands):
+            lines.append(f"terminal_commands_total{_labels(command=name)} {commands[name][0]}")
+        lines.append("# TYPE terminal_command_errors counter")
+        lines.append("# HELP terminal_command_errors Commands that raised instead of returning output.")
+        for name in sorted(commands):
+            lines.append(f"terminal_command_errors_total{_labels(command=name)} {commands[name][1]}")
+        lines.append("# TYPE terminal_unknown_commands counter")
+        lines.append("# HELP terminal_unknown_commands Command lines naming no known command.")
+        lines.append(f"terminal_unknown_commands_total {unknown}")
+
+        lines.append("# TYPE terminal_command_duration_seconds histogram")
+        lines.append("# HELP terminal_command_duration_seconds Command execution time.")
+        for name in sorted(commands):
+            stats = commands[name]
+            cumulative = 0
+            for bound, count in zip(LATENCY_BUCKETS + (math.inf,), stats[3:]):
+                cumulative += count
+                le = '+Inf' if bound == math.inf else repr(bound)
+                lines.append(f"terminal_command_duration_seconds_bucket{_labels(command=name, le=le)} "
+                             f"{cumulative}")
+            lines.append(f"terminal_command_duration_seconds_sum{_labels(command=name)} {stats[2]!r}")
+            lines.append(f"terminal_command_duration_seconds_count{_labels(command=name)} {stats[0]}")
+
+        lines.append("# TYPE terminal_cache_hits counter")
+        lines.append("# HELP terminal_cache_hits Lookups answered from a cache.")
+        for name in sorted(caches):
+            lines.append(f"terminal_cache_hits_total{_labels(cache=name)} {caches[name][0]}")
+        lines.append("# TYPE terminal_cache_misses counter")
+        lines.append("# HELP terminal_cache_misses Lookups the cache could not answer.")
+        for name in sorted(caches):
+            lines.append(f"terminal_cache_misses_total{_labels(cache=name)} {caches[name][1]}")
+
+        with self._lock:
+            gauges = list(self._gauges)
+        for name, help_text, collect in gauges:
+            try:
+                samples = list(collect())
+            except Exception:
+                # A failing source must not take the whole exposition down
+                continue
+            lines.append(f"# TYPE {name} gauge")
+            lines.append(f"# HELP {name} {help_text}")
+            for labels, value in samples:
+                lines.append(f"{name}{_labels(**labels)} {value!r}")
+
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+
+def _merge(into: _Shard, shard: _Shard):
+    """Add the counts of `shard` to `into`."""
+    into.unknown += shard.unknown
+    for name, stats in list(shard.commands.items()):
+        total = into.commands.setdefault(name, [0] * len(stats))
+        for i, value in enumerate(list(stats)):
+            total[i] += value
+    for name, counts in list(shard.caches.items()):
+        total = into.caches.setdefault(name, [0, 0])
+        total[0] += counts[0]
+        total[1] += counts[1]
+
+
+def _labels(**labels) -> str:
+    if not labels:
+        return ""
+    pairs = []
+    for key, value in labels.items():
+        value = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        pairs.append(f'{key}="{value}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+telemetry = Telemetry()
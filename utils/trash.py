@@ -0,0 +1,302 @@
+"""
+Trash management - instant removal by rename plus background purging.
+"""
+import json
+import os
+import queue
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import List, Optional
+
+
+class TrashManager:
+    """
+    Moves files into a same-filesystem trash directory and purges them later.
+
+    Every filesystem gets its own trash root so that moving an item in is a
+    single atomic `rename`. The home trash lives next to the history file;
+    other filesystems get `<mountpoint>/.python_terminal_trash-<uid>`, whose
+    locations are recorded in the home trash so leftovers can be found again
+    at startup.
+
+    Each trash root has two areas:
+        files/  - restorable items, with metadata in info/<id>.json
+        purge/  - items queued for deletion by the background purger
+    """
+
+    ROOTS_FILE = 'roots'
+
+    def __init__(self, trash_dir: str = None, workers: int = None):
+        if trash_dir is None:
+            home_dir = os.path.expanduser("~")
+            self.trash_dir = os.path.join(home_dir, ".python_terminal_trash")
+        else:
+            self.trash_dir = trash_dir
+
+        self.workers = workers or min(16, (os.cpu_count() or 1) * 2)
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+        self._roots = {}  # st_dev -> trash root
+
+    # Public API
+
+    def remove(self, path: str) -> bool:
+        """
+        Remove a path instantly by renaming it into the purge area.
+
+        Returns True if the path was handed to the background purger, or
+        False if no same-filesystem trash exists and the caller must delete
+        the path inline.
+        """
+        root = self._root_for(path)
+        if root is None:
+            return False
+
+        target = os.path.join(root, 'purge', self._new_id(path))
+        try:
+            os.rename(path, target)
+        except OSError:
+            return False
+
+        self._schedule(target)
+        return True
+
+    def trash(self, path: str) -> Optional[str]:
+        """
+        Move a path into the restorable trash.
+
+        Returns the trash id, or None if the path is on a filesystem without
+        a usable trash directory.
+        """
+        root = self._root_for(path)
+        if root is None:
+            return None
+
+        item_id = self._new_id(path)
+        info_path = os.path.join(root, 'info', item_id + '.json')
+        with open(info_path, 'w', encoding='utf-8') as f:
+            json.dump({'path': os.path.abspath(path),
+                       'deleted': datetime.now().isoformat()}, f)
+        try:
+            os.rename(path, os.path.join(root, 'files', item_id))
+        except OSError:
+            os.remove(info_path)
+            return None
+        return item_id
+
+    def list_items(self) -> List[dict]:
+        """List restorable items across all known trash roots, oldest first."""
+        items = []
+        for root in self._known_roots():
+            info_dir = os.path.join(root, 'info')
+            try:
+                names = os.listdir(info_dir)
+            except OSError:
+                continue
+            for name in names:
+                if not name.endswith('.json'):
+                    continue
+                try:
+                    with open(os.path.join(info_dir, name), 'r', encoding='utf-8') as f:
+                        info = json.load(f)
+                except (IOError, json.JSONDecodeError):
+                    continue
+                info['id'] = name[:-5]
+                info['root'] = root
+                items.append(info)
+        items.sort(key=lambda item: item.get('deleted', ''))
+        return items
+
+    def restore(self, item_id: str) -> str:
+        """
+        Move a trashed item back to its original location.
+
+        Returns the restored path.
+
+        Raises:
+            KeyError: If no item has this id
+            FileExistsError: If the original path is occupied again
+        """
+        for item in self.list_items():
+            if item['id'] != item_id:
+                continue
+            original = item['path']
+            if os.path.lexists(original):
+                raise FileExistsError(f"'{original}' already exists")
+            os.rename(os.path.join(item['root'], 'files', item_id), original)
+            os.remove(os.path.join(item['root'], 'info', item_id + '.json'))
+            return original
+        raise KeyError(item_id)
+
+    def empty(self) -> int:
+        """Queue every restorable item for purging. Returns the item count."""
+        count = 0
+        for item in self.list_items():
+            source = os.path.join(item['root'], 'files', item['id'])
+            target = os.path.join(item['root'], 'purge', item['id'])
+            try:
+                os.rename(source, target)
+                os.remove(os.path.join(item['root'], 'info', item['id'] + '.json'))
+            except OSError:
+                continue
+            self._schedule(target)
+            count += 1
+        return count
+
+    def purge_pending(self):
+        """Schedule anything left in the purge areas by an earlier session."""
+        for root in self._known_roots():
+            purge_dir = os.path.join(root, 'purge')
+            try:
+                names = os.listdir(purge_dir)
+            except OSError:
+                continue
+            for name in names:
+                self._schedule(os.path.join(purge_dir, name))
+
+    def wait(self):
+        """Block until all queued purges have finished."""
+        self._queue.join()
+
+    # Trash root discovery
+
+    def _root_for(self, path: str) -> Optional[str]:
+        """Find or create the trash root on the same filesystem as `path`."""
+        try:
+            dev = os.lstat(path).st_dev
+        except OSError:
+            return None
+
+        with self._lock:
+            if dev in self._roots:
+                return self._roots[dev]
+
+            if self._prepare(self.trash_dir) and os.stat(self.trash_dir).st_dev == dev:
+                root = self.trash_dir
+            else:
+                mount = _mount_point(os.path.dirname(os.path.abspath(path)), dev)
+                root = os.path.join(mount, f".python_terminal_trash-{_uid()}")
+                if self._prepare(root) and os.stat(root).st_dev == dev:
+                    self._remember_root(root)
+                else:
+                    root = None
+
+            self._roots[dev] = root
+            return root
+
+    def _prepare(self, root: str) -> bool:
+        """Create the trash layout under `root`."""
+        try:
+            for sub in ('files', 'info', 'purge'):
+                os.makedirs(os.path.join(root, sub), exist_ok=True)
+            return True
+        except OSError:
+            return False
+
+    def _remember_root(self, root: str):
+        """Record a secondary trash root in the home trash."""
+        if root in self._known_roots():
+            return
+        try:
+            self._prepare(self.trash_dir)
+            with open(os.path.join(self.trash_dir, self.ROOTS_FILE), 'a', encoding='utf-8') as f:
+                f.write(root + '\n')
+        except OSError:
+            pass
+
+    def _known_roots(self) -> List[str]:
+        """The home trash plus every recorded secondary root."""
+        roots = [self.trash_dir]
+        try:
+            with open(os.path.join(self.trash_dir, self.ROOTS_FILE), 'r', encoding='utf-8') as f:
+                roots.extend(line.strip() for line in f if line.strip())
+        except OSError:
+            pass
+        return [root for root in dict.fromkeys(roots) if os.path.isdir(root)]
+
+    def _new_id(self, path: str) -> str:
+        """Build a unique, readable id for a trashed path."""
+        name = os.path.basename(os.path.normpath(path)) or 'root'
+        return f"{datetime.now().strftime('%Y%m%d%H%M%S')}-{uuid.uuid4().hex[:8]}-{name}"
+
+    # Background purging
+
+    def _schedule(self, path: str):
+        """Queue a path for deletion, starting the purger if needed."""
+        self._queue.put(path)
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._purge_loop,
+                                                name='trash-purger', daemon=True)
+                self._thread.start()
+
+    def _purge_loop(self):
+        """Purger thread: delete queued paths one tree at a time."""
+        while True:
+            path = self._queue.get()
+            try:
+                self._purge(path)
+            except OSError:
+                # Left in place; the next startup retries it
+                pass
+            finally:
+                self._queue.task_done()
+
+    def _purge(self, path: str):
+        """Delete a tree, unlinking files in parallel."""
+        if not os.path.isdir(path) or os.path.islink(path):
+            os.remove(path)
+            return
+
+        files = []
+        dirs = []
+        stack = [path]
+        while stack:
+            current = stack.pop()
+            dirs.append(current)
+            with os.scandir(current) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    else:
+                        files.append(entry.path)
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            list(pool.map(_unlink_quietly, files))
+
+        # Parents were appended before children, so reverse order is bottom-up
+        for directory in reversed(dirs):
+            os.rmdir(directory)
+
+
+def _unlink_quietly(path: str):
+    """Unlink a file, ignoring races with other deleters."""
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+
+
+def _mount_point(path: str, dev: int) -> str:
+    """Walk up from `path` to the top directory still on device `dev`."""
+    path = os.path.abspath(path)
+    while True:
+        parent = os.path.dirname(path)
+        if parent == path:
+            return path
+        try:
+            if os.lstat(parent).st_dev != dev:
+                return path
+        except OSError:
+            return path
+        path = parent
+
+
+def _uid() -> str:
+    """Current user id, or the user name where uids don't exist."""
+    if hasattr(os, 'getuid'):
+        return str(os.getuid())
+    return os.getenv('USERNAME', 'user')
@@ -0,0 +1,477 @@
+"""
+Virtual filesystem layer - the real disk or an isolated in-memory tree.
+"""
+import errno
+import io
+import itertools
+import os
+import posixpath
+import shutil
+import stat
+import time
+from abc import ABC, abstractmethod
+from typing import Iterator, List, Optional, Tuple
+
+
+def _error(code: int, path: str) -> OSError:
+    """Build the same OSError subclass the os module would raise."""
+    return OSError(code, os.strerror(code), path)
+
+
+class FileSystem(ABC):
+    """
+    Interface used by TerminalState and FileOperations for file access.
+
+    Method names and error behaviour follow the os / os.path / shutil
+    functions they stand in for, so commands handle FileNotFoundError,
+    IsADirectoryError and friends the same way on every backend. `native`
+    tells callers whether paths are real on-disk paths, which is what the
+    disk-only engines (copy engine, trash, du cache, index) require.
+    """
+
+    native = False
+    sep = '/'
+
+    @abstractmethod
+    def getcwd(self) -> str:
+        """Initial working directory of a session on this filesystem."""
+
+    @abstractmethod
+    def home(self) -> str:
+        """The user's home directory."""
+
+    def exists(self, path: str) -> bool:
+        try:
+            self.stat(path)
+            return True
+        except OSError:
+            return False
+
+    def lexists(self, path: str) -> bool:
+        try:
+            self.lstat(path)
+            return True
+        except OSError:
+            return False
+
+    def isdir(self, path: str) -> bool:
+        try:
+            return stat.S_ISDIR(self.stat(path).st_mode)
+        except OSError:
+            return False
+
+    def isfile(self, path: str) -> bool:
+        try:
+            return stat.S_ISREG(self.stat(path).st_mode)
+        except OSError:
+            return False
+
+    def islink(self, path: str) -> bool:
+        try:
+            return stat.S_ISLNK(self.lstat(path).st_mode)
+        except OSError:
+            return False
+
+    @abstractmethod
+    def stat(self, path: str) -> os.stat_result:
+        """Like os.stat."""
+
+    def lstat(self, path: str) -> os.stat_result:
+        return self.stat(path)
+
+    @abstractmethod
+    def listdir(self, path: str) -> List[str]:
+        """Like os.listdir."""
+
+    @abstractmethod
+    def mkdir(self, path: str):
+        """Like os.mkdir."""
+
+    @abstractmethod
+    def makedirs(self, path: str, exist_ok: bool = False):
+        """Like os.makedirs."""
+
+    @abstractmethod
+    def rmdir(self, path: str):
+        """Like os.rmdir."""
+
+    @abstractmethod
+    def remove(self, path: str):
+        """Like os.remove."""
+
+    @abstractmethod
+    def rmtree(self, path: str):
+        """Like shutil.rmtree."""
+
+    @abstractmethod
+    def move(self, src: str, dst: str):
+        """Like shutil.move."""
+
+    @abstractmethod
+    def utime(self, path: str, times: Optional[Tuple[float, float]] = None):
+        """Like os.utime."""
+
+    @abstractmethod
+    def open(self, path: str, mode: str = 'r', encoding: str = None, errors: str = None):
+        """Like the builtin open; text or binary depending on `mode`."""
+
+    def samefile(self, a: str, b: str) -> bool:
+        """Whether both paths exist and name the same file (same device and inode)."""
+        try:
+            sa, sb = self.stat(a), self.stat(b)
+        except OSError:
+            return False
+        return (sa.st_dev, sa.st_ino) == (sb.st_dev, sb.st_ino)
+
+    def copyfile(self, src: str, dst: str):
+        """Copy one file's contents and modification time."""
+        with self.open(src, 'rb') as fsrc, self.open(dst, 'wb') as fdst:
+            shutil.copyfileobj(fsrc, fdst)
+        st = self.stat(src)
+        self.utime(dst, (st.st_atime, st.st_mtime))
+
+    def walk(self, top: str) -> Iterator[Tuple[str, List[str], List[str]]]:
+        """Top-down (dirpath, dirnames, filenames) like os.walk, without following links."""
+        stack = [top]
+        while stack:
+            path = stack.pop()
+            try:
+                names = self.listdir(path)
+            except OSError:
+                continue
+            dirs = []
+            files = []
+            for name in names:
+                child = self.join(path, name)
+                if self.isdir(child) and not self.islink(child):
+                    dirs.append(name)
+                else:
+                    files.append(name)
+            yield path, dirs, files
+            stack.extend(self.join(path, name) for name in reversed(dirs))
+
+    # Path helpers, pure string operations
+
+    def join(self, *parts: str) -> str:
+        return posixpath.join(*parts)
+
+    def normpath(self, path: str) -> str:
+        return posixpath.normpath(path)
+
+    def isabs(self, path: str) -> bool:
+        return posixpath.isabs(path)
+
+    def basename(self, path: str) -> str:
+        return posixpath.basename(path)
+
+    def dirname(self, path: str) -> str:
+        return posixpath.dirname(path)
+
+
+class DiskFileSystem(FileSystem):
+    """The real filesystem, through os and shutil."""
+
+    native = True
+    sep = os.sep
+
+    def getcwd(self) -> str:
+        return os.getcwd()
+
+    def home(self) -> str:
+        return os.path.expanduser("~")
+
+    exists = staticmethod(os.path.exists)
+    lexists = staticmethod(os.path.lexists)
+    isdir = staticmethod(os.path.isdir)
+    isfile = staticmethod(os.path.isfile)
+    islink = staticmethod(os.path.islink)
+    stat = staticmethod(os.stat)
+    lstat = staticmethod(os.lstat)
+    listdir = staticmethod(os.listdir)
+    mkdir = staticmethod(os.mkdir)
+    rmdir = staticmethod(os.rmdir)
+    remove = staticmethod(os.remove)
+    rmtree = staticmethod(shutil.rmtree)
+    walk = staticmethod(os.walk)
+
+    def makedirs(self, path: str, exist_ok: bool = False):
+        os.makedirs(path, exist_ok=exist_ok)
+
+    def move(self, src: str, dst: str):
+        shutil.move(src, dst)
+
+    def utime(self, path: str, times: Optional[Tuple[float, float]] = None):
+        os.utime(path, times)
+
+    def open(self, path: str, mode: str = 'r', encoding: str = None, errors: str = None):
+        return open(path, mode, encoding=encoding, errors=errors)
+
+    def copyfile(self, src: str, dst: str):
+        shutil.copy2(src, dst)
+
+    join = staticmethod(os.path.join)
+    normpath = staticmethod(os.path.normpath)
+    isabs = staticmethod(os.path.isabs)
+    basename = staticmethod(os.path.basename)
+    dirname = staticmethod(os.path.dirname)
+
+
+class _Node:
+    __slots__ = ('mode', 'mtime', 'ino')
+
+
+class _DirNode(_Node):
+    __slots__ = ('children',)
+
+    def __init__(self, ino: int, mode: int = 0o755):
+        self.mode = stat.S_IFDIR | mode
+        self.mtime = time.time()
+        self.ino = ino
+        self.children = {}
+
+
+class _FileNode(_Node):
+    __slots__ = ('data',)
+
+    def __init__(self, ino: int, mode: int = 0o644):
+        self.mode = stat.S_IFREG | mode
+        self.mtime = time.time()
+        self.ino = ino
+        self.data = b''
+
+
+class _MemoryFile(io.BytesIO):
+    """Binary handle that stores its buffer back into the node on close."""
+
+    def __init__(self, fs: 'MemoryFileSystem', node: _FileNode, path: str, writable: bool,
+                 initial: bytes = b'', append: bool = False):
+        super().__init__(initial)
+        self._fs = fs
+        self._node = node
+        self._path = path
+        self._writable = writable
+        if append:
+            self.seek(0, io.SEEK_END)
+
+    def writable(self) -> bool:
+        return self._writable
+
+    def write(self, data) -> int:
+        if not self._writable:
+            raise io.UnsupportedOperation("not writable")
+        return super().write(data)
+
+    def close(self):
+        try:
+            if not self.closed and self._writable:
+                self._fs._store(self._node, self._path, self.getvalue())
+        finally:
+            super().close()
+
+
+class MemoryFileSystem(FileSystem):
+    """
+    Self-contained filesystem held in process memory.
+
+    Directories are dicts of child nodes and files hold one immutable bytes
+    object; nodes use __slots__ so an empty file costs a few dozen bytes.
+    There are no symlinks, owners or permissions checks. With `max_bytes`
+    set, writes that would grow total file contents past it fail with
+    ENOSPC, which keeps a shared server safe from one sandbox filling it.
+    """
+
+    def __init__(self, max_bytes: Optional[int] = None, user: str = 'user'):
+        self.max_bytes = max_bytes
+        self.used_bytes = 0
+        self._inodes = itertools.count(1)
+        self._root = _DirNode(next(self._inodes))
+        self._home = f"/home/{user}"
+        self.makedirs(self._home)
+        self.makedirs("/tmp")
+
+    def getcwd(self) -> str:
+        return self._home
+
+    def home(self) -> str:
+        return self._home
+
+    # Lookup
+
+    def _walk_to(self, path: str) -> _Node:
+        path = posixpath.normpath(path)
+        if not path.startswith('/'):
+            raise _error(errno.ENOENT, path)
+        node = self._root
+        for part in path.split('/'):
+            if not part:
+                continue
+            if not isinstance(node, _DirNode):
+                raise _error(errno.ENOTDIR, path)
+            node = node.children.get(part)
+            if node is None:
+                raise _error(errno.ENOENT, path)
+        return node
+
+    def _parent(self, path: str) -> Tuple[_DirNode, str]:
+        """Return the directory that would contain `path`, and the entry name."""
+        path = posixpath.normpath(path)
+        parent_path, name = posixpath.split(path)
+        if not name:
+            raise _error(errno.EEXIST, path)
+        parent = self._walk_to(parent_path)
+        if not isinstance(parent, _DirNode):
+            raise _error(errno.ENOTDIR, path)
+        return parent, name
+
+    def _dir(self, path: str) -> _DirNode:
+        node = self._walk_to(path)
+        if not isinstance(node, _DirNode):
+            raise _error(errno.ENOTDIR, path)
+        return node
+
+    # Queries
+
+    def stat(self, path: str) -> os.stat_result:
+        node = self._walk_to(path)
+        if isinstance(node, _DirNode):
+            size, nlink = 4096, 2 + sum(isinstance(child, _DirNode) for child in node.children.values())
+        else:
+            size, nlink = len(node.data), 1
+        return os.stat_result((node.mode, node.ino, 0, nlink, 0, 0, size,
+                               node.mtime, node.mtime, node.mtime))
+
+    def listdir(self, path: str) -> List[str]:
+        return list(self._dir(path).children)
+
+    # Mutations
+
+    def mkdir(self, path: str):
+        parent, name = self._parent(path)
+        if name in parent.children:
+            raise _error(errno.EEXIST, path)
+        parent.children[name] = _DirNode(next(self._inodes))
+        parent.mtime = time.time()
+
+    def makedirs(self, path: str, exist_ok: bool = False):
+        path = posixpath.normpath(path)
+        current = '/'
+        for part in path.split('/'):
+            if not part:
+                continue
+            current = posixpath.join(current, part)
+            try:
+                node = self._walk_to(current)
+            except FileNotFoundError:
+                self.mkdir(current)
+                continue
+            if not isinstance(node, _DirNode):
+                raise _error(errno.ENOTDIR if current != path else errno.EEXIST, current)
+            if current == path and not exist_ok:
+                raise _error(errno.EEXIST, path)
+
+    def rmdir(self, path: str):
+        parent, name = self._parent(path)
+        node = parent.children.get(name)
+        if node is None:
+            raise _error(errno.ENOENT, path)
+        if not isinstance(node, _DirNode):
+            raise _error(errno.ENOTDIR, path)
+        if node.children:
+            raise _error(errno.ENOTEMPTY, path)
+        del parent.children[name]
+        parent.mtime = time.time()
+
+    def remove(self, path: str):
+        parent, name = self._parent(path)
+        node = parent.children.get(name)
+        if node is None:
+            raise _error(errno.ENOENT, path)
+        if isinstance(node, _DirNode):
+            raise _error(errno.EISDIR, path)
+        self.used_bytes -= len(node.data)
+        del parent.children[name]
+        parent.mtime = time.time()
+
+    def rmtree(self, path: str):
+        parent, name = self._parent(path)
+        node = parent.children.get(name)
+        if node is None:
+            raise _error(errno.ENOENT, path)
+        if not isinstance(node, _DirNode):
+            raise _error(errno.ENOTDIR, path)
+        self.used_bytes -= self._tree_bytes(node)
+        del parent.children[name]
+        parent.mtime = time.time()
+
+    def _tree_bytes(self, node: _Node) -> int:
+        total = 0
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            if isinstance(current, _DirNode):
+                stack.extend(current.children.values())
+            else:
+                total += len(current.data)
+        return total
+
+    def move(self, src: str, dst: str):
+        """Rename like shutil.move: into `dst` when it is a directory."""
+        if self.isdir(dst):
+            dst = posixpath.join(dst, posixpath.basename(posixpath.normpath(src)))
+        src_norm, dst_norm = posixpath.normpath(src), posixpath.normpath(dst)
+        if (dst_norm + '/').startswith(src_norm + '/'):
+            raise _error(errno.EINVAL, dst)
+        src_parent, src_name = self._parent(src)
+        node = src_parent.children.get(src_name)
+        if node is None:
+            raise _error(errno.ENOENT, src)
+        dst_parent, dst_name = self._parent(dst)
+        existing = dst_parent.children.get(dst_name)
+        if existing is not None:
+            if isinstance(existing, _DirNode):
+                raise _error(errno.EISDIR if not isinstance(node, _DirNode) else errno.EEXIST, dst)
+            self.used_bytes -= len(existing.data)
+        del src_parent.children[src_name]
+        dst_parent.children[dst_name] = node
+        src_parent.mtime = dst_parent.mtime = time.time()
+
+    def utime(self, path: str, times: Optional[Tuple[float, float]] = None):
+        node = self._walk_to(path)
+        node.mtime = times[1] if times is not None else time.time()
+
+    def open(self, path: str, mode: str = 'r', encoding: str = None, errors: str = None):
+        binary = 'b' in mode
+        kind = mode.replace('b', '').replace('t', '')
+        writable = kind[0] in 'wax' or '+' in kind
+
+        try:
+            node = self._walk_to(path)
+        except FileNotFoundError:
+            if kind[0] == 'r':
+                raise
+            parent, name = self._parent(path)
+            node = _FileNode(next(self._inodes))
+            parent.children[name] = node
+            parent.mtime = time.time()
+        else:
+            if isinstance(node, _DirNode):
+                raise _error(errno.EISDIR, path)
+            if kind[0] == 'x':
+                raise _error(errno.EEXIST, path)
+
+        initial = b'' if kind[0] == 'w' else node.data
+        handle = _MemoryFile(self, node, path, writable, initial, append=kind[0] == 'a')
+        if kind[0] == 'w':
+            # Truncation is visible immediately, like on disk
+            self._store(node, path, b'')
+        if binary:
+            return handle
+        return io.TextIOWrapper(handle, encoding=encoding or 'utf-8', errors=errors)
+
+    def _store(self, node: _FileNode, path: str, data: bytes):
+        growth = len(data) - len(node.data)
+        if self.max_bytes is not None and growth > 0 and self.used_bytes + growth > self.max_bytes:
+            raise _error(errno.ENOSPC, path)
+        self.used_bytes += growth
+        node.data = data
+        node.mtime = time.time()
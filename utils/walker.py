@@ -0,0 +1,81 @@
+"""
+Concurrent directory walking built on os.scandir.
+"""
+import os
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Any, Callable, Iterator, List, Optional, Tuple
+
+
+# One scanned directory: `value` is what the visit function returned for it,
+# `error` the OSError raised while listing it (value is None in that case).
+DirResult = namedtuple('DirResult', ['path', 'depth', 'value', 'error'])
+
+
+def walk_parallel(root: str, visit: Callable[[str, int, List[os.DirEntry]], Any],
+                  max_depth: Optional[int] = None, workers: int = None,
+                  descend: Callable[[os.DirEntry], bool] = None,
+                  list_dir: Callable[[str], Optional[list]] = None) -> Iterator[DirResult]:
+    """
+    Walk a tree with several directories listed concurrently.
+
+    `visit(path, depth, entries)` runs on the worker thread that listed the
+    directory, so any per-entry work it does (stat calls, filtering) is
+    parallel too. Results are yielded in completion order, not tree order.
+
+    Args:
+        root: Directory to start from (depth 0)
+        visit: Called once per directory with its entries
+        max_depth: Do not list directories deeper than this
+        workers: Thread count
+        descend: Optional filter deciding which subdirectories to enter
+        list_dir: Optional source of cached DirEntry-like entries; when it
+            returns None the directory is listed from disk
+
+    Yields:
+        DirResult for every directory listed
+    """
+    def scan(path: str, depth: int):
+        entries = list_dir(path) if list_dir is not None else None
+        if entries is None:
+            with os.scandir(path) as it:
+                entries = list(it)
+        subdirs = []
+        if max_depth is None or depth < max_depth:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False) and (descend is None or descend(entry)):
+                    subdirs.append(entry.path)
+        return visit(path, depth, entries), subdirs
+
+    return walk_tree_parallel(root, scan, workers=workers)
+
+
+def walk_tree_parallel(root: str, scan: Callable[[str, int], Tuple[Any, List[str]]],
+                       workers: int = None) -> Iterator[DirResult]:
+    """
+    Lower-level concurrent walk where `scan` decides how to read each directory.
+
+    `scan(path, depth)` returns `(value, subdirectory_paths)`; the walk
+    continues into the returned subdirectories. This lets callers skip
+    listing a directory entirely, e.g. when a cache already knows it.
+    """
+    workers = workers or min(32, (os.cpu_count() or 1) * 4)
+    pool = ThreadPoolExecutor(max_workers=workers)
+
+    pending = {pool.submit(scan, root, 0): (root, 0)}
+    try:
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                path, depth = pending.pop(future)
+                try:
+                    value, subdirs = future.result()
+                except OSError as e:
+                    yield DirResult(path, depth, None, e)
+                    continue
+                for subdir in subdirs:
+                    pending[pool.submit(scan, subdir, depth + 1)] = (subdir, depth + 1)
+                yield DirResult(path, depth, value, None)
+    finally:
+        # The consumer may stop early; don't keep walking for nobody
+        pool.shutdown(wait=False, cancel_futures=True)